@@ -0,0 +1,165 @@
+"""
+Bulk resume jobs: throughput in resumes per minute, dedupe and crash resume.
+
+Usage:
+    python ai_services/benchmarks/bench_bulk_jobs.py [--resumes 200] [--duplicates 0.1] [--latency 0.8]
+                                                     [--llm-concurrency 8] [--parse-workers 2]
+
+Builds a zip of synthetic resume PDFs (a --duplicates share are byte-for-byte
+copies of others), starts the local Gemini stand-in with a constant
+--latency, and runs bulk_analyze.py on the archive twice:
+
+    uninterrupted   one run to completion: resumes per minute, outcome counts
+    crash + resume  SIGKILL once about half of the files have a result line,
+                    then the same command again; the resumed run must add
+                    exactly the missing lines (no file twice, none lost)
+
+Every run uses a fresh result cache and jobs directory, so each counts
+real parsing and LLM work. Half of the resumes carry a Projects section
+and bypass Gemini (user-021 tiering); the rest wait for it.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVICE = os.path.join(HERE, "..", "src", "resume_analyzer")
+sys.path[:0] = [os.path.join(HERE, "..", "src"), SERVICE, HERE]
+
+from bench_tiered_extraction import make_resume, start_fake_gemini  # noqa: E402
+
+
+def make_text_pdf(lines) -> bytes:
+    """Build a one-page PDF showing ``lines``."""
+    escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+    body = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+    stream = body.encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_archive(path, resumes, duplicates, seed):
+    rng = random.Random(seed)
+    pdfs = []
+    unique = round(resumes * (1 - duplicates))
+    for i in range(unique):
+        text, _ = make_resume(rng, "formatted" if i % 2 else "no_projects")
+        pdfs.append(make_text_pdf([f"Candidate {i}"] + text.splitlines()[1:]))
+    pdfs += [rng.choice(pdfs[:unique]) for _ in range(resumes - unique)]
+    rng.shuffle(pdfs)
+    with zipfile.ZipFile(path, "w") as archive:
+        for i, data in enumerate(pdfs):
+            archive.writestr(f"batch/resume_{i:04d}.pdf", data)
+    return unique
+
+
+def results(path):
+    try:
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.endswith("\n")]
+    except FileNotFoundError:
+        return []
+
+
+def run_cli(archive, workdir, env, args, kill_after=None):
+    """Run bulk_analyze.py; with ``kill_after``, SIGKILL it once that many result lines exist."""
+    output = os.path.join(workdir, "results.jsonl")
+    command = [sys.executable, "bulk_analyze.py", archive, "--job-id", "bench", "--output", output,
+               "--jobs-dir", os.path.join(workdir, "jobs"), "--parse-workers", str(args.parse_workers),
+               "--llm-concurrency", str(args.llm_concurrency)]
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=SERVICE, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if kill_after is not None:
+        while proc.poll() is None and len(results(output)) < kill_after:
+            time.sleep(0.05)
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+        return None, time.perf_counter() - started
+    stdout, _ = proc.communicate()
+    elapsed = time.perf_counter() - started
+    # The final state is the last JSON document on stdout (log lines come first)
+    return json.loads(stdout[stdout.rindex("\n{") + 1:] if "\n{" in stdout else stdout), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of files that repeat another")
+    parser.add_argument("--latency", type=float, default=0.8, help="fake Gemini seconds per call")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "resumes.zip")
+        unique = make_archive(archive, args.resumes, args.duplicates, args.seed)
+        proc, port = start_fake_gemini(args.latency, os.path.join(tmp, "scenario.json"))
+        env = {**os.environ, "GEMINI_API_KEY": "bench", "GEMINI_BASE_URL": f"http://127.0.0.1:{port}",
+               "LOG_REQUESTS": "0", "LLM_CONTEXT_CACHE": "0"}
+        try:
+            workdir = os.path.join(tmp, "full")
+            os.makedirs(workdir)
+            final, elapsed = run_cli(archive, workdir, {**env, "RESUME_CACHE_DB": os.path.join(workdir, "cache.db")}, args)
+
+            workdir = os.path.join(tmp, "crash")
+            os.makedirs(workdir)
+            crash_env = {**env, "RESUME_CACHE_DB": os.path.join(workdir, "cache.db")}
+            _, before_kill = run_cli(archive, workdir, crash_env, args, kill_after=args.resumes // 2)
+            lines_at_kill = len(results(os.path.join(workdir, "results.jsonl")))
+            resumed, resume_elapsed = run_cli(archive, workdir, crash_env, args)
+            lines = results(os.path.join(workdir, "results.jsonl"))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    files = [line["file"] for line in lines]
+    print(json.dumps({
+        "resumes": args.resumes,
+        "unique": unique,
+        "llm_latency_s": args.latency,
+        "llm_concurrency": args.llm_concurrency,
+        "parse_workers": args.parse_workers,
+        "uninterrupted": {
+            "seconds": round(elapsed, 1),
+            "resumes_per_minute": round(args.resumes / elapsed * 60, 1),
+            "job_resumes_per_minute": final.get("resumes_per_minute"),
+            "counts": final["counts"],
+        },
+        "crash_resume": {
+            "lines_at_kill": lines_at_kill,
+            "killed_after_s": round(before_kill, 1),
+            "resumed_run_s": round(resume_elapsed, 1),
+            "skipped_on_resume": resumed["resumed"],
+            "final_lines": len(lines),
+            "distinct_files": len(set(files)),
+            "status": resumed["status"],
+            "counts": resumed["counts"],
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
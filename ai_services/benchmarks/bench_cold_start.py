@@ -0,0 +1,111 @@
+"""
+Cold start of each AI service, with an import-time budget.
+
+Usage:
+    python ai_services/benchmarks/bench_cold_start.py [--runs 5] [--budget-ms 1000] [--no-serve]
+
+For every service this measures, in fresh interpreters:
+
+    import_ms   median time to ``import main`` (what a new worker pays
+                before it can bind its port)
+    live_ms     uvicorn start until GET /health/live answers
+    ready_ms    uvicorn start until GET /health/ready returns 200
+
+and checks that the heavy modules in LAZY_MODULES are not imported by
+``import main``; they belong in the warm-up. The script exits with status
+1 when a median import exceeds the budget or a lazy module is imported
+eagerly, so it can gate CI or a container build.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+SERVICES = ("resume_analyzer", "feedback_generator", "question_generator", "emotion_analyzer")
+LAZY_MODULES = ("google.genai", "pypdf", "numpy")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+print(json.dumps({"ms": (time.perf_counter() - started) * 1000,
+                  "eager": [name for name in %r if name in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure_import(service: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=os.path.join(SRC, service), env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_serve(service: str, env: dict) -> dict:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.join(SRC, service), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    timings = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while "ready_ms" not in timings and time.perf_counter() - started < 30:
+                for name, path in (("live_ms", "/health/live"), ("ready_ms", "/health/ready")):
+                    if name in timings:
+                        continue
+                    try:
+                        if client.get(path).status_code == 200:
+                            timings[name] = round((time.perf_counter() - started) * 1000)
+                    except httpx.TransportError:
+                        break
+                time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    parser.add_argument("--no-serve", action="store_true", help="skip the uvicorn live/ready timing")
+    args = parser.parse_args()
+
+    # Logs off; no API key, so nothing reaches the network during warm-up
+    env = {**os.environ, "LOG_REQUESTS": "0", "GEMINI_API_KEY": ""}
+    report, failures = {}, []
+    for service in SERVICES:
+        probes = [measure_import(service, env) for _ in range(args.runs)]
+        result = {"import_ms": round(statistics.median(probe["ms"] for probe in probes))}
+        eager = sorted({name for probe in probes for name in probe["eager"]})
+        if eager:
+            result["eager_imports"] = eager
+            failures.append(f"{service} imports {', '.join(eager)} at import time")
+        if result["import_ms"] > args.budget_ms:
+            failures.append(f"{service} import took {result['import_ms']} ms (budget {args.budget_ms:g} ms)")
+        if not args.no_serve:
+            result.update(measure_serve(service, env))
+        report[service] = result
+
+    print(json.dumps({"budget_ms": args.budget_ms, "services": report, "failures": failures}, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
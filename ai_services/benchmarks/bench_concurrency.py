@@ -0,0 +1,89 @@
+"""
+Concurrent requests against a slow in-process LLM stand-in.
+
+Usage:
+    python ai_services/benchmarks/bench_concurrency.py [N] [latency_s]
+
+With non-blocking LLM calls, N concurrent requests should complete in
+about one LLM latency rather than N of them. Requests beyond the
+per-service concurrency limit are rejected with 503 + Retry-After.
+tests/test_concurrency.py asserts both; this script prints the timings.
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import httpx
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("RESUME_CACHE_DB", "")
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+LATENCY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+
+def load_service(name):
+    service_dir = os.path.join(SRC, name)
+    sys.path.insert(0, service_dir)
+    spec = importlib.util.spec_from_file_location(f"{name}_main", os.path.join(service_dir, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class SlowResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+async def slow_generate_async(prompt, **kwargs):
+    await asyncio.sleep(LATENCY)
+    return SlowResponse(json.dumps({"feedback": "ok", "strengths": [], "improvements": [], "score": 80}))
+
+
+def slow_generate(prompt, **kwargs):
+    time.sleep(LATENCY)
+    return SlowResponse(json.dumps({"tech_skills": [], "soft_skills": [], "projects": []}))
+
+
+async def fire(app, path, n, **request):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post(path, **request) for _ in range(n)))
+        elapsed = time.perf_counter() - started
+    codes = {}
+    for response in responses:
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+    return elapsed, codes
+
+
+async def main():
+    feedback = load_service("feedback_generator")
+    question = load_service("question_generator")
+    resume = load_service("resume_analyzer")
+    from common import llm
+    llm.generate = slow_generate_async
+    llm.generate_sync = slow_generate
+
+    from bench_pdf_parser import make_pdf
+    pdf = make_pdf(1)
+
+    cases = [
+        ("feedback_generator", feedback.app, "/api/feedbacke_generator", {"json": {"text": "An answer"}}),
+        ("question_generator", question.app, "/api/question_generator", {"json": {"skills": ["Python"]}}),
+        ("resume_analyzer", resume.app, "/api/analyze_resume", {"content": pdf, "headers": {"content-type": "application/pdf"}}),
+    ]
+    print(f"N={N} concurrent requests, LLM latency {LATENCY:.2f}s")
+    for name, app, path, request in cases:
+        elapsed, codes = await fire(app, path, N, **request)
+        print(f"{name:<20} {elapsed:>6.2f}s ({elapsed / LATENCY:.1f}x latency) status={codes}")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    asyncio.run(main())
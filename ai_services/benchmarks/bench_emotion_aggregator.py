@@ -0,0 +1,165 @@
+"""
+Emotion aggregation throughput: samples/sec per core and memory per answer.
+
+Usage:
+    python ai_services/benchmarks/bench_emotion_aggregator.py [--sessions 5000] [--ws]
+
+Without --ws only the in-process paths are measured: folding samples into
+the registry, and the full per-message path of the WebSocket handler (JSON
+decode + fold). With --ws an emotion_analyzer worker is started under
+uvicorn and ``--sessions`` concurrent WebSocket clients stream batches to
+it; throughput is divided by the CPU time the worker used, so the figure
+is samples/sec per core regardless of how busy the client side is.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "emotion_analyzer")
+sys.path[:0] = [SERVICE]
+
+from utils.emotion_aggregator import AggregateRegistry  # noqa: E402
+
+EMOTIONS = ["neutral", "happy", "polite_smile", "sad", "angry", "surprised"]
+BATCH = 10  # 500 ms sampling, flushed every 5 s by a browser client
+
+
+def make_samples(rng, count, start=0):
+    return [
+        {
+            "emotion": rng.choice(EMOTIONS),
+            "confidence": rng.randint(0, 100),
+            "stressLevel": rng.randint(0, 100),
+            "engagement": rng.randint(0, 100),
+            "timestamp": start + 500 * i,
+        }
+        for i in range(count)
+    ]
+
+
+def bench_in_process(sessions, rounds):
+    rng = random.Random(1)
+    batches = [make_samples(rng, BATCH) for _ in range(64)]
+    messages = [json.dumps({"question_id": "q1", "samples": batch}) for batch in batches]
+    registry = AggregateRegistry(max_entries=sessions * 2)
+
+    started = time.process_time()
+    for round_number in range(rounds):
+        for session in range(sessions):
+            registry.add_samples(str(session), "q1", batches[(session + round_number) % len(batches)])
+    fold_seconds = time.process_time() - started
+    total = sessions * rounds * BATCH
+
+    started = time.process_time()
+    for round_number in range(rounds):
+        for session in range(sessions):
+            message = json.loads(messages[(session + round_number) % len(messages)])
+            registry.add_samples(str(session), message["question_id"], message["samples"])
+    message_seconds = time.process_time() - started
+
+    started = time.process_time()
+    for session in range(sessions):
+        registry.summary(str(session), "q1")
+    summary_us = (time.process_time() - started) / sessions * 1e6
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    probe = AggregateRegistry(max_entries=sessions * 2)
+    for session in range(1000):
+        probe.add_samples(str(session), "q1", make_samples(rng, 200))
+    per_aggregate = (tracemalloc.get_traced_memory()[0] - before) / 1000
+    tracemalloc.stop()
+
+    return {
+        "sessions": sessions,
+        "samples": total,
+        "fold_samples_per_sec": round(total / fold_seconds),
+        "message_samples_per_sec": round(total / message_seconds),
+        "summary_us": round(summary_us, 1),
+        "bytes_per_aggregate": round(per_aggregate),
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _client(url, session, rounds, rng):
+    import websockets
+
+    async with websockets.connect(url + str(session)) as ws:
+        for round_number in range(rounds):
+            await ws.send(json.dumps({"question_id": "q1", "samples": make_samples(rng, BATCH, round_number * BATCH * 500)}))
+        await ws.send(json.dumps({"type": "summary", "question_id": "q1"}))
+        await ws.recv()
+
+
+async def _drive(url, sessions, rounds):
+    rng = random.Random(2)
+    # Open connections in waves so the listen backlog is not the bottleneck
+    wave = 500
+    for start in range(0, sessions, wave):
+        await asyncio.gather(*(_client(url, session, rounds, rng) for session in range(start, min(sessions, start + wave))))
+
+
+def bench_websocket(sessions, rounds):
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-c", f"import uvicorn, main; uvicorn.run(main.app, port={port}, log_level='warning', ws_max_queue=64)"],
+        cwd=SERVICE,
+    )
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        cpu_before = _cpu_seconds(server.pid)
+        started = time.perf_counter()
+        asyncio.run(_drive(f"ws://127.0.0.1:{port}/ws/emotion/", sessions, rounds))
+        wall = time.perf_counter() - started
+        cpu = _cpu_seconds(server.pid) - cpu_before
+    finally:
+        server.terminate()
+        server.wait()
+    total = sessions * rounds * BATCH
+    return {
+        "ws_sessions": sessions,
+        "ws_samples": total,
+        "ws_wall_seconds": round(wall, 2),
+        "ws_worker_cpu_seconds": round(cpu, 2),
+        "ws_samples_per_core_sec": round(total / cpu) if cpu else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20, help="batches of %d samples per session" % BATCH)
+    parser.add_argument("--ws", action="store_true", help="also measure a uvicorn worker over WebSocket")
+    args = parser.parse_args()
+
+    report = bench_in_process(args.sessions, args.rounds)
+    if args.ws:
+        report.update(bench_websocket(args.sessions, args.rounds))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Memory and throughput: four single-service processes vs gateway.py.
+
+Usage:
+    python ai_services/benchmarks/bench_gateway.py [--workers 1,2] [--concurrency 32] [--duration 20]
+
+Each layout is started against the local Gemini stand-in (fake_gemini.py,
+constant 200 ms latency) and waited on until every /health/ready answers
+200. Then ``--concurrency`` closed-loop clients spread requests evenly
+over question, feedback, resume (two-page PDFs with unique content) and
+text emotion for ``--duration`` seconds.
+
+Memory is the proportional set size (PSS) of every process of the
+layout, read from /proc after the load. PSS splits pages shared between
+forked workers, so the numbers add up. The SQLite caches go to a temporary
+directory, so every run starts cold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+sys.path.insert(0, HERE)
+
+from bench_pdf_parser import make_pdf  # noqa: E402
+from loadtest import ANSWERS, build_request, classify, free_port, percentile, spawn  # noqa: E402
+
+# Request kind -> (service directory, gateway prefix, path)
+ROUTES = {
+    "question": ("question_generator", "/question", "/api/question_generator"),
+    "feedback": ("feedback_generator", "/feedback", "/api/feedbacke_generator"),
+    "resume": ("resume_analyzer", "/resume", "/api/analyze_resume"),
+    "emotion": ("emotion_analyzer", "/emotion", "/api/text_emotion"),
+}
+
+
+def descendants(pid: int) -> list:
+    """``pid`` and all its children, from /proc."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            except OSError:
+                continue
+            children.setdefault(parent, []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        found.append(current)
+        stack.extend(children.get(current, ()))
+    return found
+
+
+def pss_mb(pids) -> float:
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+        except (OSError, StopIteration):
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def wait_ready(urls, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    pending = set(urls)
+    while pending and time.monotonic() < deadline:
+        for url in list(pending):
+            try:
+                if httpx.get(f"{url}/health/ready", timeout=1).status_code == 200:
+                    pending.discard(url)
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.1)
+    if pending:
+        raise RuntimeError(f"not ready after {timeout}s: {sorted(pending)}")
+
+
+def start_separate(env):
+    procs, urls = [], {}
+    for kind, (directory, _, _) in ROUTES.items():
+        port = free_port()
+        args = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+        procs.append(spawn(args, os.path.join(SRC, directory), env, port))
+        urls[kind] = f"http://127.0.0.1:{port}"
+    wait_ready(set(urls.values()))
+    return procs, urls
+
+
+def start_gateway(env, workers):
+    port = free_port()
+    env = {**env, "GATEWAY_HOST": "127.0.0.1", "GATEWAY_PORT": str(port), "GATEWAY_WORKERS": str(workers)}
+    proc = spawn([sys.executable, os.path.join(SRC, "gateway.py")], SRC, env, port)
+    base = f"http://127.0.0.1:{port}"
+    wait_ready({base})
+    return [proc], {kind: base + prefix for kind, (_, prefix, _) in ROUTES.items()}
+
+
+async def load(urls, concurrency, duration, seed):
+    rng = random.Random(seed)
+    base_pdf = make_pdf(2)
+    kinds = list(ROUTES)
+    samples = []
+
+    async def client_loop(client, index):
+        count = index
+        while time.perf_counter() < stop_at:
+            kind = kinds[count % len(kinds)]
+            count += 1
+            if kind == "emotion":
+                request = {"json": {"text": rng.choice(ANSWERS)}}
+            else:
+                request = build_request(kind, rng, base_pdf)
+            started = time.perf_counter()
+            try:
+                response = await client.post(urls[kind] + ROUTES[kind][2], **request)
+                ok = response.status_code == 200 if kind == "emotion" else classify(kind, response) != "error"
+            except httpx.HTTPError:
+                ok = False
+            samples.append((time.perf_counter() - started, ok))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        started = time.perf_counter()
+        stop_at = started + duration
+        await asyncio.gather(*(client_loop(client, i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in samples)
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "errors": sum(1 for _, ok in samples if not ok),
+    }
+
+
+def run_layout(name, start, env, args):
+    procs, urls = start(env)
+    try:
+        idle = pss_mb(pid for proc in procs for pid in descendants(proc.pid))
+        result = asyncio.run(load(urls, args.concurrency, args.duration, args.seed))
+        loaded = pss_mb(pid for proc in procs for pid in descendants(proc.pid))
+        processes = sum(len(descendants(proc.pid)) for proc in procs)
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=30)
+    return {"layout": name, "processes": processes, "pss_mb_idle": idle, "pss_mb_after_load": loaded, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2", help="gateway worker counts to try")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        scenario = os.path.join(cache_dir, "scenario.json")
+        with open(scenario, "w") as f:
+            json.dump({"latency": {"dist": "constant", "seconds": 0.2}}, f)
+        fake_port = free_port()
+        fake = spawn([sys.executable, os.path.join(HERE, "fake_gemini.py"), "--port", str(fake_port), "--scenario", scenario],
+                     HERE, dict(os.environ), fake_port)
+        env = {
+            **os.environ,
+            "GEMINI_API_KEY": "bench",
+            "GEMINI_BASE_URL": f"http://127.0.0.1:{fake_port}",
+            "LOG_REQUESTS": "0",
+            "RESUME_CACHE_DB": os.path.join(cache_dir, "resume.sqlite3"),
+            "QUESTION_POOL_DB": os.path.join(cache_dir, "questions.sqlite3"),
+            "LLM_CONTEXT_CACHE_DB": os.path.join(cache_dir, "context.sqlite3"),
+        }
+        try:
+            results = [run_layout("separate", start_separate, env, args)]
+            for workers in (int(value) for value in args.workers.split(",") if value.strip()):
+                results.append(run_layout(f"gateway x{workers}", lambda env, w=workers: start_gateway(env, w), env, args))
+        finally:
+            fake.terminate()
+            fake.wait(timeout=10)
+
+    print(json.dumps({"cpus": os.cpu_count(), "concurrency": args.concurrency, "duration": args.duration, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Hedged LLM requests: feedback p99 and hedge rate with injected latency outliers.
+
+Usage:
+    python ai_services/benchmarks/bench_hedging.py [--requests 240] [--rps 5] [--median 0.8]
+                                                   [--outlier-rate 0.03] [--outlier-seconds 20]
+                                                   [--lite-median 0.4]
+
+Starts the local Gemini stand-in with lognormal latency around --median
+where --outlier-rate of the calls take --outlier-seconds, plus a few
+malformed answers, and sends --requests feedback requests (Poisson
+arrivals at --rps) through the feedback service's ASGI app in-process:
+
+    off         hedging disabled: an outlier holds its request
+    same_model  slow calls hedged to the same model after the recent p95
+    lite_model  hedges go to a lighter model (--lite-median, no outliers)
+
+Reports end-to-end p50/p99/max, the hedge rate, how many answers came
+from the hedge, raw-text fallbacks and errors, and how many requests
+outlived the Node side's 30 s timeout.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+sys.path[:0] = [SRC, HERE]
+
+import httpx  # noqa: E402
+
+from bench_tiered_extraction import start_fake_gemini  # noqa: E402
+
+LITE_MODEL = "gemini-2.5-flash-lite"
+CALLER_TIMEOUT = 30.0
+
+
+def load_feedback_service():
+    service_dir = os.path.join(SRC, "feedback_generator")
+    sys.path.insert(0, service_dir)
+    spec = importlib.util.spec_from_file_location("feedback_main", os.path.join(service_dir, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_mode(app, admin, scenario, name, hedge_policy, hedge_model, args):
+    from common import hedging, llm
+
+    await admin.post("/__scenario", json=scenario)
+    llm.breaker = llm.CircuitBreaker(threshold=5, cooldown=30.0)
+    hedging.policy = hedge_policy
+    if hedge_model:
+        os.environ["FEEDBACK_HEDGE_MODEL"] = hedge_model
+    else:
+        os.environ.pop("FEEDBACK_HEDGE_MODEL", None)
+
+    rng = random.Random(args.seed)
+    latencies, outcomes = [], {"model": 0, "raw_text_fallback": 0, "error": 0}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def one(number):
+            started = time.perf_counter()
+            response = await client.post("/api/feedbacke_generator", json={"text": f"Answer {number}: I would add an index."})
+            latencies.append(time.perf_counter() - started)
+            body = response.json()
+            if not body.get("success"):
+                outcomes["error"] += 1
+            elif body["data"].get("score") is None:
+                outcomes["raw_text_fallback"] += 1
+            else:
+                outcomes["model"] += 1
+
+        tasks = []
+        for number in range(args.requests):
+            tasks.append(asyncio.create_task(one(number)))
+            await asyncio.sleep(rng.expovariate(args.rps))
+        await asyncio.gather(*tasks)
+
+    stats = (await admin.get("/__stats")).json()
+    hedges = hedge_policy.snapshot().get("feedback", {})
+    return {
+        "mode": name,
+        "p50_s": round(percentile(latencies, 0.5), 3),
+        "p99_s": round(percentile(latencies, 0.99), 3),
+        "max_s": round(max(latencies), 3),
+        "over_caller_timeout": sum(1 for latency in latencies if latency > CALLER_TIMEOUT),
+        "outcomes": outcomes,
+        "hedge_rate": hedges.get("hedge_rate", 0.0),
+        "hedge_wins": hedges.get("hedge_wins", 0),
+        "hedges_skipped": {reason: hedges.get(f"skipped_{reason}", 0) for reason in ("budget", "busy", "deadline")},
+        "final_hedge_delay_s": hedges.get("delay_seconds", {}),
+        "upstream_requests": stats["requests"],
+        "upstream_by_model": stats["by_model"],
+    }
+
+
+async def main_async(args, port, scenario):
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = load_feedback_service()
+    from common import hedging
+
+    def policy(enabled):
+        return hedging.HedgePolicy(enabled=enabled, percentile=args.percentile, max_rate=args.max_rate)
+
+    modes = [("off", policy(False), None), ("same_model", policy(True), None), ("lite_model", policy(True), LITE_MODEL)]
+    results = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as admin:
+        for name, hedge_policy, hedge_model in modes:
+            # Keep the per-request access and warning logs out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results.append(await run_mode(service.app, admin, scenario, name, hedge_policy, hedge_model, args))
+            print(f"{name}: done", file=sys.stderr, flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=240)
+    parser.add_argument("--rps", type=float, default=5.0)
+    parser.add_argument("--median", type=float, default=0.8, help="stand-in median seconds per call")
+    parser.add_argument("--outlier-rate", type=float, default=0.03)
+    parser.add_argument("--outlier-seconds", type=float, default=20.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.02)
+    parser.add_argument("--lite-median", type=float, default=0.4)
+    parser.add_argument("--percentile", type=float, default=95)
+    parser.add_argument("--max-rate", type=float, default=0.1, help="LLM_HEDGE_MAX_RATE")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    scenario = {
+        "seed": args.seed,
+        "latency": {"dist": "lognormal", "median": args.median, "sigma": 0.3,
+                    "outlier_rate": args.outlier_rate, "outlier_seconds": args.outlier_seconds},
+        "models": {LITE_MODEL: {"latency": {"dist": "lognormal", "median": args.lite_median, "sigma": 0.3}}},
+        "malformed_rate": args.malformed_rate,
+        "context_cache": False,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = start_fake_gemini(args.median, os.path.join(tmp, "scenario.json"))
+        os.environ.update({"GEMINI_API_KEY": "bench", "GEMINI_BASE_URL": f"http://127.0.0.1:{port}",
+                           "LLM_CONTEXT_CACHE": "0", "LOG_REQUESTS": "0"})
+        try:
+            results = asyncio.run(main_async(args, port, scenario))
+        finally:
+            # Cancelled outliers keep the stand-in's graceful shutdown waiting
+            proc.kill()
+            proc.wait(timeout=10)
+
+    print(json.dumps({
+        "requests": args.requests,
+        "rps": args.rps,
+        "median_s": args.median,
+        "outlier_rate": args.outlier_rate,
+        "outlier_seconds": args.outlier_seconds,
+        "malformed_rate": args.malformed_rate,
+        "hedge_percentile": args.percentile,
+        "max_hedge_rate": args.max_rate,
+        "modes": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
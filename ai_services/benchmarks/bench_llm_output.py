@@ -0,0 +1,155 @@
+"""
+LLM output extraction: success rate and cost of the shared extractor vs.
+the per-service parsing it replaced.
+
+Usage:
+    python ai_services/benchmarks/bench_llm_output.py [--corpus outputs.jsonl]
+
+The built-in corpus reproduces the shapes seen from Gemini: code fences,
+a sentence before or after the JSON, trailing commas, truncation at the
+token limit, wrapper keys and braces inside answer text. Captured outputs
+can be added as JSON lines of {"schema": "questions|feedback|skills", "text": ...}.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path[:0] = [SRC]
+
+from common.llm_output import LLMOutputError, extract, validate  # noqa: E402
+from common.llm_schemas import Feedback, QuestionList, ResumeSkills  # noqa: E402
+
+SCHEMAS = {"questions": QuestionList, "feedback": Feedback, "skills": ResumeSkills}
+
+QUESTIONS = [
+    {
+        "question_id": number,
+        "question": f"Scenario {number}: a service returns {{\"status\": \"ok\"}} but clients time out. How do you debug it?",
+        "difficulty": difficulty,
+        "skill_area": "Node.js",
+    }
+    for number, difficulty in enumerate(["Easy", "Easy", "Medium", "Medium", "Hard"], start=1)
+]
+FEEDBACK = {
+    "feedback": "Clear structure. You mentioned {caching} without saying where it lives.",
+    "strengths": ["Clear structure", "Relevant example"],
+    "improvements": ["Discuss trade-offs"],
+    "emotion_improvements": ["Keep a steady pace"],
+    "score": 72,
+}
+SKILLS = {"tech_skills": ["Python", "React"], "soft_skills": ["Teamwork"], "projects": ["Chat app (WebSockets)"]}
+
+
+def _messy(payload):
+    body = json.dumps(payload, indent=2)
+    compact = json.dumps(payload)
+    variants = {
+        "clean": body,
+        "fenced": f"```json\n{body}\n```",
+        "fenced_bare": f"```\n{body}\n```",
+        "preamble": f"Sure! Here is the JSON you asked for:\n{body}",
+        "postscript": f"{body}\n\nLet me know if you need [more] detail.",
+        "fenced_chatter": f"Here you go:\n```json\n{body}\n```\nNote: scores are out of 100.",
+        "trailing_comma": re.sub(r"(\S)(\n\s*[}\]])", r"\1,\2", body, count=2),
+        "compact": compact,
+        "truncated": body[: int(len(body) * 0.93)],
+    }
+    return variants
+
+
+def build_corpus():
+    corpus = []
+    for schema, payload in (("questions", QUESTIONS), ("feedback", FEEDBACK), ("skills", SKILLS)):
+        for shape, text in _messy(payload).items():
+            corpus.append({"schema": schema, "shape": shape, "text": text})
+    wrapped = json.dumps({"questions": QUESTIONS + [dict(QUESTIONS[0], question_id=6)]}, indent=2)
+    corpus.append({"schema": "questions", "shape": "wrapped", "text": wrapped})
+    corpus.append({"schema": "questions", "shape": "truncated_extra", "text": wrapped[: int(len(wrapped) * 0.95)]})
+    return corpus
+
+
+# --- parsing as it was done before the shared extractor --------------------
+
+def legacy_questions(text):
+    raw = re.sub(r"|```", "", text.strip()).strip()
+    try:
+        result = json.loads(raw)
+        if isinstance(result, dict) and "questions" in result:
+            return result["questions"]
+        return result if isinstance(result, list) else [result]
+    except json.JSONDecodeError:
+        pass
+    objects = re.findall(r"\{[\s\S]*?\}", raw)
+    if not objects:
+        raise ValueError("no JSON")
+    return json.loads("[" + ",".join(objects) + "]")
+
+
+def legacy_feedback(text):
+    return json.loads(re.sub(r"```json|```", "", text.strip()).strip())
+
+
+def legacy_skills(text):
+    output = text.strip()
+    if output.startswith("```json"):
+        output = output[7:]
+    elif output.startswith("```"):
+        output = output[3:]
+    if output.endswith("```"):
+        output = output[:-3]
+    return json.loads(output.strip())
+
+
+LEGACY = {"questions": legacy_questions, "feedback": legacy_feedback, "skills": legacy_skills}
+
+
+def _legacy_ok(item):
+    try:
+        validate(LEGACY[item["schema"]](item["text"]), SCHEMAS[item["schema"]])
+        return True
+    except Exception:
+        return False
+
+
+def _extract_ok(item):
+    try:
+        extract(item["text"], SCHEMAS[item["schema"]], source="bench")
+        return True
+    except LLMOutputError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="extra JSON-lines corpus of captured model outputs")
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus += [dict(json.loads(line), shape="captured") for line in f if line.strip()]
+
+    print(f"{'schema':<10} {'shape':<16} {'legacy':>7} {'extract':>8}")
+    for item in corpus:
+        print(f"{item['schema']:<10} {item['shape']:<16} {'ok' if _legacy_ok(item) else 'FAIL':>7} {'ok' if _extract_ok(item) else 'FAIL':>8}")
+
+    legacy_ok = sum(_legacy_ok(item) for item in corpus)
+    extract_ok = sum(_extract_ok(item) for item in corpus)
+    runs = 50
+    legacy_s = min(timeit.repeat(lambda: [_legacy_ok(item) for item in corpus], number=runs, repeat=3)) / runs / len(corpus)
+    extract_s = min(timeit.repeat(lambda: [_extract_ok(item) for item in corpus], number=runs, repeat=3)) / runs / len(corpus)
+    print(json.dumps({
+        "outputs": len(corpus),
+        "legacy_success_rate": round(legacy_ok / len(corpus), 3),
+        "extract_success_rate": round(extract_ok / len(corpus), 3),
+        "legacy_us_per_output": round(legacy_s * 1e6, 1),
+        "extract_us_per_output": round(extract_s * 1e6, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+LLM scheduler: interactive latency under a background flood against a quota.
+
+Usage:
+    python ai_services/benchmarks/bench_llm_scheduler.py [--duration 20] [--interactive-rps 2]
+                                                         [--background-workers 24] [--latency 0.5]
+                                                         [--quota-rpm 600] [--capacity 8]
+
+Starts the local Gemini stand-in with a --quota-rpm token bucket (calls
+over it get a fast 429) and a --capacity after which latency stretches,
+then drives common.llm in-process for --duration seconds per mode:
+
+    interactive_only  Poisson feedback calls at --interactive-rps
+    unscheduled       the same plus --background-workers looping resume
+                      calls, scheduler off (no bucket, no limit): the
+                      behaviour before it existed
+    fifo              scheduler on, but the flood in the interactive
+                      class, so everyone queues in arrival order
+    priority          scheduler on, flood in the "background" class
+
+Reports interactive p50/p99 and errors, background calls per minute,
+429s seen by the stand-in and the scheduler's final concurrency limit.
+With priorities, interactive p99 should stay close to interactive_only.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, "..", "src"), HERE]
+
+import httpx  # noqa: E402
+
+from bench_tiered_extraction import start_fake_gemini  # noqa: E402
+
+FEEDBACK_PROMPT = "Give feedback on this interview answer: I would add an index on the report's join columns."
+RESUME_PROMPT = "You are a resume analyzer. Extract skills from: Python, FastAPI, Docker; built an interview platform."
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def interactive_load(llm, duration, rps, rng, latencies, errors):
+    async def one():
+        started = time.perf_counter()
+        try:
+            await llm.generate(FEEDBACK_PROMPT, service="feedback", deadline=10)
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            errors.append(time.perf_counter() - started)
+
+    tasks = []
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(rng.expovariate(rps))
+    await asyncio.gather(*tasks)
+
+
+async def background_worker(llm, priority, stop, counts):
+    while not stop.is_set():
+        try:
+            await llm.generate(RESUME_PROMPT, service="resume", priority=priority)
+            counts["ok"] += 1
+        except Exception:
+            counts["errors"] += 1
+            await asyncio.sleep(0.1)
+
+
+async def run_mode(llm, llm_scheduler, admin, scenario, name, scheduler, background, args):
+    # Fresh stand-in bucket and counters, fresh breaker, this mode's scheduler
+    await admin.post("/__scenario", json=scenario)
+    llm.breaker = llm.CircuitBreaker(threshold=5, cooldown=30.0)
+    llm_scheduler.scheduler = scheduler
+    latencies, errors, counts = [], [], {"ok": 0, "errors": 0}
+    stop = asyncio.Event()
+    workers = [asyncio.create_task(background_worker(llm, background, stop, counts))
+               for _ in range(args.background_workers if background else 0)]
+    started = time.perf_counter()
+    await interactive_load(llm, args.duration, args.interactive_rps, random.Random(args.seed), latencies, errors)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*workers)
+    stats = (await admin.get("/__stats")).json()
+    snapshot = scheduler.snapshot()
+    return {
+        "mode": name,
+        "interactive": {
+            "calls": len(latencies) + len(errors),
+            "p50_s": round(percentile(latencies, 0.5), 3) if latencies else None,
+            "p99_s": round(percentile(latencies, 0.99), 3) if latencies else None,
+            "errors": len(errors),
+            "mean_queue_wait_s": round(snapshot["classes"]["interactive"]["wait_seconds"]
+                                       / max(1, snapshot["classes"]["interactive"]["admitted"]), 3),
+        },
+        "background_per_minute": round(counts["ok"] / elapsed * 60, 1) if background else None,
+        "background_errors": counts["errors"] if background else None,
+        "upstream_requests": stats["requests"],
+        "upstream_429s": stats["throttled"],
+        "upstream_peak_in_flight": stats["peak_in_flight"],
+        "final_limit": snapshot["limit"] if scheduler.rate else None,
+        "limit_decreases": snapshot["decreases"],
+    }
+
+
+async def main_async(args, port, scenario):
+    from common import llm, llm_scheduler
+
+    def scheduled():
+        return llm_scheduler.Scheduler(rpm=args.quota_rpm, burst=args.quota_burst, min_concurrency=1,
+                                       max_concurrency=args.max_concurrency, latency_target=args.latency * 4)
+
+    modes = [
+        ("interactive_only", scheduled(), None),
+        ("unscheduled", llm_scheduler.Scheduler(rpm=0, max_concurrency=10_000, latency_target=0), "interactive"),
+        ("fifo", scheduled(), "interactive"),
+        ("priority", scheduled(), "background"),
+    ]
+    results = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as admin:
+        for name, scheduler, background in modes:
+            # common.llm logs every failed attempt; keep stdout for the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results.append(await run_mode(llm, llm_scheduler, admin, scenario, name, scheduler, background, args))
+            print(f"{name}: done", file=sys.stderr, flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per mode")
+    parser.add_argument("--interactive-rps", type=float, default=2.0)
+    parser.add_argument("--background-workers", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.5, help="stand-in median seconds per call")
+    parser.add_argument("--quota-rpm", type=float, default=600)
+    parser.add_argument("--quota-burst", type=float, default=10)
+    parser.add_argument("--capacity", type=int, default=8, help="stand-in calls before latency stretches")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="scheduler LLM_MAX_CONCURRENCY")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    scenario = {
+        "latency": {"dist": "lognormal", "median": args.latency, "sigma": 0.2},
+        "context_cache": False,
+        "quota": {"rpm": args.quota_rpm, "burst": args.quota_burst},
+        "capacity": args.capacity,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = start_fake_gemini(args.latency, os.path.join(tmp, "scenario.json"))
+        os.environ.update({"GEMINI_API_KEY": "bench", "GEMINI_BASE_URL": f"http://127.0.0.1:{port}",
+                           "LLM_CONTEXT_CACHE": "0"})
+        try:
+            results = asyncio.run(main_async(args, port, scenario))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(json.dumps({
+        "duration_s": args.duration,
+        "interactive_rps": args.interactive_rps,
+        "background_workers": args.background_workers,
+        "latency_s": args.latency,
+        "quota_rpm": args.quota_rpm,
+        "capacity": args.capacity,
+        "modes": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Cost of the request instrumentation: per-stage timers, the metrics
+middleware and a /metrics scrape.
+
+Usage:
+    python ai_services/benchmarks/bench_metrics.py [--requests 5000] [--stages 200000]
+
+Requests are driven straight through the ASGI interface (no sockets), once
+against a bare FastAPI app and once against the same app with
+``metrics.install``, so the difference is what the middleware adds to
+every request. Access logging is switched off for the timing because its
+cost is one stdout write, not instrumentation.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ["LOG_REQUESTS"] = "0"
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path[:0] = [SRC]
+
+from fastapi import FastAPI  # noqa: E402
+
+from common import metrics  # noqa: E402
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def item(item_id: int):
+        with metrics.stage("prompt_build"):
+            pass
+        return {"id": item_id}
+
+    if instrumented:
+        metrics.install(app, "bench")
+    return app
+
+
+async def drive(app, count: int, path: str = "/api/items/7") -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm-up
+        await app(dict(scope), receive, send)
+    started = time.process_time()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--stages", type=int, default=200000)
+    args = parser.parse_args()
+
+    started = time.process_time()
+    for _ in range(args.stages):
+        with metrics.stage("keyword_scan"):
+            pass
+    stage_cpu = time.process_time() - started
+
+    started = time.process_time()
+    for _ in range(args.stages):
+        time.perf_counter()
+    bare_cpu = time.process_time() - started
+
+    bare = asyncio.run(drive(make_app(False), args.requests))
+    instrumented = asyncio.run(drive(make_app(True), args.requests))
+
+    # A realistic scrape: every stage and a few routes per status
+    for name in ("pdf_parse", "keyword_scan", "prompt_build", "llm_call", "llm_first_chunk", "json_parse", "fallback"):
+        metrics.observe_stage(name, 0.01)
+    for route in ("/api/a", "/api/b", "/api/c", "/api/d"):
+        for status in ("200", "422", "500"):
+            metrics.HTTP_SECONDS.observe(("bench", "POST", route, status), 0.1)
+    started = time.process_time()
+    for _ in range(200):
+        text = metrics.render()
+    render_cpu = (time.process_time() - started) / 200
+
+    print(json.dumps({
+        "stage_timer_us": round((stage_cpu - bare_cpu) / args.stages * 1e6, 2),
+        "request_us": {
+            "bare": round(bare / args.requests * 1e6, 1),
+            "instrumented": round(instrumented / args.requests * 1e6, 1),
+            "middleware_overhead": round((instrumented - bare) / args.requests * 1e6, 1),
+        },
+        "scrape": {"ms": round(render_cpu * 1000, 2), "lines": text.count("\n"), "bytes": len(text)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+PDF extraction latency and peak memory over small, typical and pathological PDFs.
+
+Usage:
+    python ai_services/benchmarks/bench_pdf_parser.py
+
+PDFs are generated in memory so the benchmark needs no fixtures.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path[:0] = [SRC, os.path.join(SRC, "resume_analyzer")]
+
+from utils.pdf_parser import extract_text_from_pdf  # noqa: E402
+
+LINE = "Built REST APIs with Python, FastAPI and PostgreSQL; led a team of four engineers."
+
+
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """Build a minimal multi-page text PDF."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        body = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({LINE}) '" for _ in range(lines_per_page)) + " ET"
+        stream = body.encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def measure(data: bytes, **kwargs):
+    tracemalloc.start()
+    started = time.perf_counter()
+    text = extract_text_from_pdf(data, **kwargs)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(text)
+
+
+def main():
+    cases = [("small", 1), ("typical", 3), ("pathological", 300)]
+    print(f"{'case':<14} {'pages':>6} {'mode':<12} {'ms':>9} {'peak_kb':>9} {'chars':>8}")
+    for name, pages in cases:
+        data = make_pdf(pages)
+        for mode, kwargs in (("budgeted", {}), ("full", {"max_chars": None})):
+            elapsed, peak, chars = measure(data, **kwargs)
+            print(f"{name:<14} {pages:>6} {mode:<12} {elapsed * 1000:>9.1f} {peak / 1024:>9.0f} {chars:>8}")
+
+
+if __name__ == "__main__":
+    main()
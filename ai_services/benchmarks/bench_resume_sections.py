@@ -0,0 +1,171 @@
+"""
+Resume section segmentation: throughput, heading accuracy, and what the
+token-budgeted context keeps compared with the old first-2000-characters cut.
+
+Usage:
+    python ai_services/benchmarks/bench_resume_sections.py [--resumes 500] [--pages 1,2,3] [--budget 450]
+
+Resumes are synthetic, with varied heading styles ("SKILLS",
+"Technical Skills:", "S K I L L S", "Skills: Python, Go") and one to three
+pages of experience before the Skills and Projects sections, the layout
+where the old cut lost them. For each page count the script reports:
+
+    us_per_resume       segment() alone, and segment() + build_context()
+    heading_accuracy    share of true sections found with the right name
+                        (and spurious headings per resume)
+    context_tokens      estimated prompt tokens of resume text (4 chars/token)
+    skill_recall        share of the resume's listed skills present in the context
+    project_recall      share of project titles present in the context
+    local_projects      share of project titles found by project_titles()
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+sys.path[:0] = [SRC, os.path.join(SRC, "resume_analyzer")]
+
+from common.skill_vocabulary import SOFT_SKILLS, TECH_SKILLS  # noqa: E402
+from utils.resume_sections import CHARS_PER_TOKEN, build_context, project_titles, segment  # noqa: E402
+
+OLD_CONTEXT_CHARS = 2000
+HEADING_STYLES = [str.upper, str.title, lambda h: h.title() + ":", lambda h: " ".join(h.upper())]
+QUALIFIED = {"summary": "Professional Summary", "skills": "Technical Skills", "experience": "Work Experience",
+             "projects": "Personal Projects", "education": "Education"}
+PROJECT_NAMES = ["Interview Coach", "Budget Tracker", "Chat Relay", "Recipe Finder", "Fleet Monitor",
+                 "Study Planner", "Ticket Triage", "Photo Vault", "Route Optimizer", "Habit Log"]
+VERBS = ["Built", "Designed", "Migrated", "Scaled", "Maintained", "Automated", "Optimised", "Led"]
+OBJECTS = ["the billing pipeline", "an internal search service", "customer-facing dashboards",
+           "the deployment tooling", "a reporting API", "the event ingestion layer"]
+
+
+def heading(rng, name):
+    text = rng.choice([name, QUALIFIED[name]])
+    return rng.choice(HEADING_STYLES)(text)
+
+
+def make_resume(rng, pages):
+    """Returns (text, true section names in order, tech skills, project titles)."""
+    tech = rng.sample(TECH_SKILLS, rng.randint(8, 14))
+    soft = rng.sample(SOFT_SKILLS, 3)
+    projects = rng.sample(PROJECT_NAMES, rng.randint(2, 4))
+    lines = ["Alex Candidate", "alex@example.com | +1 555 0100 | github.com/alex", ""]
+    truth = []
+
+    truth.append("summary")
+    lines += [heading(rng, "summary"),
+              f"Engineer with {rng.randint(3, 12)} years of experience shipping production systems.", ""]
+
+    # Roughly 2500 characters of experience per page
+    truth.append("experience")
+    lines.append(heading(rng, "experience"))
+    size = 0
+    while size < pages * 2500:
+        role = f"{rng.choice(['Senior ', ''])}Software Engineer, Company {rng.randint(1, 99)} ({rng.randint(2010, 2020)}-{rng.randint(2021, 2025)})"
+        bullets = [f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} serving {rng.randint(1, 50)}k users, "
+                   f"cutting latency by {rng.randint(10, 70)}% and saving {rng.randint(1, 9)} engineer-weeks per quarter."
+                   for _ in range(rng.randint(3, 5))]
+        lines += [role, *bullets, ""]
+        size += len(role) + sum(len(bullet) for bullet in bullets)
+
+    truth.append("skills")
+    half = len(tech) // 2
+    if rng.random() < 0.3:
+        lines.append(f"Skills: {', '.join(tech)}")
+    else:
+        lines += [heading(rng, "skills"),
+                  f"Languages and frameworks: {', '.join(tech[:half])}",
+                  f"Tools: {', '.join(tech[half:])}"]
+    lines += [f"Soft skills: {', '.join(soft)}", ""]
+
+    truth.append("projects")
+    lines.append(heading(rng, "projects"))
+    for name in projects:
+        lines += [f"- {name} - built with {rng.choice(tech)} and {rng.choice(tech)}",
+                  f"  {rng.choice(VERBS)} {rng.choice(OBJECTS)} as a side project used by friends and classmates."]
+    lines.append("")
+
+    truth.append("education")
+    lines += [heading(rng, "education"), "B.Sc. Computer Science, State University (2014)"]
+    return "\n".join(lines), truth, tech, projects
+
+
+def heading_accuracy(sections, truth):
+    """Share of true sections found under the right name, and headings found that are not in the resume."""
+    found = [section.name for section in sections if section.heading]
+    return sum(name in found for name in truth) / len(truth), max(0, len(found) - len(truth))
+
+
+def recall(items, context):
+    folded = context.casefold()
+    return sum(item.casefold() in folded for item in items) / len(items)
+
+
+def measure(corpus, budget):
+    started = time.process_time()
+    for text, *_ in corpus:
+        segment(text)
+    segment_only = time.process_time() - started
+
+    started = time.process_time()
+    contexts = [build_context(segment(text), budget) for text, *_ in corpus]
+    with_context = time.process_time() - started
+
+    stats = {"accuracy": [], "spurious": [], "new_tokens": [], "old_tokens": [], "new_skills": [], "old_skills": [],
+             "new_projects": [], "old_projects": [], "local_projects": []}
+    for (text, truth, tech, projects), context in zip(corpus, contexts):
+        sections = segment(text)
+        old = text[:OLD_CONTEXT_CHARS]
+        accuracy, spurious = heading_accuracy(sections, truth)
+        stats["accuracy"].append(accuracy)
+        stats["spurious"].append(spurious)
+        stats["new_tokens"].append(len(context) / CHARS_PER_TOKEN)
+        stats["old_tokens"].append(len(old) / CHARS_PER_TOKEN)
+        stats["new_skills"].append(recall(tech, context))
+        stats["old_skills"].append(recall(tech, old))
+        stats["new_projects"].append(recall(projects, context))
+        stats["old_projects"].append(recall(projects, old))
+        titles = project_titles(sections)
+        stats["local_projects"].append(sum(name in titles for name in projects) / len(projects))
+    mean = {key: round(statistics.fmean(values), 3) for key, values in stats.items()}
+    total_chars = sum(len(text) for text, *_ in corpus)
+    return {
+        "avg_chars": round(total_chars / len(corpus)),
+        "us_per_resume_segment": round(segment_only / len(corpus) * 1e6, 1),
+        "us_per_resume_segment_and_context": round(with_context / len(corpus) * 1e6, 1),
+        "segment_mb_per_s": round(total_chars / segment_only / 1e6, 1),
+        "heading_accuracy": mean["accuracy"],
+        "spurious_headings_per_resume": mean["spurious"],
+        "context_tokens": {"first_2000_chars": round(mean["old_tokens"]), "budgeted": round(mean["new_tokens"])},
+        "skill_recall": {"first_2000_chars": mean["old_skills"], "budgeted": mean["new_skills"]},
+        "project_recall": {"first_2000_chars": mean["old_projects"], "budgeted": mean["new_projects"]},
+        "local_projects": mean["local_projects"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--pages", default="1,2,3", help="pages of experience before the Skills section")
+    parser.add_argument("--budget", type=int, default=None, help="RESUME_CONTEXT_TOKENS")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    from utils.resume_sections import CONTEXT_TOKENS
+
+    budget = args.budget or CONTEXT_TOKENS
+    rng = random.Random(args.seed)
+    results = {}
+    for pages in (int(value) for value in args.pages.split(",")):
+        corpus = [make_resume(rng, pages) for _ in range(args.resumes)]
+        results[f"{pages}_page_experience"] = measure(corpus, budget)
+    print(json.dumps({"resumes": args.resumes, "budget_tokens": budget, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
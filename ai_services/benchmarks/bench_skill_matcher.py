@@ -0,0 +1,97 @@
+"""
+Skill matcher scan cost vs. vocabulary size.
+
+Usage:
+    python ai_services/benchmarks/bench_skill_matcher.py
+
+The scan time per resume should stay flat while the vocabulary grows
+from the shipped ~200 entries to several thousand. The separator cases
+check that joiners count only inside a word: "React. JS" is a sentence
+break, while "CI/CD" and "C/C++" tokenize the same way everywhere. The
+case cases check that names which are also English words ("rest",
+"express", "node") match only as spelled. The script exits with status 1
+if any case fails.
+"""
+import os
+import sys
+import timeit
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path[:0] = [SRC, os.path.join(SRC, "resume_analyzer")]
+
+from utils.skill_matcher import (  # noqa: E402
+    CASE_SENSITIVE_SKILLS, MATCHER, SKILL_ALIASES, SOFT_SKILLS, TECH_SKILLS, SkillMatcher,
+)
+
+# (text, skills expected in order of mention)
+SEPARATOR_CASES = [
+    ("React.js", ["React"]),
+    ("React JS", ["React"]),
+    ("Built in React. JS tooling came later", ["React", "JavaScript"]),
+    ("Node.js and node js", ["Node.js"]),
+    ("Shipped in Node. Then Python.", ["Node.js", "Python"]),
+    ("CI/CD pipelines", ["CI/CD"]),
+    ("Kubernetes, CI/CD, Docker", ["Kubernetes", "CI/CD", "Docker"]),
+    ("C/C++ and C#", ["C++", "C#"]),
+    ("C++/C# interop", ["C++", "C#"]),
+    ("Python/Django, Scikit-learn", ["Python", "Django", "Scikit-learn"]),
+    ("AR/VR prototypes", ["AR/VR"]),
+    ("OAuth 2.0", ["OAuth2"]),
+]
+
+# Aliases and names that are also English words match only as spelled
+CASE_CASES = [
+    ("I took the rest of the year off", []),
+    ("Built a REST backend; REST APIs", ["REST API"]),
+    ("I like to express my ideas clearly", []),
+    ("Express, Node, Vue, Mongo, Rails, Spark", ["Express.js", "Node.js", "Vue.js", "MongoDB", "Ruby on Rails", "Apache Spark"]),
+    ("We went to the node and back", []),
+    ("To spark interest, off the rails", []),
+    ("A swift reply, rust on the oracle", []),
+    ("Swift, Rust and Oracle", ["Swift", "Rust", "Oracle"]),
+    ("NODE and REST", ["Node.js", "REST API"]),
+    ("node.js and express.js", ["Node.js", "Express.js"]),
+]
+
+RESUME = """
+Jane Doe - Full Stack Engineer
+Skills: Python, JavaScript, ReactJS, Node, Express, PostgreSQL, Docker, Kubernetes, AWS, CI/CD
+Experience: Built microservices with FastAPI and Django; deployed on Google Cloud with Terraform.
+Led a team of 4, mentoring juniors. Strong communication, problem solving and time management.
+Projects: Real-time chat using WebSockets and Redis; ML pipeline with Pandas, NumPy and PyTorch.
+""" * 8
+
+
+def synthetic_vocabulary(size):
+    return [f"Framework{i} Toolkit" if i % 2 else f"Lang{i}" for i in range(size)]
+
+
+def check_separators() -> bool:
+    print(f"{'text':<40} {'result':>7}  skills")
+    passed = True
+    for text, expected in SEPARATOR_CASES + CASE_CASES:
+        found = MATCHER.detect(text).get("tech", [])
+        passed &= found == expected
+        print(f"{text:<40} {'ok' if found == expected else 'FAIL':>7}  {found}")
+    return passed
+
+
+def main():
+    passed = check_separators()
+    print()
+    print(f"resume length: {len(RESUME)} chars")
+    print(f"{'vocab':>8} {'index':>8} {'scan_us':>10}")
+    for extra in (0, 1000, 5000, 20000):
+        matcher = SkillMatcher(
+            {"tech": TECH_SKILLS + synthetic_vocabulary(extra), "soft": SOFT_SKILLS},
+            SKILL_ALIASES,
+            CASE_SENSITIVE_SKILLS,
+        )
+        runs = 200
+        seconds = min(timeit.repeat(lambda: matcher.scan(RESUME), number=runs, repeat=5)) / runs
+        print(f"{len(TECH_SKILLS) + len(SOFT_SKILLS) + extra:>8} {len(matcher):>8} {seconds * 1e6:>10.1f}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Text-based emotion estimate latency: microseconds per answer.
+
+Usage:
+    python ai_services/benchmarks/bench_text_emotion.py [--answers 2000] [--words 120]
+
+Answers are assembled from interview-style sentences (assertive,
+hedging, filler-heavy and neutral) so every lexicon path is exercised.
+Latency is per answer for the single function and per answer inside a
+batch of 50, which is what /api/text_emotion/batch runs.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "emotion_analyzer")
+sys.path[:0] = [SERVICE]
+
+from utils.text_emotion import analyze_text  # noqa: E402
+
+SENTENCES = [
+    "I would put a queue in front of the workers so spikes do not hit the database.",
+    "Specifically, I built a similar pipeline at my last job and we shipped it in two weeks.",
+    "For example, when traffic doubled we scaled the consumers instead of the API.",
+    "I think maybe a cache could help here, but I'm not sure.",
+    "Um, I guess it kind of depends on the load, you know.",
+    "Basically it is like a hash map or something.",
+    "The trade-off is memory against latency, because every entry stays resident.",
+    "Then the results are merged and sorted before they are returned.",
+    "Lookups are constant time on average.",
+]
+
+
+def make_answer(rng, words):
+    parts, count = [], 0
+    while count < words:
+        sentence = rng.choice(SENTENCES)
+        parts.append(sentence)
+        count += len(sentence.split())
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=120)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    answers = [make_answer(rng, args.words) for _ in range(args.answers)]
+    analyze_text(answers[0])  # warm-up
+
+    started = time.process_time()
+    results = [analyze_text(answer) for answer in answers]
+    single = time.process_time() - started
+
+    started = time.process_time()
+    for start in range(0, len(answers), 50):
+        [analyze_text(answer) for answer in answers[start:start + 50]]
+    batched = time.process_time() - started
+
+    emotions = {}
+    for result in results:
+        emotions[result["predominantEmotion"]] = emotions.get(result["predominantEmotion"], 0) + 1
+    print(json.dumps({
+        "answers": len(answers),
+        "avg_words": round(sum(result["textFeatures"]["words"] for result in results) / len(results)),
+        "us_per_answer": round(single / len(answers) * 1e6, 1),
+        "us_per_answer_batch_50": round(batched / len(answers) * 1e6, 1),
+        "answers_per_second": round(len(answers) / single),
+        "predominant_emotions": emotions,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Tiered skill extraction on a resume corpus: how often Gemini is skipped,
+what that saves in latency, and what the local result misses.
+
+Usage:
+    python ai_services/benchmarks/bench_tiered_extraction.py [--resumes 80] [--latency 0.8] [--threshold 0.85]
+
+The corpus is synthetic, in four styles (equal shares):
+
+    formatted   Skills section of vocabulary terms, experience bullets, Projects section
+    off_vocab   same layout, but a third of the listed skills are not in the vocabulary
+    prose       a paragraph summary, skills mentioned inline, no sections
+    no_projects formatted, without a Projects section
+
+Each resume goes through ``extract_skills_with_status`` three times: with
+the LLM always called (the old behaviour), tiered, and tiered with
+RESUME_LLM_FOR_PROJECTS=0 (missing projects alone do not trigger a call),
+against the local Gemini stand-in with a constant ``--latency``. For the resumes the
+tiered run answered locally, recall is the share of the resume's true
+skills that the local result contains.
+
+The local pass runs in whichever mode the environment gives it: list
+items only by default, plus spaCy noun chunks when RESUME_SPACY_MODEL is
+set and installed ("spacy_model" in the report). Default mode, 80 resumes,
+0.8 s latency: 25% of Gemini calls skipped (every formatted resume, none
+of the others), 75% with RESUME_LLM_FOR_PROJECTS=0, local recall 1.0.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+sys.path[:0] = [SRC, os.path.join(SRC, "resume_analyzer")]
+
+from common.skill_vocabulary import SOFT_SKILLS, TECH_SKILLS  # noqa: E402
+
+OFF_VOCAB = ["Svelte", "Elixir", "Phoenix", "ClickHouse", "Nomad", "Deno", "Remix", "Prisma", "tRPC", "Zig",
+             "Pulumi", "Grafana", "Prometheus", "Celery", "RabbitMQ", "Vite", "Astro", "Supabase"]
+ROLES = ["Backend Engineer", "Full Stack Developer", "Data Engineer", "Frontend Developer", "ML Engineer"]
+PROJECT_NAMES = ["Interview Coach", "Budget Tracker", "Chat Relay", "Recipe Finder", "Fleet Monitor", "Study Planner"]
+
+
+def make_resume(rng, style):
+    """Returns (text, true tech skills)."""
+    tech = rng.sample(TECH_SKILLS, rng.randint(6, 12))
+    if style == "off_vocab":
+        tech = tech[: len(tech) * 2 // 3] + rng.sample(OFF_VOCAB, len(tech) // 3)
+    soft = rng.sample(SOFT_SKILLS, 3)
+    role = rng.choice(ROLES)
+    if style == "prose":
+        text = (f"I am a {role.lower()} who enjoys working with {', '.join(tech[:-1])} and {tech[-1]}. "
+                f"Colleagues describe me as strong in {soft[0].lower()} and {soft[1].lower()}. "
+                f"Recently I built {rng.choice(PROJECT_NAMES).lower()} tooling for my team.\n")
+        return text, tech
+    half = len(tech) // 2
+    lines = [
+        "Alex Candidate", role, "",
+        "SKILLS",
+        f"Languages and frameworks: {', '.join(tech[:half])}",
+        f"Tools: {', '.join(tech[half:])}",
+        f"Soft skills: {', '.join(soft)}",
+        "",
+        "EXPERIENCE",
+        f"{role}, Example Corp (2021-2024)",
+        f"- Built services in {tech[0]} handling {rng.randint(1, 9)}M requests per day.",
+        f"- Introduced {tech[-1]} and cut deploy time by {rng.randint(20, 60)}%.",
+        "",
+    ]
+    if style != "no_projects":
+        lines += ["PROJECTS"] + [f"- {name} - a small app built with {rng.choice(tech)}" for name in rng.sample(PROJECT_NAMES, 2)] + [""]
+    lines += ["EDUCATION", "B.Sc. Computer Science"]
+    return "\n".join(lines), tech
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_gemini(latency, scenario_path):
+    with open(scenario_path, "w") as f:
+        json.dump({"latency": {"dist": "constant", "seconds": latency}, "context_cache": False}, f)
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "fake_gemini.py"), "--port", str(port), "--scenario", scenario_path],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("fake Gemini did not start")
+
+
+def run(corpus, skill_extractor, threshold, for_projects=True):
+    skill_extractor.LLM_CONFIDENCE = threshold
+    skill_extractor.LLM_FOR_PROJECTS = for_projects
+    latencies, bypassed, recalls, per_style = [], 0, [], {}
+    for style, text, truth in corpus:
+        before = skill_extractor.path_stats()["local"]
+        started = time.perf_counter()
+        result, _ = skill_extractor.extract_skills_with_status(text)
+        latencies.append(time.perf_counter() - started)
+        local = skill_extractor.path_stats()["local"] > before
+        bypassed += local
+        per_style.setdefault(style, [0, 0])
+        per_style[style][0] += local
+        per_style[style][1] += 1
+        if local:
+            found = {skill.casefold() for skill in result["tech_skills"]}
+            recalls.append(sum(skill.casefold() in found for skill in truth) / len(truth))
+    latencies.sort()
+    return {
+        "bypass_rate": round(bypassed / len(corpus), 3),
+        "bypass_by_style": {style: f"{local}/{total}" for style, (local, total) in per_style.items()},
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1),
+        "llm_calls": len(corpus) - bypassed,
+        "local_recall": round(statistics.fmean(recalls), 3) if recalls else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.8, help="fake Gemini seconds per call")
+    parser.add_argument("--threshold", type=float, default=None, help="RESUME_LLM_CONFIDENCE for the tiered run")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    styles = ["formatted", "off_vocab", "prose", "no_projects"]
+    corpus = [(style, *make_resume(rng, style)) for style in (styles[i % len(styles)] for i in range(args.resumes))]
+
+    scenario = os.path.join(HERE, ".tiered_scenario.json")
+    proc, port = start_fake_gemini(args.latency, scenario)
+    os.environ.update({"GEMINI_API_KEY": "bench", "GEMINI_BASE_URL": f"http://127.0.0.1:{port}",
+                       "LOG_REQUESTS": "0", "LLM_CONTEXT_CACHE": "0"})
+    try:
+        from utils import local_extractor, skill_extractor
+
+        threshold = args.threshold if args.threshold is not None else skill_extractor.LLM_CONFIDENCE
+        always = run(corpus, skill_extractor, threshold=2.0)
+        tiered = run(corpus, skill_extractor, threshold=threshold)
+        skills_only = run(corpus, skill_extractor, threshold=threshold, for_projects=False)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        os.remove(scenario)
+
+    print(json.dumps({
+        "resumes": len(corpus),
+        "llm_latency_s": args.latency,
+        "threshold": threshold,
+        "spacy_model": local_extractor.SPACY_MODEL if local_extractor._load_spacy() else None,
+        "always_llm": always,
+        "tiered": tiered,
+        "tiered_skills_only": skills_only,
+        "mean_latency_saved": f"{1 - tiered['mean_ms'] / always['mean_ms']:.0%}",
+        "mean_latency_saved_skills_only": f"{1 - skills_only['mean_ms'] / always['mean_ms']:.0%}",
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Video frame pipeline throughput: frames/sec and per-frame latency.
+
+Usage:
+    python ai_services/benchmarks/bench_video_pipeline.py [--seconds 120] [--clip interview.mp4]
+
+The reference clip is synthetic unless --clip is given (decoding a real
+file needs OpenCV): 640x480 frames at the pipeline's decode rate
+(EMOTION_SAMPLE_FPS) showing a skin-toned face that drifts, smiles and
+holds still for stretches, so adaptive sampling has something to skip.
+``interviews_per_core`` is how many live interviews one core keeps up
+with at that decode rate.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "emotion_analyzer")
+sys.path[:0] = [SERVICE]
+
+from utils import video_processing  # noqa: E402
+from utils.video_processing import SAMPLE_FPS, analyze_array, analyze_frames, analyze_video, summarize  # noqa: E402
+
+HEIGHT, WIDTH = 480, 640
+
+
+def reference_clip(seconds: float, fps: float = SAMPLE_FPS, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    count = int(seconds * fps)
+    ys, xs = np.mgrid[0:HEIGHT, 0:WIDTH]
+    background = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    background[...] = (70, 90, 120)
+    frames = np.empty((count, HEIGHT, WIDTH, 3), dtype=np.uint8)
+    center_x, center_y = WIDTH / 2, HEIGHT * 0.45
+    for index in range(count):
+        # Hold still for a third of the time, otherwise drift a little
+        if (index // 20) % 3:
+            center_x = np.clip(center_x + rng.normal(0, 6), WIDTH * 0.3, WIDTH * 0.7)
+            center_y = np.clip(center_y + rng.normal(0, 4), HEIGHT * 0.3, HEIGHT * 0.6)
+        frame = background.copy()
+        face = ((xs - center_x) / 95) ** 2 + ((ys - center_y) / 125) ** 2 <= 1
+        frame[face] = (205, 150, 125)
+        mouth = face & (np.abs(ys - (center_y + 70)) < 10) & (np.abs(xs - center_x) < 40)
+        frame[mouth] = (245, 240, 235) if (index // 15) % 4 == 0 else (150, 90, 80)
+        if (index // 20) % 3:
+            frame = np.clip(frame + rng.integers(-6, 7, frame.shape), 0, 255).astype(np.uint8)
+        frames[index] = frame
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=120, help="length of the synthetic clip")
+    parser.add_argument("--clip", help="real video file (needs OpenCV)")
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    if args.clip:
+        report = {"clip": args.clip}
+        for workers in args.workers:
+            started = time.perf_counter()
+            result = analyze_video(args.clip, workers=workers)
+            elapsed = time.perf_counter() - started
+            report[f"workers_{workers}"] = {
+                "frames_decoded": result["frames"],
+                "frames_analyzed": result["analyzed"],
+                "fps": round(result["frames"] / elapsed, 1),
+            }
+        print(json.dumps(report, indent=2))
+        return
+
+    frames = reference_clip(args.seconds)
+    analyze_frames(frames[:8])  # warm-up
+
+    # Latency of one browser-sized batch (5 s of video)
+    batch = frames[: int(5 * SAMPLE_FPS)]
+    runs = 20
+    started = time.perf_counter()
+    for _ in range(runs):
+        analyze_frames(batch)
+    batch_ms = (time.perf_counter() - started) / runs * 1000
+
+    started = time.process_time()
+    result = analyze_frames(frames)
+    cpu = time.process_time() - started
+    report = {
+        "clip_seconds": args.seconds,
+        "frames": result["frames"],
+        "frames_analyzed": result["analyzed"],
+        "skipped_share": round(1 - result["analyzed"] / result["frames"], 3),
+        "single_core_fps": round(result["frames"] / cpu, 1),
+        "per_frame_ms": round(cpu / result["frames"] * 1000, 2),
+        "batch_5s_latency_ms": round(batch_ms, 1),
+        "interviews_per_core": round(result["frames"] / cpu / SAMPLE_FPS, 1),
+        "summary": {key: value for key, value in summarize(result["samples"]).items() if key.startswith("avg") or key == "predominantEmotion"},
+    }
+    for workers in args.workers:
+        if workers <= 1:
+            continue
+        video_processing.WORKERS = workers
+        video_processing._pool = None
+        analyze_array(frames[: 2 * video_processing.CHUNK_FRAMES], workers=workers)  # start the pool
+        started = time.perf_counter()
+        analyze_array(frames, workers=workers)
+        report[f"workers_{workers}_fps"] = round(len(frames) / (time.perf_counter() - started), 1)
+        video_processing._get_pool().shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
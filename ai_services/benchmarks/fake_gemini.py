@@ -0,0 +1,349 @@
+"""
+Local stand-in for the Gemini ``generateContent`` REST endpoint.
+
+Usage:
+    python ai_services/benchmarks/fake_gemini.py [--port 9100] [--scenario scenario.json]
+
+Point the services at it with ``GEMINI_BASE_URL=http://127.0.0.1:9100``.
+
+A scenario controls the behaviour (every key is optional):
+
+    {
+        "seed": 1,
+        "latency": {"dist": "lognormal", "median": 0.8, "sigma": 0.4,
+                    "outlier_rate": 0.01, "outlier_seconds": 20},
+        "error_rate": 0.02,              # fraction answered with an HTTP error
+        "error_codes": [429, 500, 503],
+        "markdown_rate": 0.3,            # wrap JSON in ```json fences
+        "malformed_rate": 0.05,          # truncate the JSON payload
+        "context_cache": true,           # false answers cachedContents creation with 400
+        "quota": {"rpm": 120, "burst": 10},  # token bucket; calls over it get a fast 429
+        "capacity": 8,                   # concurrent calls before latency stretches
+        "models": {"gemini-2.5-flash-lite": {"latency": {...}}},  # per-model latency override
+        "canned": {"questions": [...], "feedback": {...}, "skills": {...}}
+    }
+
+Latency distributions: "constant" (seconds), "uniform" (low, high),
+"lognormal" (median, sigma). Responses are picked from canned JSON by
+sniffing the prompt. ``streamGenerateContent`` sends the same text as
+SSE chunks, with the first chunk after 20% of the sampled latency.
+POST /v1beta/cachedContents registers a context cache; requests naming
+it get ``cachedContentTokenCount`` in their usage metadata, and an
+unknown cache name is answered with 404. With a "quota", generate calls
+beyond the bucket are answered 429 RESOURCE_EXHAUSTED after 20 ms; with
+a "capacity", each call's latency is multiplied by in-flight / capacity
+once more calls than that are running. GET /__stats returns request,
+token and cache counters; POST /__scenario replaces the scenario at runtime.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED = {
+    "questions": [
+        {"question_id": 1, "question": "How would you debounce a search input in React?", "difficulty": "Easy", "skill_area": "React"},
+        {"question_id": 2, "question": "Explain the Node.js event loop phases.", "difficulty": "Easy", "skill_area": "Node.js"},
+        {"question_id": 3, "question": "Design an index strategy for a slow PostgreSQL report query.", "difficulty": "Medium", "skill_area": "SQL"},
+        {"question_id": 4, "question": "How would you paginate a large MongoDB collection efficiently?", "difficulty": "Medium", "skill_area": "MongoDB"},
+        {"question_id": 5, "question": "Design a rate limiter shared by several API servers.", "difficulty": "Hard", "skill_area": "System Design"},
+    ],
+    "feedback": {
+        "feedback": "Solid answer with a clear structure; your calm delivery helped.",
+        "strengths": ["Clear structure", "Relevant example"],
+        "improvements": ["Discuss trade-offs", "Quantify impact"],
+        "emotion_improvements": ["Keep a steady pace"],
+        "score": 78,
+    },
+    "skills": {
+        "tech_skills": ["Python", "FastAPI", "Docker"],
+        "soft_skills": ["Communication"],
+        "projects": ["Interview platform"],
+    },
+}
+
+STREAM_CHUNK_CHARS = 40
+
+DEFAULT_SCENARIO = {
+    "seed": 1,
+    "latency": {"dist": "constant", "seconds": 0.2},
+    "error_rate": 0.0,
+    "error_codes": [429, 500, 503],
+    "markdown_rate": 0.0,
+    "malformed_rate": 0.0,
+    "context_cache": True,
+    "quota": None,
+    "capacity": None,
+}
+
+THROTTLE_SECONDS = 0.02
+
+
+class FakeGemini:
+    def __init__(self, scenario=None):
+        self.lock = threading.Lock()
+        self.configure(scenario or {})
+
+    def configure(self, scenario):
+        with self.lock:
+            self.scenario = {**DEFAULT_SCENARIO, **scenario}
+            self.canned = {**CANNED, **self.scenario.get("canned", {})}
+            self.random = random.Random(self.scenario["seed"])
+            self.caches = {}
+            self.in_flight = 0
+            quota = self.scenario["quota"]
+            self.quota_tokens = float(quota.get("burst", 1)) if quota else 0.0
+            self.quota_at = time.monotonic()
+            self.stats = {
+                "requests": 0, "errors": 0, "markdown": 0, "malformed": 0, "by_kind": {}, "by_model": {},
+                "prompt_tokens": 0, "cached_tokens": 0, "cache_creates": 0, "cached_requests": 0, "cache_misses": 0,
+                "throttled": 0, "peak_in_flight": 0,
+            }
+
+    def latency(self, model=None):
+        spec = self.scenario.get("models", {}).get(model, {}).get("latency") or self.scenario["latency"]
+        dist = spec.get("dist", "constant")
+        if dist == "uniform":
+            seconds = self.random.uniform(spec.get("low", 0.1), spec.get("high", 1.0))
+        elif dist == "lognormal":
+            seconds = self.random.lognormvariate(math.log(spec.get("median", 0.5)), spec.get("sigma", 0.5))
+        else:
+            seconds = spec.get("seconds", 0.2)
+        if self.random.random() < spec.get("outlier_rate", 0.0):
+            seconds = spec.get("outlier_seconds", 20.0)
+        return seconds
+
+    def _over_quota(self):
+        quota = self.scenario["quota"]
+        if not quota:
+            return False
+        now = time.monotonic()
+        burst = float(quota.get("burst", 1))
+        self.quota_tokens = min(burst, self.quota_tokens + (now - self.quota_at) * quota["rpm"] / 60.0)
+        self.quota_at = now
+        if self.quota_tokens < 1:
+            return True
+        self.quota_tokens -= 1
+        return False
+
+    def finished(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    @staticmethod
+    def classify(prompt):
+        lowered = prompt.lower()
+        if "resume analyzer" in lowered:
+            return "skills"
+        if "skill sets:" in lowered:
+            return "question_batch"
+        if "=== answer " in lowered:
+            return "feedback_batch"
+        if "question_id" in lowered:
+            return "questions"
+        return "feedback"
+
+    def cached_text(self, body):
+        """Text of the cache a request names: "" for none, None if unknown."""
+        name = body.get("cachedContent")
+        if not name:
+            return ""
+        with self.lock:
+            text = self.caches.get(name)
+            if text is None:
+                self.stats["cache_misses"] += 1
+            else:
+                self.stats["cached_requests"] += 1
+                self.stats["cached_tokens"] += _tokens(text)
+            return text
+
+    def plan(self, model, prompt):
+        """
+        Decide latency and outcome for one call (under the lock for a
+        reproducible sequence). The caller must call ``finished`` afterwards.
+        """
+        with self.lock:
+            kind = self.classify(prompt)
+            self.stats["requests"] += 1
+            self.in_flight += 1
+            if self._over_quota():
+                self.stats["throttled"] += 1
+                return THROTTLE_SECONDS, kind, 429, None
+            self.stats["by_kind"][kind] = self.stats["by_kind"].get(kind, 0) + 1
+            self.stats["by_model"][model] = self.stats["by_model"].get(model, 0) + 1
+            self.stats["prompt_tokens"] += _tokens(prompt)
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+            delay = self.latency(model)
+            capacity = self.scenario["capacity"]
+            if capacity and self.in_flight > capacity:
+                delay *= self.in_flight / capacity
+            if self.random.random() < self.scenario["error_rate"]:
+                self.stats["errors"] += 1
+                return delay, kind, self.random.choice(self.scenario["error_codes"]), None
+            if kind == "question_batch":
+                # One question list per numbered skill set in the prompt
+                sets = re.findall(r'^"(\d+)":', prompt, flags=re.MULTILINE)
+                text = json.dumps({number: self.canned["questions"] for number in sets})
+            elif kind == "feedback_batch":
+                answers = re.findall(r"^=== ANSWER (\d+) ===", prompt, flags=re.MULTILINE)
+                text = json.dumps({number: self.canned["feedback"] for number in answers})
+            else:
+                text = json.dumps(self.canned[kind])
+            if self.random.random() < self.scenario["malformed_rate"]:
+                self.stats["malformed"] += 1
+                text = text[: len(text) // 2]
+            if self.random.random() < self.scenario["markdown_rate"]:
+                self.stats["markdown"] += 1
+                text = f"```json\n{text}\n```"
+            return delay, kind, 200, text
+
+
+def _prompt_text(body):
+    parts = []
+    contents = body.get("contents", [])
+    system = body.get("systemInstruction") or body.get("system_instruction")
+    if system:
+        contents = [system, *contents]
+    for content in contents:
+        if isinstance(content, dict):
+            parts.extend(part.get("text", "") for part in content.get("parts", []))
+        elif isinstance(content, str):
+            parts.append(content)
+    return "\n".join(parts)
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+def response_body(text, prompt, cached=""):
+    prompt_tokens = _tokens(prompt) + (_tokens(cached) if cached else 0)
+    output_tokens = _tokens(text)
+    usage = {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": output_tokens,
+        "totalTokenCount": prompt_tokens + output_tokens,
+    }
+    if cached:
+        usage["cachedContentTokenCount"] = _tokens(cached)
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": usage,
+    }
+
+
+def _error(status):
+    reason = "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"
+    return JSONResponse({"error": {"code": status, "message": "injected failure", "status": reason}}, status_code=status)
+
+
+def _cache_not_found(name):
+    return JSONResponse({"error": {"code": 404, "message": f"{name} not found", "status": "NOT_FOUND"}}, status_code=404)
+
+
+def create_app(scenario=None):
+    fake = FakeGemini(scenario)
+    app = FastAPI()
+    app.state.fake = fake
+
+    @app.post("/{version}/models/{model}:generateContent")
+    async def generate_content(version: str, model: str, request: Request):
+        body = await request.json()
+        cached = fake.cached_text(body)
+        if cached is None:
+            return _cache_not_found(body["cachedContent"])
+        prompt = _prompt_text(body)
+        delay, _, status, text = fake.plan(model, f"{cached}\n{prompt}")
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            fake.finished()
+        if status != 200:
+            return _error(status)
+        return response_body(text, prompt, cached)
+
+    @app.post("/{version}/models/{model}:streamGenerateContent")
+    async def stream_generate_content(version: str, model: str, request: Request):
+        body = await request.json()
+        cached = fake.cached_text(body)
+        if cached is None:
+            return _cache_not_found(body["cachedContent"])
+        prompt = _prompt_text(body)
+        delay, _, status, text = fake.plan(model, f"{cached}\n{prompt}")
+        if status != 200:
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                fake.finished()
+            return _error(status)
+        chunks = [text[start:start + STREAM_CHUNK_CHARS] for start in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+
+        async def events():
+            # 20% of the latency before the first token, the rest spread over the chunks
+            try:
+                await asyncio.sleep(delay * 0.2)
+                for number, chunk in enumerate(chunks):
+                    if number:
+                        await asyncio.sleep(delay * 0.8 / len(chunks))
+                    yield f"data: {json.dumps(response_body(chunk, prompt, cached))}\r\n\r\n"
+            finally:
+                fake.finished()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/{version}/cachedContents")
+    async def create_cached_content(version: str, request: Request):
+        body = await request.json()
+        if not fake.scenario["context_cache"]:
+            return JSONResponse({"error": {"code": 400, "message": "context caching is not supported", "status": "INVALID_ARGUMENT"}}, status_code=400)
+        text = _prompt_text(body)
+        with fake.lock:
+            name = f"cachedContents/{len(fake.caches) + 1}"
+            fake.caches[name] = text
+            fake.stats["cache_creates"] += 1
+        ttl = float(str(body.get("ttl", "3600s")).rstrip("s"))
+        expire = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + ttl))
+        return {
+            "name": name,
+            "displayName": body.get("displayName", ""),
+            "model": body.get("model", ""),
+            "expireTime": expire,
+            "usageMetadata": {"totalTokenCount": _tokens(text)},
+        }
+
+    @app.get("/__stats")
+    async def stats():
+        with fake.lock:
+            return json.loads(json.dumps(fake.stats))
+
+    @app.post("/__scenario")
+    async def set_scenario(request: Request):
+        fake.configure(await request.json())
+        return {"status": "ok"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--scenario", help="path to a scenario JSON file")
+    args = parser.parse_args()
+    scenario = {}
+    if args.scenario:
+        with open(args.scenario) as f:
+            scenario = json.load(f)
+    uvicorn.run(create_app(scenario), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
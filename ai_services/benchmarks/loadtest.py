@@ -0,0 +1,248 @@
+"""
+Offline load test for question_generator, feedback_generator and resume_analyzer.
+
+Usage:
+    python ai_services/benchmarks/loadtest.py --rps 20 --duration 30 \\
+        [--scenario scenario.json] [--services question,feedback,resume] [--out results.json]
+
+By default the harness starts the local Gemini stand-in (fake_gemini.py)
+and the three services as subprocesses on free ports, so it needs no
+network access or API quota. Use --no-spawn with --question-url etc. to
+drive services that are already running.
+
+Each service receives an open-loop request stream at the target RPS. The
+report gives throughput, p50/p95/p99 latency, error rate and fallback
+rate per service, and is written as JSON (with the git commit) so runs
+can be compared between commits.
+
+Fallbacks are recognised from the response shape:
+    question  the get_mock_questions() list was served
+    feedback  the raw LLM text was served (score is null)
+    resume    no LLM-only fields were merged (projects is empty)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+sys.path.insert(0, HERE)
+
+from bench_pdf_parser import make_pdf  # noqa: E402
+
+MOCK_QUESTION_PREFIX = "You are tasked with building a web application that allows users to submit text prompts"
+
+SKILL_SETS = [
+    ["React", "Node.js", "MongoDB"],
+    ["Python", "Django", "PostgreSQL"],
+    ["Java", "Spring Boot", "MySQL"],
+    ["JavaScript", "HTML", "CSS"],
+    ["Python", "Machine Learning", "Pandas"],
+]
+
+ANSWERS = [
+    "I would start by profiling the slow endpoint, then add an index on the filtered column and cache the hot results.",
+    "Um, I think maybe I would use a queue, probably Kafka, so the workers can scale independently of the API.",
+    "React re-renders when state changes, so I would memoize expensive children and split the context providers.",
+]
+
+EMOTION = {
+    "predominantEmotion": "neutral", "avgConfidence": 64, "avgStress": 35, "avgEngagement": 72,
+    "emotionHistory": ["neutral", "happy", "neutral"], "totalSamples": 30, "duration": 30000,
+}
+
+SERVICES = {
+    "question": {"dir": "question_generator", "path": "/api/question_generator"},
+    "feedback": {"dir": "feedback_generator", "path": "/api/feedbacke_generator"},
+    "resume": {"dir": "resume_analyzer", "path": "/api/analyze_resume"},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout}s")
+
+
+def spawn(args, cwd, env, port):
+    proc = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return proc
+
+
+def start_stack(names, scenario_path):
+    procs, urls = [], {}
+    env = dict(os.environ)
+    fake_port = free_port()
+    fake_args = [sys.executable, os.path.join(HERE, "fake_gemini.py"), "--port", str(fake_port)]
+    if scenario_path:
+        fake_args += ["--scenario", os.path.abspath(scenario_path)]
+    procs.append(spawn(fake_args, HERE, env, fake_port))
+    env.update({
+        "GEMINI_API_KEY": "loadtest",
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{fake_port}",
+        "RESUME_CACHE_DB": "",
+    })
+    for name in names:
+        port = free_port()
+        args = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+        procs.append(spawn(args, os.path.join(SRC, SERVICES[name]["dir"]), env, port))
+        urls[name] = f"http://127.0.0.1:{port}"
+    return procs, urls, f"http://127.0.0.1:{fake_port}"
+
+
+def build_request(name, rng, base_pdf):
+    if name == "question":
+        return {"json": {"skills": rng.choice(SKILL_SETS)}}
+    if name == "feedback":
+        return {"json": {"text": rng.choice(ANSWERS), "emotion_data": EMOTION}}
+    # Unique trailer comment so each upload has a distinct content hash
+    pdf = base_pdf + f"% loadtest {rng.getrandbits(64)}\n".encode()
+    return {"content": pdf, "headers": {"content-type": "application/pdf"}}
+
+
+def classify(name, response):
+    """Return "ok", "error" or "fallback" for one response."""
+    if response.status_code != 200:
+        return "error"
+    body = response.json()
+    if name == "question":
+        if isinstance(body, dict) and body.get("success") is False:
+            return "error"
+        if isinstance(body, list) and body and str(body[0].get("question", "")).startswith(MOCK_QUESTION_PREFIX):
+            return "fallback"
+        return "ok"
+    if name == "feedback":
+        if not body.get("success"):
+            return "error"
+        return "fallback" if body["data"].get("score") is None else "ok"
+    return "ok" if body.get("data", {}).get("projects") else "fallback"
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def drive(name, url, rps, duration, seed, timeout):
+    rng = random.Random(seed)
+    base_pdf = make_pdf(2)
+    samples = []
+
+    async def one(client, request):
+        started = time.perf_counter()
+        try:
+            response = await client.post(SERVICES[name]["path"], **request)
+            outcome = classify(name, response)
+        except httpx.HTTPError:
+            outcome = "error"
+        samples.append((time.perf_counter() - started, outcome))
+
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=1000)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        tasks = []
+        started = time.perf_counter()
+        total = int(rps * duration)
+        for i in range(total):
+            delay = started + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(client, build_request(name, rng, base_pdf))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in samples)
+    count = len(samples)
+    outcomes = {key: sum(1 for _, outcome in samples if outcome == key) for key in ("ok", "fallback", "error")}
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "error_rate": round(outcomes["error"] / count, 4),
+        "fallback_rate": round(outcomes["fallback"] / count, 4),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args, urls):
+    names = list(urls)
+    results = await asyncio.gather(*(
+        drive(name, urls[name], args.rps, args.duration, args.seed + i, args.timeout) for i, name in enumerate(names)
+    ))
+    return dict(zip(names, results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=10.0, help="target requests/sec per service")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load per service")
+    parser.add_argument("--services", default="question,feedback,resume")
+    parser.add_argument("--scenario", help="fake Gemini scenario JSON")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout, matches the Node axios timeout")
+    parser.add_argument("--no-spawn", action="store_true", help="drive already running services")
+    parser.add_argument("--question-url", default="http://127.0.0.1:8002")
+    parser.add_argument("--feedback-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--resume-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.services.split(",") if name.strip()]
+    procs = []
+    fake_url = None
+    try:
+        if args.no_spawn:
+            urls = {name: getattr(args, f"{name}_url") for name in names}
+        else:
+            procs, urls, fake_url = start_stack(names, args.scenario)
+        results = asyncio.run(run(args, urls))
+        upstream = httpx.get(f"{fake_url}/__stats").json() if fake_url else None
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+    report = {
+        "commit": git_commit(),
+        "config": {"rps": args.rps, "duration": args.duration, "seed": args.seed, "scenario": args.scenario},
+        "services": results,
+        "upstream": upstream,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import asyncio
+import contextvars
+import functools
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from common import metrics
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("BLOCKING_POOL_SIZE", "16")),
+            thread_name_prefix="blocking",
+        )
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call (SDK request, PDF parsing) off the event loop."""
+    loop = asyncio.get_running_loop()
+    # Carry context variables (the request ID) over to the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the number of in-flight requests doing LLM work in one worker.
+
+    A request waits at most ``queue_timeout`` seconds for a slot; after that
+    it is rejected with 503 and a Retry-After header instead of piling up
+    behind a slow upstream.
+
+    Usage:
+        async with limiter:
+            ...
+    """
+
+    def __init__(self, limit: int, queue_timeout: float = 0.5, retry_after: float = 1.0, name: str = ""):
+        self.name = name
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, prefix: str, default_limit: int = 16):
+        """Build a limiter from ``<prefix>_MAX_CONCURRENCY`` / ``<prefix>_QUEUE_TIMEOUT``."""
+        return cls(
+            limit=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(default_limit))),
+            queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", "0.5")),
+            name=prefix.lower(),
+        )
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    async def acquire(self):
+        """Take a slot or raise 503; pair with ``release`` when not using ``async with``."""
+        # An explicit waiter rather than wait_for: a permit granted just as
+        # the timeout fires (or the caller is cancelled) must go back, or
+        # the limiter shrinks for good
+        waiter = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        if not done:
+            self._abandon(waiter)
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Service is at capacity, retry shortly",
+                headers={"Retry-After": str(math.ceil(self.retry_after))},
+            )
+        # A waiter that failed (e.g. the semaphore belongs to another event
+        # loop) got no permit: raise instead of counting a slot
+        waiter.result()
+        self.in_flight += 1
+
+    def _abandon(self, waiter):
+        """Cancel a waiter nobody will use; a permit it got anyway is released."""
+        waiter.cancel()
+        waiter.add_done_callback(lambda task: task.cancelled() or task.exception() or self._semaphore.release())
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def collect(self):
+        """Metric families for ``metrics.add_collector``."""
+        labels = {"limiter": self.name}
+        yield metrics.Family("ai_llm_slots_in_use", "gauge", "Requests holding an LLM concurrency slot", [(labels, self.in_flight)])
+        yield metrics.Family("ai_llm_slot_limit", "gauge", "LLM concurrency slots per worker", [(labels, self.limit)])
+        yield metrics.Family("ai_llm_rejected_total", "counter", "Requests rejected with 503 at capacity", [(labels, self.rejected)])
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: concurrent ``do(key, ...)`` calls
+    with the same key share one execution and all receive its result.
+
+    The work runs in its own task, so a caller that disconnects does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key, func, *args, **kwargs):
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
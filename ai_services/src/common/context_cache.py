@@ -0,0 +1,238 @@
+"""
+Upstream context caching for the static part of prompts.
+
+Prompts are split into a versioned ``StaticPrefix`` (role, rules, output
+format) and a small per-request suffix. The prefix is registered once per
+model through Gemini's cachedContents API and later requests reference it
+by name, so its tokens are billed at the cached rate instead of being sent
+as fresh input every time.
+
+When a cache cannot be used (prefix below the API minimum, caching
+disabled, creation failed or the cache expired upstream), the prefix is
+sent as ``system_instruction`` instead. It stays first in the request,
+which keeps Gemini's implicit prefix caching effective.
+
+Cache names are also recorded in a SQLite file shared by every process on
+the host, so other workers (and services) reuse a cache instead of
+creating their own copy of the same prefix.
+
+Requests only read the in-memory registry. Caches are found or created
+during warm-up (``llm.prepare_prefixes``) or, when a request finds none
+live, on a background thread while that request uses the fallback, so
+neither the creation round trip nor the SQLite lookup is on the request
+path.
+
+Configuration (environment):
+    LLM_CONTEXT_CACHE               "0" disables explicit caching (default on)
+    LLM_CONTEXT_CACHE_TTL           cache lifetime in seconds (default 3600)
+    LLM_CONTEXT_CACHE_MIN_TOKENS    skip prefixes estimated below this (default 1024,
+                                    the API minimum for Flash models)
+    LLM_CONTEXT_CACHE_RETRY         seconds before retrying a failed creation (default 600)
+    LLM_CONTEXT_CACHE_DB            shared registry file, "" for per-process only
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from common import metrics
+
+# Renew a cache this many seconds before it expires upstream
+_RENEW_MARGIN = 60
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "context_cache.sqlite3")
+
+
+class StaticPrefix(NamedTuple):
+    name: str
+    version: str
+    text: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}-v{self.version}"
+
+    @property
+    def estimated_tokens(self) -> int:
+        return len(self.text) // 4
+
+
+def is_cache_error(exc) -> bool:
+    """True when a request failed because its cached content is gone or unusable."""
+    from google.genai import errors
+
+    if not isinstance(exc, errors.ClientError):
+        return False
+    return exc.code == 404 or (exc.code in (400, 403) and "cache" in str(exc).lower())
+
+
+class ContextCache:
+    """Per-process registry of upstream caches, keyed by (prefix, model)."""
+
+    def __init__(self, enabled: bool = True, ttl_seconds: int = 3600, min_tokens: int = 1024, retry_after: float = 600, db_path: str = None):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.retry_after = retry_after
+        self._entries = {}
+        self._unavailable = {}
+        self._creating = set()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self.stats = {"created": 0, "create_failures": 0, "shared": 0, "cached_requests": 0, "fallback_requests": 0, "invalidated": 0}
+
+        self._db = None
+        if db_path and enabled:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS caches ("
+                    " prefix TEXT NOT NULL, model TEXT NOT NULL, name TEXT NOT NULL, expires_at REAL NOT NULL,"
+                    " PRIMARY KEY (prefix, model))"
+                )
+            except sqlite3.Error as e:
+                metrics.log("context_cache_registry_disabled", level="warning", error=str(e))
+                self._db = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.getenv("LLM_CONTEXT_CACHE", "1") != "0",
+            ttl_seconds=int(os.getenv("LLM_CONTEXT_CACHE_TTL", "3600")),
+            min_tokens=int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "1024")),
+            retry_after=float(os.getenv("LLM_CONTEXT_CACHE_RETRY", "600")),
+            db_path=os.getenv("LLM_CONTEXT_CACHE_DB", DEFAULT_DB_PATH),
+        )
+
+    def _shared(self, sql: str, params: tuple):
+        """Run one statement on the shared registry; failures only cost the sharing."""
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                return self._db.execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            metrics.log("context_cache_registry_failed", level="warning", error=str(e))
+            return None
+
+    def _eligible(self, key, prefix: StaticPrefix) -> bool:
+        """Whether a cache may be looked up or created for ``prefix`` now; call under the lock."""
+        return self.enabled and prefix.estimated_tokens >= self.min_tokens and self._unavailable.get(key, 0) <= time.monotonic()
+
+    def _cached_name(self, prefix: StaticPrefix, model: str):
+        """The live cache name known to this process, or None; no I/O."""
+        with self._lock:
+            entry = self._entries.get((prefix.key, model))
+            if entry and entry[1] > time.monotonic():
+                self.stats["cached_requests"] += 1
+                return entry[0]
+        return None
+
+    def prepare(self, client, prefix: StaticPrefix, model: str):
+        """
+        Make a cache for ``prefix`` available to later requests; blocking.
+
+        Reuses one another process registered, else creates it upstream.
+        Runs in warm-up and on a background thread, never in a request.
+
+        Returns:
+            str: the cache name, or None when there is none (yet)
+        """
+        key = (prefix.key, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            if not self._eligible(key, prefix) or key in self._creating:
+                return None
+            self._creating.add(key)
+        try:
+            # Another process may already have created it; expiry is stored as wall time
+            row = self._shared("SELECT name, expires_at FROM caches WHERE prefix = ? AND model = ?", key)
+            if row and row[1] > time.time():
+                with self._lock:
+                    self._entries[key] = (row[0], time.monotonic() + row[1] - time.time())
+                    self.stats["shared"] += 1
+                return row[0]
+            try:
+                cached = client.caches.create(model=model, config=self._create_config(prefix))
+            except Exception as e:
+                metrics.log("context_cache_create_failed", level="warning", prefix=prefix.key, error=str(e))
+                cached = None
+            return self._created(key, cached)
+        finally:
+            with self._lock:
+                self._creating.discard(key)
+
+    def _prepare_in_background(self, client, prefix: StaticPrefix, model: str):
+        key = (prefix.key, model)
+        with self._lock:
+            if not self._eligible(key, prefix) or key in self._creating:
+                return
+        threading.Thread(target=self.prepare, args=(client, prefix, model), name="context-cache", daemon=True).start()
+
+    def _created(self, key, cached):
+        with self._lock:
+            if cached is None:
+                self.stats["create_failures"] += 1
+                self._unavailable[key] = time.monotonic() + self.retry_after
+                return None
+            self.stats["created"] += 1
+            self._entries[key] = (cached.name, time.monotonic() + self.ttl_seconds - _RENEW_MARGIN)
+        self._shared(
+            "INSERT OR REPLACE INTO caches (prefix, model, name, expires_at) VALUES (?, ?, ?, ?)",
+            key + (cached.name, time.time() + self.ttl_seconds - _RENEW_MARGIN),
+        )
+        return cached.name
+
+    def _create_config(self, prefix: StaticPrefix):
+        from google.genai import types
+
+        return types.CreateCachedContentConfig(
+            system_instruction=prefix.text,
+            display_name=prefix.key,
+            ttl=f"{self.ttl_seconds}s",
+            http_options=types.HttpOptions(timeout=5000),
+        )
+
+    def _request_config(self, prefix: StaticPrefix, name):
+        if name:
+            return {"cached_content": name}
+        with self._lock:
+            self.stats["fallback_requests"] += 1
+        return {"system_instruction": prefix.text}
+
+    def config_for_sync(self, client, prefix: StaticPrefix, model: str) -> dict:
+        """
+        GenerateContentConfig fields that supply ``prefix`` for one request.
+
+        Only the in-memory registry is consulted. Without a live cache the
+        prefix goes out as ``system_instruction`` while a background thread
+        finds or creates one, so no request waits for that round trip.
+        """
+        name = self._cached_name(prefix, model)
+        if name is None:
+            self._prepare_in_background(client, prefix, model)
+        return self._request_config(prefix, name)
+
+    async def config_for(self, client, prefix: StaticPrefix, model: str) -> dict:
+        """``config_for_sync`` for async callers (it does no I/O)."""
+        return self.config_for_sync(client, prefix, model)
+
+    def invalidate(self, prefix: StaticPrefix, model: str):
+        """Forget a cache the upstream rejected; fall back until the retry window passes."""
+        key = (prefix.key, model)
+        with self._lock:
+            if self._entries.pop(key, None):
+                self.stats["invalidated"] += 1
+            self._unavailable[key] = time.monotonic() + self.retry_after
+        # The shared registry is SQLite: update it off the caller's thread
+        threading.Thread(target=self._shared, args=("DELETE FROM caches WHERE prefix = ? AND model = ?", key),
+                         name="context-cache", daemon=True).start()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "entries": sorted(f"{key}@{model}" for key, model in self._entries)}
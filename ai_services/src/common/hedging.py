@@ -0,0 +1,261 @@
+"""
+Hedged LLM requests for interactive call sites.
+
+    response, value = await hedging.generate(prompt, validate, service="feedback", prefix=PREFIX)
+
+The call goes out through ``llm.generate``. If it is still outstanding
+once it has taken longer than the recent LLM_HEDGE_PERCENTILE latency of
+the same service and model, a duplicate ("hedge") is sent, to
+<SERVICE>_HEDGE_MODEL / LLM_HEDGE_MODEL when set (e.g. a lighter model),
+else to the same one. The first response that ``validate`` accepts wins
+and the other request is cancelled. A response that fails validation
+sends the hedge at once instead of waiting. A cancelled request hands
+back its scheduler slot as "cancelled" (no load signal) and the circuit
+breaker's half-open trial if it held it, so a loser never blocks recovery.
+
+Hedges are extra upstream load, so they are bounded: each call earns
+LLM_HEDGE_MAX_RATE of a hedge (at most a burst of HEDGE_BURST saved up),
+and none is sent while the scheduler has no free slot for the call's
+class (``llm_scheduler.Scheduler.has_headroom``). Both requests share
+the call's deadline (``llm.deadline_for``), which inside an HTTP request
+is capped by the request budget, so a fallback can still be served in
+time when neither answers. Calls in the "background" class (pool refills,
+bulk jobs) have nobody waiting and are never hedged.
+
+Configuration (environment):
+    LLM_HEDGE                "0" disables hedging (default on)
+    LLM_HEDGE_PERCENTILE     latency percentile that triggers the hedge (default 95)
+    LLM_HEDGE_MIN_DELAY      never hedge sooner than this many seconds (default 0.5)
+    LLM_HEDGE_INITIAL_DELAY  delay until LLM_HEDGE_MIN_SAMPLES latencies are known
+                             (default 4, min samples default 20)
+    LLM_HEDGE_MAX_RATE       hedges per call, long-run (default 0.1)
+    LLM_HEDGE_MODEL          model for hedges; <SERVICE>_HEDGE_MODEL per service
+"""
+import asyncio
+import collections
+import os
+import threading
+import time
+
+from common import llm, llm_scheduler, metrics
+
+# Recent latencies kept per (service, model), and the most hedges saved up
+WINDOW = 256
+HEDGE_BURST = 2.0
+
+OUTCOMES = ("primary_wins", "hedge_wins", "invalid", "no_answer")
+SKIP_REASONS = ("budget", "busy", "deadline")
+
+
+def hedge_model_for(service: str = None) -> str:
+    """Model for hedges: ``<SERVICE>_HEDGE_MODEL``, then ``LLM_HEDGE_MODEL``, then the primary model."""
+    if service:
+        override = os.getenv(f"{service.upper()}_HEDGE_MODEL")
+        if override:
+            return override
+    return os.getenv("LLM_HEDGE_MODEL") or llm.model_for(service)
+
+
+class HedgePolicy:
+    """Hedge delay from recent latencies, plus the per-service hedge budget and counters; thread-safe."""
+
+    def __init__(self, enabled: bool = True, percentile: float = 95, min_delay: float = 0.5, initial_delay: float = 4.0,
+                 min_samples: int = 20, max_rate: float = 0.1):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.max_rate = max_rate
+        self._latencies = {}
+        self._budget = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.getenv("LLM_HEDGE", "1") != "0",
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+            min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5")),
+            initial_delay=float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "4")),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+            max_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", "0.1")),
+        )
+
+    def _service_counts(self, service: str) -> dict:
+        return self._counts.setdefault(service or "default", {
+            "calls": 0, "hedged": 0, **dict.fromkeys(OUTCOMES, 0), **{f"skipped_{reason}": 0 for reason in SKIP_REASONS},
+        })
+
+    def observe(self, service: str, model: str, seconds: float):
+        """Record how long a request took (for cancelled losers, the hedge delay: a lower bound)."""
+        with self._lock:
+            self._latencies.setdefault((service or "default", model), collections.deque(maxlen=WINDOW)).append(seconds)
+
+    def delay(self, service: str, model: str) -> float:
+        """Seconds after which a call still outstanding is hedged."""
+        with self._lock:
+            window = sorted(self._latencies.get((service or "default", model), ()))
+        if len(window) < self.min_samples:
+            return max(self.min_delay, self.initial_delay)
+        rank = min(len(window) - 1, int(len(window) * self.percentile / 100))
+        return max(self.min_delay, window[rank])
+
+    def admit(self, service: str):
+        """Count a call and credit its share of the hedge budget."""
+        with self._lock:
+            self._service_counts(service)["calls"] += 1
+            key = service or "default"
+            self._budget[key] = min(HEDGE_BURST, self._budget.get(key, HEDGE_BURST) + self.max_rate)
+
+    def take(self, service: str) -> bool:
+        """Spend one hedge from the budget; False when it is used up."""
+        with self._lock:
+            key = service or "default"
+            if self._budget.get(key, HEDGE_BURST) < 1.0:
+                self._service_counts(service)["skipped_budget"] += 1
+                return False
+            self._budget[key] = self._budget.get(key, HEDGE_BURST) - 1.0
+            self._service_counts(service)["hedged"] += 1
+            return True
+
+    def record(self, service: str, outcome: str):
+        with self._lock:
+            self._service_counts(service)[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = {service: dict(values) for service, values in self._counts.items()}
+            keys = list(self._latencies)
+        report = {}
+        for service, values in counts.items():
+            calls = values["calls"] or 1
+            report[service] = {
+                **values,
+                "hedge_rate": round(values["hedged"] / calls, 4),
+                "delay_seconds": {model: round(self.delay(service, model), 3) for key_service, model in keys if key_service == service},
+            }
+        return report
+
+    def collect(self):
+        """Metric families for ``metrics.add_collector``."""
+        snap = self.snapshot()
+        yield metrics.Family("ai_llm_hedge_calls_total", "counter", "LLM calls made through hedging.generate",
+                             [({"service": service}, values["calls"]) for service, values in snap.items()])
+        yield metrics.Family("ai_llm_hedges_total", "counter", "Hedge requests sent", [
+            ({"service": service}, values["hedged"]) for service, values in snap.items()
+        ])
+        yield metrics.Family("ai_llm_hedge_outcomes_total", "counter", "How hedged calls ended", [
+            ({"service": service, "outcome": outcome}, values[outcome]) for service, values in snap.items() for outcome in OUTCOMES
+        ])
+        yield metrics.Family("ai_llm_hedges_skipped_total", "counter", "Hedges not sent (budget, no free slot, no time)", [
+            ({"service": service, "reason": reason}, values[f"skipped_{reason}"])
+            for service, values in snap.items() for reason in SKIP_REASONS
+        ])
+        yield metrics.Family("ai_llm_hedge_delay_seconds", "gauge", "Current hedge delay per model", [
+            ({"service": service, "model": model}, delay)
+            for service, values in snap.items() for model, delay in values["delay_seconds"].items()
+        ])
+
+
+policy = HedgePolicy.from_env()
+metrics.add_collector(lambda: policy.collect())
+
+# Cancelled losers, referenced until they have finished unwinding
+_abandoned = set()
+
+
+def _abandon(task):
+    task.cancel()
+    _abandoned.add(task)
+    task.add_done_callback(_abandoned.discard)
+    # Retrieve the outcome so a loser that failed meanwhile is not reported as unhandled
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+async def generate(prompt, validate, service: str = None, deadline: float = None, config: dict = None, prefix=None,
+                   priority: str = None):
+    """
+    ``llm.generate`` answered by the first response ``validate`` accepts, hedged when slow.
+
+    Args:
+        prompt, service, config, prefix, priority: as for ``llm.generate``
+        validate: response text -> value; raises (e.g. ``LLMOutputError``)
+            when the answer is unusable
+        deadline: seconds for the whole call, hedge included (see ``llm.deadline_for``)
+
+    Returns:
+        (response, value): the winning response and its validated value; when
+        every response failed validation, the last one and None, so the
+        caller can fall back on the raw text
+
+    Raises:
+        The last request's error (``LLMError`` or the upstream one) when
+        neither request got a response
+    """
+    deadline_at = time.monotonic() + llm.deadline_for(deadline)
+    primary_model = llm.model_for(service)
+    name = llm_scheduler.priority_for(service, priority)
+    policy.admit(service)
+    running = {}
+
+    def launch(kind, model):
+        task = asyncio.ensure_future(llm.generate(prompt, service=service, model=model, deadline=deadline_at - time.monotonic(),
+                                                  config=config, prefix=prefix, priority=priority))
+        running[task] = (kind, model, time.monotonic())
+
+    def hedge(reason):
+        nonlocal hedge_at
+        hedge_at = None
+        if deadline_at - time.monotonic() < policy.min_delay:
+            policy.record(service, "skipped_deadline")
+        elif not llm_scheduler.scheduler.has_headroom(name):
+            policy.record(service, "skipped_busy")
+        elif policy.take(service):
+            model = hedge_model_for(service)
+            metrics.log("llm_hedged", reason=reason, model=model)
+            launch("hedge", model)
+
+    launch("primary", primary_model)
+    hedge_delay = policy.delay(service, primary_model)
+    hedge_at = time.monotonic() + hedge_delay if policy.enabled and name != "background" else None
+    response = error = None
+    try:
+        while running:
+            wait = None if hedge_at is None else max(0.0, hedge_at - time.monotonic())
+            done, _ = await asyncio.wait(running, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedge("slow")
+                continue
+            for task in done:
+                kind, model, sent = running.pop(task)
+                try:
+                    candidate = task.result()
+                except Exception as e:
+                    error = e
+                    continue
+                policy.observe(service, model, time.monotonic() - sent)
+                try:
+                    value = validate((candidate.text or "") if candidate else "")
+                except Exception as e:
+                    response, error = candidate, e
+                    policy.record(service, "invalid")
+                    if hedge_at is not None:
+                        hedge("invalid")
+                    continue
+                policy.record(service, f"{kind}_wins")
+                return candidate, value
+    finally:
+        for task, (_, model, sent) in running.items():
+            if time.monotonic() - sent >= hedge_delay:
+                # A loser cut short took at least the hedge delay. Counting it
+                # at exactly that keeps the tail in the window without the
+                # hedge's own latency ratcheting the delay upwards.
+                policy.observe(service, model, hedge_delay)
+            _abandon(task)
+
+    policy.record(service, "no_answer")
+    if response is not None:
+        return response, None
+    raise error
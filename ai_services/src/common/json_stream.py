@@ -0,0 +1,87 @@
+import json
+
+
+class IncrementalObjectParser:
+    """
+    Emits the top-level fields of a JSON object as soon as each one is complete.
+
+    Text is fed in arbitrary chunks (e.g. LLM stream deltas). Anything
+    before the first ``{`` (markdown fences, chatter) is skipped. Every
+    character is scanned once, so the total cost is linear in the output.
+
+    Usage:
+        parser = IncrementalObjectParser()
+        for chunk in stream:
+            for key, value in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+        self.done = False
+        self._started = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    def feed(self, chunk: str):
+        """Consume a chunk; returns the list of (key, value) fields completed by it."""
+        self.buffer += chunk
+        completed = []
+        buffer = self.buffer
+        i = self._pos
+        end = len(buffer)
+        while i < end and not self.done:
+            char = buffer[i]
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None and self._value_start is None:
+                        self._key = json.loads(buffer[self._key_start:i + 1])
+                        self._key_start = None
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = i
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1 and char == "}":
+                    self._emit(buffer, i, completed)
+                    self.done = True
+                self._depth -= 1
+            elif self._depth == 1:
+                if char == ":" and self._key is not None and self._value_start is None:
+                    self._value_start = i + 1
+                elif char == ",":
+                    self._emit(buffer, i, completed)
+            i += 1
+        self._pos = i
+        return completed
+
+    def _emit(self, buffer, end, completed):
+        if self._key is not None and self._value_start is not None:
+            try:
+                value = json.loads(buffer[self._value_start:end])
+            except ValueError:
+                value = None
+            else:
+                self.fields[self._key] = value
+                completed.append((self._key, value))
+        self._key = None
+        self._value_start = None
@@ -0,0 +1,607 @@
+"""
+Shared Gemini client used by every AI service.
+
+One long-lived ``genai.Client`` per process keeps HTTP connections alive
+between requests. Calls go through ``generate`` (async) or
+``generate_sync`` (for code already running on the blocking pool), which
+add a per-request deadline, jittered exponential retry on 429/5xx and a
+circuit breaker that fails fast while the upstream is degraded. Callers
+catch ``LLMError`` (or any exception) and serve their existing fallback.
+
+Configuration (environment):
+    GEMINI_API_KEY          API key; without it ``is_configured()`` is False
+    GEMINI_BASE_URL         alternative endpoint, e.g. the local stand-in
+    GEMINI_MODEL            default model for every service
+    <SERVICE>_GEMINI_MODEL  per-service override, e.g. RESUME_GEMINI_MODEL
+    LLM_DEADLINE_SECONDS    total budget per call including retries (default 25,
+                            below the Node side's 30s axios timeout)
+    LLM_REQUEST_BUDGET_SECONDS
+                            budget of a whole HTTP request from its arrival
+                            (default 25); a call inside a request gets at most
+                            what is left of it minus
+    LLM_FALLBACK_RESERVE_SECONDS
+                            time kept back to serve a fallback (default 1)
+    LLM_MAX_ATTEMPTS        attempts per call (default 3)
+    LLM_BREAKER_THRESHOLD   consecutive failures that open the breaker (default 5)
+    LLM_BREAKER_COOLDOWN    seconds the breaker stays open (default 30)
+    LLM_QUOTA_RPM, LLM_MAX_CONCURRENCY, ...
+                            rate and concurrency of upstream requests, see
+                            ``common.llm_scheduler``
+
+Every attempt first waits for a slot from ``llm_scheduler.scheduler``
+in the call's priority class (``priority`` argument, else the
+``llm_scheduler.priority`` context variable, else the service's default);
+the wait counts against the deadline.
+
+Callers pass the static part of a prompt as ``prefix`` (see
+``common.context_cache``); token counts and latency of every successful
+call are recorded per service, reported by ``status()`` and exported on
+``/metrics`` (see ``common.metrics``).
+
+The SDK is about half of a service's import time, so it is imported on
+first use rather than at module level; ``warm_up`` (run by
+``common.lifecycle`` right after startup) loads it and builds the client
+before the service reports ready.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+from common import llm_scheduler, metrics
+from common.context_cache import ContextCache, StaticPrefix, is_cache_error
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Base error for LLM calls; callers fall back when they see it."""
+
+
+class LLMUnavailable(LLMError):
+    """The circuit breaker is open or the deadline budget ran out."""
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, str(default)))
+
+
+def model_for(service: str = None) -> str:
+    """Model name from config: ``<SERVICE>_GEMINI_MODEL``, then ``GEMINI_MODEL``."""
+    if service:
+        override = os.getenv(f"{service.upper()}_GEMINI_MODEL")
+        if override:
+            return override
+    return os.getenv("GEMINI_MODEL", DEFAULT_MODEL)
+
+
+def is_configured() -> bool:
+    return bool(os.getenv("GEMINI_API_KEY"))
+
+
+def _sdk():
+    """``(genai, errors, types)`` from google-genai, imported on first use."""
+    from google import genai
+    from google.genai import errors, types
+    return genai, errors, types
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                genai, _, types = _sdk()
+                base_url = os.getenv("GEMINI_BASE_URL")
+                _client = genai.Client(
+                    api_key=os.getenv("GEMINI_API_KEY"),
+                    http_options=types.HttpOptions(base_url=base_url) if base_url else None,
+                )
+    return _client
+
+
+def warm_up():
+    """Import the SDK and, when an API key is set, build the client."""
+    _sdk()
+    if is_configured():
+        get_client()
+
+
+def prepare_prefixes(prefixes, service: str = None):
+    """Warm-up step: find or create the upstream caches of ``prefixes`` for the service's model."""
+    if not is_configured():
+        return
+    model = model_for(service)
+    for prefix in prefixes:
+        context_cache.prepare(get_client(), prefix, model)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker: closed -> open after ``threshold`` failures,
+    half-open after ``cooldown`` seconds (one trial call), closed again on success.
+
+    A trial that ends without an outcome (cancelled, out of budget before
+    sending, retried at once after a context-cache miss) must be handed
+    back with ``record_abandoned``, or no further trial would be allowed.
+    """
+
+    TRIAL = "trial"
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Truthy when a call may go out: ``TRIAL`` when it is the half-open trial."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return self.TRIAL
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def record_abandoned(self):
+        """Hand back a trial that produced no outcome; the state is unchanged."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+breaker = CircuitBreaker(
+    threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+    cooldown=_env_float("LLM_BREAKER_COOLDOWN", 30.0),
+)
+
+
+context_cache = ContextCache.from_env()
+
+
+class TokenUsage:
+    """Per-service token counts and latency of successful calls."""
+
+    FIELDS = ("requests", "prompt_tokens", "cached_tokens", "output_tokens", "latency_seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._services = {}
+
+    def record(self, service: str, usage_metadata, seconds: float):
+        metrics.observe_stage("llm_call", seconds)
+        usage_metadata = usage_metadata or _sdk()[2].GenerateContentResponseUsageMetadata()
+        with self._lock:
+            totals = self._services.setdefault(service or "default", dict.fromkeys(self.FIELDS, 0))
+            totals["requests"] += 1
+            totals["prompt_tokens"] += usage_metadata.prompt_token_count or 0
+            totals["cached_tokens"] += usage_metadata.cached_content_token_count or 0
+            totals["output_tokens"] += usage_metadata.candidates_token_count or 0
+            totals["latency_seconds"] += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            report = {}
+            for service, totals in self._services.items():
+                requests = totals["requests"] or 1
+                report[service] = {
+                    **{field: totals[field] for field in self.FIELDS[:-1]},
+                    # prompt_tokens includes the cached ones; this is what was billed as fresh input
+                    "uncached_prompt_tokens": totals["prompt_tokens"] - totals["cached_tokens"],
+                    "avg_prompt_tokens": round(totals["prompt_tokens"] / requests, 1),
+                    "avg_latency_ms": round(totals["latency_seconds"] * 1000 / requests, 1),
+                }
+            return report
+
+
+token_usage = TokenUsage()
+
+
+class InFlight:
+    """Number of LLM calls in progress, so a shutdown can wait for them."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.count += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self.count -= 1
+        return False
+
+
+in_flight = InFlight()
+
+
+async def drain(timeout: float) -> int:
+    """
+    Wait until no LLM call is in progress, or ``timeout`` seconds pass.
+
+    Returns:
+        int: calls still running when it gave up (0 when drained)
+    """
+    give_up_at = time.monotonic() + timeout
+    while in_flight.count and time.monotonic() < give_up_at:
+        await asyncio.sleep(0.05)
+    return in_flight.count
+
+
+def _is_retryable(exc) -> bool:
+    import httpx
+
+    _, errors, _ = _sdk()
+    if isinstance(exc, errors.APIError):
+        return exc.code in RETRYABLE_STATUS
+    # Timeouts and connection resets from the transport
+    return isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError))
+
+
+def _is_client_error(exc) -> bool:
+    """An upstream 4xx: the service answered, the request was at fault."""
+    _, errors, _ = _sdk()
+    return isinstance(exc, errors.APIError) and isinstance(exc.code, int) and 400 <= exc.code < 500
+
+
+def _outcome(exc) -> str:
+    """Scheduler outcome of a failed attempt: 429s and timeouts slow it down."""
+    import httpx
+
+    _, errors, _ = _sdk()
+    if isinstance(exc, errors.APIError) and exc.code == 429:
+        return "throttled"
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    return "error"
+
+
+def deadline_for(deadline: float = None) -> float:
+    """
+    Seconds a call may take: ``deadline`` (default LLM_DEADLINE_SECONDS),
+    capped inside a request by what is left of LLM_REQUEST_BUDGET_SECONDS
+    once the fallback reserve is set aside. Time spent queued in front of
+    the service counts, so a degraded answer still beats the caller's timeout.
+    """
+    seconds = deadline if deadline is not None else _env_float("LLM_DEADLINE_SECONDS", 25.0)
+    elapsed = metrics.request_elapsed()
+    if elapsed is not None:
+        left = _env_float("LLM_REQUEST_BUDGET_SECONDS", 25.0) - elapsed - _env_float("LLM_FALLBACK_RESERVE_SECONDS", 1.0)
+        seconds = min(seconds, left)
+    return seconds
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, 0.5 * 2^attempt), capped at 8s."""
+    return random.uniform(0, min(8.0, 0.5 * 2 ** attempt))
+
+
+def _request_config(timeout: float, config: dict = None):
+    _, _, types = _sdk()
+    return types.GenerateContentConfig(
+        **(config or {}),
+        http_options=types.HttpOptions(timeout=max(1, int(timeout * 1000))),
+    )
+
+
+class _Attempts:
+    """
+    Bookkeeping shared by the async and sync retry loops, including the
+    scheduler slot held by the current attempt (handed back on exit if the
+    call is cancelled or raises).
+    """
+
+    def __init__(self, deadline: float, service: str = None, priority: str = None):
+        self.deadline_at = time.monotonic() + deadline_for(deadline)
+        self.max_attempts = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+        self.attempt = 0
+        self.priority = llm_scheduler.priority_for(service, priority)
+        self.ticket = None
+        self.sent_at = None
+        self.trial = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.abandon()
+        # A cancelled call (e.g. a hedge's loser) or an abandoned stream says
+        # nothing about the upstream; keep it apart from real errors
+        cancelled = exc_type is not None and issubclass(exc_type, (asyncio.CancelledError, GeneratorExit))
+        self.finish("cancelled" if cancelled else "error")
+        return False
+
+    def remaining(self) -> float:
+        return self.deadline_at - time.monotonic()
+
+    async def begin(self) -> float:
+        """Wait for a scheduler slot, then ``start``; return the attempt timeout."""
+        if self.remaining() <= 0:
+            raise LLMUnavailable("LLM deadline exceeded")
+        try:
+            self.ticket = await llm_scheduler.scheduler.acquire(self.priority, self.remaining())
+        except llm_scheduler.QueueTimeout as e:
+            raise LLMUnavailable(f"LLM deadline exceeded waiting for a slot ({self.priority})") from e
+        return self._sent()
+
+    def begin_sync(self) -> float:
+        """Blocking ``begin``."""
+        if self.remaining() <= 0:
+            raise LLMUnavailable("LLM deadline exceeded")
+        try:
+            self.ticket = llm_scheduler.scheduler.acquire_sync(self.priority, self.remaining())
+        except llm_scheduler.QueueTimeout as e:
+            raise LLMUnavailable(f"LLM deadline exceeded waiting for a slot ({self.priority})") from e
+        return self._sent()
+
+    def _sent(self) -> float:
+        try:
+            timeout = self.start()
+        except Exception:
+            # Nothing goes upstream: the slot and its token are handed back
+            self.finish("skipped")
+            raise
+        self.sent_at = time.monotonic()
+        return timeout
+
+    def finish(self, outcome: str = "ok", latency: float = None):
+        """Release the attempt's scheduler slot (no-op when none is held)."""
+        if self.ticket is not None:
+            ticket, self.ticket = self.ticket, None
+            if latency is None:
+                latency = time.monotonic() - self.sent_at if self.sent_at else 0.0
+            llm_scheduler.scheduler.release(ticket, outcome, latency)
+
+    def start(self) -> float:
+        """Check the breaker and budget before an attempt; return the attempt timeout."""
+        allowed = breaker.allow()
+        if not allowed:
+            raise LLMUnavailable("LLM circuit breaker is open")
+        self.trial = allowed == CircuitBreaker.TRIAL
+        remaining = self.remaining()
+        if remaining <= 0:
+            self.abandon()
+            raise LLMUnavailable("LLM deadline exceeded")
+        self.attempt += 1
+        return remaining
+
+    def abandon(self):
+        """The attempt ends without telling the breaker anything: hand back its trial."""
+        if self.trial:
+            self.trial = False
+            breaker.record_abandoned()
+
+    def succeeded(self):
+        self.trial = False
+        breaker.record_success()
+
+    def failed(self, exc):
+        """Record a failure; return the sleep before retrying or re-raise."""
+        if not _is_retryable(exc):
+            if _is_client_error(exc):
+                # The upstream answered (e.g. 400), so it is reachable
+                self.trial = False
+                breaker.record_success()
+            else:
+                # A local failure (a bug, a bad response shape) says nothing
+                # about the upstream either way
+                self.abandon()
+            raise exc
+        self.trial = False
+        breaker.record_failure()
+        metrics.log("llm_attempt_failed", level="warning", attempt=self.attempt, error=str(exc))
+        if self.attempt >= self.max_attempts:
+            raise exc
+        delay = _backoff(self.attempt)
+        if delay >= self.remaining():
+            raise LLMUnavailable(f"LLM deadline exceeded after {self.attempt} attempts") from exc
+        return delay
+
+
+def _with_prefix(config: dict, prefix_config: dict) -> dict:
+    return {**(config or {}), **prefix_config}
+
+
+def _cache_miss(exc, prefix: StaticPrefix, model: str, config: dict) -> bool:
+    """Invalidate a cache the upstream no longer knows; True means retry right away."""
+    if prefix is None or "cached_content" not in config or not is_cache_error(exc):
+        return False
+    context_cache.invalidate(prefix, model)
+    return True
+
+
+async def generate(prompt, service: str = None, model: str = None, deadline: float = None, config: dict = None, prefix: StaticPrefix = None,
+                   priority: str = None):
+    """
+    Async ``generate_content`` with deadline, retries and circuit breaking.
+
+    Args:
+        prompt: contents for the model (the per-request part when ``prefix`` is given)
+        service: service name used to pick the configured model
+        model: explicit model name, overrides config
+        deadline: total seconds for all attempts (see ``deadline_for``)
+        config: extra GenerateContentConfig fields
+        prefix: static instructions, served from the upstream context cache when possible
+        priority: scheduler class ("interactive", "question", "resume",
+            "background"), default from context or service
+
+    Returns:
+        GenerateContentResponse
+    """
+    with in_flight, _Attempts(deadline, service, priority) as attempts:
+        model = model or model_for(service)
+        started = time.monotonic()
+        while True:
+            timeout = await attempts.begin()
+            request_config = config
+            try:
+                if prefix is not None:
+                    request_config = _with_prefix(config, await context_cache.config_for(get_client(), prefix, model))
+                response = await asyncio.wait_for(
+                    get_client().aio.models.generate_content(model=model, contents=prompt, config=_request_config(timeout, request_config)),
+                    timeout=timeout,
+                )
+            except Exception as exc:
+                attempts.finish(_outcome(exc))
+                if _cache_miss(exc, prefix, model, request_config):
+                    attempts.abandon()
+                    continue
+                await asyncio.sleep(attempts.failed(exc))
+                continue
+            attempts.finish()
+            attempts.succeeded()
+            token_usage.record(service, response.usage_metadata, time.monotonic() - started)
+            return response
+
+
+def generate_sync(prompt, service: str = None, model: str = None, deadline: float = None, config: dict = None, prefix: StaticPrefix = None,
+                  priority: str = None):
+    """Blocking variant of ``generate`` for code running on a worker thread."""
+    with in_flight, _Attempts(deadline, service, priority) as attempts:
+        model = model or model_for(service)
+        started = time.monotonic()
+        while True:
+            timeout = attempts.begin_sync()
+            request_config = config
+            try:
+                if prefix is not None:
+                    request_config = _with_prefix(config, context_cache.config_for_sync(get_client(), prefix, model))
+                response = get_client().models.generate_content(model=model, contents=prompt, config=_request_config(timeout, request_config))
+            except Exception as exc:
+                attempts.finish(_outcome(exc))
+                if _cache_miss(exc, prefix, model, request_config):
+                    attempts.abandon()
+                    continue
+                time.sleep(attempts.failed(exc))
+                continue
+            attempts.finish()
+            attempts.succeeded()
+            token_usage.record(service, response.usage_metadata, time.monotonic() - started)
+            return response
+
+
+async def generate_stream(prompt, service: str = None, model: str = None, deadline: float = None, config: dict = None, prefix: StaticPrefix = None,
+                          priority: str = None):
+    """
+    Async generator of text deltas from ``generate_content_stream``.
+
+    Opening the stream is retried like ``generate`` until the first chunk
+    arrives; after text has been yielded, failures go to the caller. The
+    deadline covers the whole stream.
+    """
+    with in_flight, _Attempts(deadline, service, priority) as attempts:
+        model = model or model_for(service)
+        started = time.monotonic()
+        while True:
+            timeout = await attempts.begin()
+            request_config = config
+            try:
+                if prefix is not None:
+                    request_config = _with_prefix(config, await context_cache.config_for(get_client(), prefix, model))
+                stream = await asyncio.wait_for(
+                    get_client().aio.models.generate_content_stream(model=model, contents=prompt, config=_request_config(timeout, request_config)),
+                    timeout=timeout,
+                )
+                chunks = stream.__aiter__()
+                first = await asyncio.wait_for(chunks.__anext__(), timeout=attempts.remaining())
+            except StopAsyncIteration:
+                attempts.finish()
+                attempts.succeeded()
+                return
+            except Exception as exc:
+                attempts.finish(_outcome(exc))
+                if _cache_miss(exc, prefix, model, request_config):
+                    attempts.abandon()
+                    continue
+                await asyncio.sleep(attempts.failed(exc))
+                continue
+            break
+
+        # The slot is held until the stream ends; its latency signal is the first chunk
+        first_chunk_latency = time.monotonic() - attempts.sent_at
+        attempts.succeeded()
+        metrics.observe_stage("llm_first_chunk", time.monotonic() - started)
+        # Usage metadata is cumulative; the last chunk carrying it has the totals
+        usage_metadata = first.usage_metadata
+        if first.text:
+            yield first.text
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=attempts.remaining())
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                raise LLMUnavailable("LLM deadline exceeded while streaming")
+            usage_metadata = chunk.usage_metadata or usage_metadata
+            if chunk.text:
+                yield chunk.text
+        attempts.finish(latency=first_chunk_latency)
+        token_usage.record(service, usage_metadata, time.monotonic() - started)
+
+
+def status() -> dict:
+    return {
+        "breaker": breaker.state,
+        "scheduler": llm_scheduler.scheduler.snapshot(),
+        "consecutive_failures": breaker.failures,
+        "usage": token_usage.snapshot(),
+        "context_cache": context_cache.snapshot(),
+    }
+
+
+def _collect():
+    usage = token_usage.snapshot()
+    yield metrics.Family("ai_llm_requests_total", "counter", "Successful LLM calls",
+                         [({"service": service}, totals["requests"]) for service, totals in usage.items()])
+    yield metrics.Family("ai_llm_tokens_total", "counter", "LLM tokens (prompt includes cached)", [
+        ({"service": service, "kind": kind}, totals[f"{kind}_tokens"])
+        for service, totals in usage.items() for kind in ("prompt", "cached", "output")
+    ])
+    yield metrics.Family("ai_llm_in_flight", "gauge", "LLM calls in progress", [({}, in_flight.count)])
+    yield metrics.Family("ai_llm_breaker_open", "gauge", "1 while the LLM circuit breaker is open",
+                         [({}, int(breaker.state == "open"))])
+    cache = context_cache.snapshot()
+    yield metrics.Family("ai_context_cache_requests_total", "counter", "LLM calls by context cache outcome", [
+        ({"outcome": "hit"}, cache["cached_requests"]),
+        ({"outcome": "miss"}, cache["fallback_requests"]),
+    ])
+    yield metrics.Family("ai_context_cache_events_total", "counter", "Context cache lifecycle events", [
+        ({"event": event}, cache[event]) for event in ("created", "shared", "create_failures", "invalidated")
+    ])
+
+
+metrics.add_collector(_collect)
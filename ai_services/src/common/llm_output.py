@@ -0,0 +1,285 @@
+"""
+Extraction and validation of the JSON the model writes.
+
+Model output is rarely clean: code fences, a sentence before or after the
+payload, trailing commas, or a response cut off at the token limit.
+``parse_json`` locates the first balanced JSON value in one pass over the
+text (strings and escapes aware, so braces inside answers do not confuse
+it). When ``json.loads`` rejects it, ``repair`` drops trailing commas and
+closes a truncated value at the last complete element. Only then do
+callers fall back or re-prompt.
+
+``extract`` runs both steps, returns the first value that validates
+against a pydantic schema (see ``common.llm_schemas``) and counts the
+outcome per source; ``stats()`` reports the parse-failure and fallback
+rates.
+"""
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+
+from pydantic import TypeAdapter, ValidationError
+
+from common import metrics
+
+_CLOSERS = {"{": "}", "[": "]"}
+_STRUCTURAL = re.compile(r'["\\{}\[\],]')
+
+
+class LLMOutputError(ValueError):
+    """The model output held no usable JSON, or it failed validation."""
+
+
+class _Candidate:
+    __slots__ = ("text", "complete", "stack", "last_comma", "end")
+
+    def __init__(self, text, complete, stack, last_comma, end):
+        self.text = text
+        self.complete = complete
+        self.stack = stack
+        self.last_comma = last_comma
+        self.end = end
+
+
+def _scan(text: str, start: int):
+    """Scan one JSON value starting at ``text[start]`` (an opening bracket)."""
+    stack = []
+    last_comma = None
+    in_string = False
+    escaped_at = -1
+    # Only quotes, escapes, brackets and commas matter; skip everything else
+    for match in _STRUCTURAL.finditer(text, start):
+        char = match.group()
+        i = match.start()
+        if i == escaped_at:
+            continue
+        if in_string:
+            if char == "\\":
+                escaped_at = i + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            if not stack or _CLOSERS[stack[-1]] != char:
+                return _Candidate(text[start:i], False, stack, last_comma, i + 1)
+            stack.pop()
+            if not stack:
+                return _Candidate(text[start:i + 1], True, stack, last_comma, i + 1)
+        elif char == ",":
+            last_comma = (i - start, tuple(stack))
+    return _Candidate(text[start:], False, stack, last_comma, len(text))
+
+
+def _candidates(text: str):
+    position = 0
+    while True:
+        starts = [index for index in (text.find("{", position), text.find("[", position)) if index != -1]
+        if not starts:
+            return
+        candidate = _scan(text, min(starts))
+        yield candidate
+        position = candidate.end
+
+
+def _strip_trailing_commas(text: str) -> str:
+    out = []
+    in_string = False
+    escaped = False
+    pending_comma = None
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            out.append(char)
+            continue
+        if pending_comma is not None:
+            if char.isspace():
+                pending_comma.append(char)
+                continue
+            if char not in "}]":
+                out.extend(pending_comma)
+            pending_comma = None
+        if char == ",":
+            pending_comma = [","]
+            continue
+        if char == '"':
+            in_string = True
+        out.append(char)
+    return "".join(out)
+
+
+def repair(candidate: _Candidate) -> str:
+    """
+    Cheap local fixes for a candidate that did not parse: drop trailing
+    commas and, for a truncated value, cut back to the last complete
+    element and close the open brackets.
+    """
+    text = candidate.text
+    if not candidate.complete and candidate.last_comma is not None:
+        cut, stack = candidate.last_comma
+        text = text[:cut] + "".join(_CLOSERS[opener] for opener in reversed(stack))
+    return _strip_trailing_commas(text)
+
+
+def iter_json(text: str):
+    """
+    Yield every JSON object or array found in ``text``, in order.
+
+    Yields:
+        tuple: (value, repaired) where ``repaired`` tells whether local
+        repair was needed
+    """
+    for candidate in _candidates(text or ""):
+        try:
+            yield json.loads(candidate.text), False
+            continue
+        except ValueError:
+            pass
+        try:
+            yield json.loads(repair(candidate)), True
+        except ValueError:
+            continue
+
+
+def parse_json(text: str):
+    """
+    Return the first JSON object or array found in ``text`` as (value, repaired).
+
+    Raises:
+        LLMOutputError: no candidate parsed, even after repair
+    """
+    for found in iter_json(text):
+        return found
+    raise LLMOutputError(f"No JSON found in model output: {(text or '')[:120]!r}")
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema):
+    return TypeAdapter(schema)
+
+
+def warm_up(*schemas):
+    """Build the validators for ``schemas`` ahead of the first response."""
+    for schema in schemas:
+        _adapter(schema)
+
+
+def validate(value, schema):
+    """
+    Validate a parsed value against ``schema`` and return it as plain data.
+
+    Raises:
+        LLMOutputError: the value does not match the schema
+    """
+    adapter = _adapter(schema)
+    try:
+        return adapter.dump_python(adapter.validate_python(value))
+    except ValidationError as e:
+        raise LLMOutputError(f"Model output failed validation: {e.error_count()} errors") from e
+
+
+class OutputStats:
+    """Per-source counters for parse outcomes and fallbacks."""
+
+    FIELDS = ("parsed", "repaired", "parse_failures", "invalid", "fallbacks")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, source: str, outcome: str):
+        with self._lock:
+            counts = self._counts.setdefault(source, dict.fromkeys(self.FIELDS, 0))
+            counts[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            report = {}
+            for source, counts in self._counts.items():
+                attempts = counts["parsed"] + counts["parse_failures"] + counts["invalid"]
+                served = counts["parsed"] + counts["fallbacks"]
+                report[source] = {
+                    **counts,
+                    "parse_failure_rate": round(counts["parse_failures"] / attempts, 4) if attempts else 0.0,
+                    "invalid_rate": round(counts["invalid"] / attempts, 4) if attempts else 0.0,
+                    # share of results served from a fallback instead of model output
+                    "fallback_rate": round(counts["fallbacks"] / served, 4) if served else 0.0,
+                }
+            return report
+
+
+_stats = OutputStats()
+
+
+def extract(text: str, schema=None, source: str = "default"):
+    """
+    Find, repair and validate the JSON in a model response.
+
+    Args:
+        text: raw model output
+        schema: pydantic model or type to validate against; None returns
+            the parsed value unchanged
+        source: name the outcome is counted under (usually the service)
+
+    Returns:
+        The validated value as plain dicts/lists
+
+    Raises:
+        LLMOutputError: nothing usable was found; the caller should fall back
+    """
+    started = time.perf_counter()
+    try:
+        return _extract(text, schema, source)
+    finally:
+        metrics.observe_stage("json_parse", time.perf_counter() - started)
+
+
+def _extract(text: str, schema, source: str):
+    error = None
+    for value, repaired in iter_json(text):
+        if schema is not None:
+            # A bracketed aside in the prose ("[1]") can precede the payload
+            try:
+                value = validate(value, schema)
+            except LLMOutputError as e:
+                error = error or e
+                continue
+        _stats.record(source, "parsed")
+        if repaired:
+            _stats.record(source, "repaired")
+        return value
+    if error is not None:
+        _stats.record(source, "invalid")
+        raise error
+    _stats.record(source, "parse_failures")
+    raise LLMOutputError(f"No JSON found in model output: {(text or '')[:120]!r}")
+
+
+def record_fallback(source: str):
+    """Count a response served from a fallback instead of model output."""
+    _stats.record(source, "fallbacks")
+    metrics.observe_since_request("fallback")
+
+
+def stats() -> dict:
+    return _stats.snapshot()
+
+
+def _collect():
+    report = _stats.snapshot()
+    yield metrics.Family("ai_llm_output_total", "counter", "Model output parse outcomes and fallbacks served", [
+        ({"source": source, "outcome": outcome}, counts[outcome])
+        for source, counts in report.items() for outcome in OutputStats.FIELDS
+    ])
+
+
+metrics.add_collector(_collect)
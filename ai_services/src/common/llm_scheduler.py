@@ -0,0 +1,335 @@
+"""
+Priority scheduler in front of every outbound LLM request.
+
+    ticket = await scheduler.acquire("interactive", timeout)   # or acquire_sync
+    ... one upstream attempt ...
+    scheduler.release(ticket, "ok", latency)                   # "throttled", "timeout", "error", "cancelled", "skipped"
+
+``common.llm`` does this around every attempt (retries included), so
+callers only choose a priority class. A request is admitted when it
+gets both a concurrency slot and a token from the rate bucket:
+
+    token bucket    LLM_QUOTA_RPM requests per minute (0 disables it),
+                    bursts of up to LLM_QUOTA_BURST (default a tenth of
+                    a minute's quota)
+    concurrency     AIMD between LLM_MIN_CONCURRENCY and
+                    LLM_MAX_CONCURRENCY: +1/limit per fast success, x0.5
+                    on a 429, a timeout or a call slower than
+                    LLM_LATENCY_TARGET seconds (at most once per second)
+
+Priority classes, highest first: "interactive" (feedback a candidate is
+waiting on), "question", "resume" and "background" (pool refills, bulk
+jobs). The waiting request of the highest class goes first, and lower
+classes also leave headroom: they may fill only part of the slots
+(``SLOT_SHARES``) and must leave part of the bucket (``TOKEN_RESERVE``),
+so an interactive request arriving behind a flood of background work
+finds a slot and a token at once. The class comes from the ``priority``
+argument, else the ``priority`` context variable (set by background
+work), else the service (``SERVICE_PRIORITY``).
+
+The quota and limits are per process. Behind ``gateway.py`` all services
+share one process and so one scheduler; with one process per service,
+give each its share of the account quota in LLM_QUOTA_RPM.
+
+Queue wait is recorded as stage ``llm_queue_wait`` in ``ai_stage_seconds``
+and per class in ``ai_llm_queue_wait_seconds_total`` /
+``ai_llm_admitted_total``; queue depth, the current concurrency limit and
+the 429s seen are exported alongside.
+"""
+import asyncio
+import collections
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+from common import metrics
+
+PRIORITIES = ("interactive", "question", "resume", "background")
+SERVICE_PRIORITY = {"feedback": "interactive", "question": "question", "resume": "resume"}
+# Share of the concurrency limit each class may fill, and share of the
+# bucket it must leave for the classes above it
+SLOT_SHARES = (1.0, 0.9, 0.75, 0.5)
+TOKEN_RESERVE = (0.0, 0.1, 0.25, 0.5)
+
+# Multiplicative decrease factor and the least time between two decreases
+# (a burst of 429s from one window counts once)
+BACKOFF = 0.5
+DECREASE_INTERVAL = 1.0
+
+priority = contextvars.ContextVar("llm_priority", default=None)
+
+
+@contextlib.contextmanager
+def use_priority(name: str):
+    """Run the block's LLM calls (and tasks/threads it starts) in priority class ``name``."""
+    token = priority.set(name)
+    try:
+        yield
+    finally:
+        priority.reset(token)
+
+
+def priority_for(service: str = None, explicit: str = None) -> str:
+    """Class of a call: explicit argument, then context, then service default."""
+    name = explicit or priority.get() or SERVICE_PRIORITY.get(service, "interactive")
+    return name if name in PRIORITIES else "interactive"
+
+
+class QueueTimeout(Exception):
+    """No slot or token became free before the caller's deadline."""
+
+
+class Ticket:
+    __slots__ = ("level", "granted", "released", "event", "future", "loop")
+
+    def __init__(self, level: int, loop=None):
+        self.level = level
+        self.granted = False
+        self.released = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def grant(self):
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(_resolve, self.future)
+            except RuntimeError:
+                pass  # loop closed; the waiter is gone
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Scheduler:
+    """Token bucket + AIMD concurrency limit + strict priority queues; thread-safe."""
+
+    def __init__(self, rpm: float = 0, burst: float = None, min_concurrency: int = 1, max_concurrency: int = 16,
+                 latency_target: float = 10.0):
+        self.rate = rpm / 60.0
+        self.capacity = max(1.0, burst if burst else rpm / 10.0)
+        self.tokens = self.capacity
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.latency_target = latency_target
+        self.active = 0
+        self._queues = [collections.deque() for _ in PRIORITIES]
+        self._refilled_at = time.monotonic()
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {
+            name: {"admitted": 0, "wait_seconds": 0.0, "queue_timeouts": 0} for name in PRIORITIES
+        }
+        self.outcomes = {"ok": 0, "throttled": 0, "timeout": 0, "error": 0, "cancelled": 0, "skipped": 0, "slow": 0}
+        self.decreases = 0
+
+    @classmethod
+    def from_env(cls):
+        rpm = float(os.getenv("LLM_QUOTA_RPM", "0"))
+        return cls(
+            rpm=rpm,
+            burst=float(os.getenv("LLM_QUOTA_BURST", "0")) or None,
+            min_concurrency=int(os.getenv("LLM_MIN_CONCURRENCY", "1")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+            latency_target=float(os.getenv("LLM_LATENCY_TARGET", "10")),
+        )
+
+    # -- admission (call with the lock held) --------------------------------
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _tokens_needed(self, level: int) -> float:
+        return max(1.0, min(self.capacity, 1.0 + TOKEN_RESERVE[level] * (self.capacity - 1.0)))
+
+    def _admissible(self, level: int) -> bool:
+        slots = max(1, int(self.limit * SLOT_SHARES[level]))
+        if self.active >= slots:
+            return False
+        return not self.rate or self.tokens >= self._tokens_needed(level)
+
+    def _dispatch(self):
+        self._refill(time.monotonic())
+        for level, queue in enumerate(self._queues):
+            while queue and self._admissible(level):
+                ticket = queue.popleft()
+                self.active += 1
+                if self.rate:
+                    self.tokens -= 1.0
+                ticket.grant()
+            if queue:
+                # Strict priority: lower classes never pass a waiting higher one
+                return
+
+    def _next_check(self, level: int, remaining: float) -> float:
+        """Seconds a waiter may sleep before tokens could admit it (releases wake it sooner)."""
+        if not self.rate:
+            return remaining
+        missing = self._tokens_needed(level) - self.tokens
+        return min(remaining, max(0.005, missing / self.rate))
+
+    def _enqueue(self, name: str, loop=None) -> Ticket:
+        ticket = Ticket(PRIORITIES.index(name), loop)
+        with self._lock:
+            self._queues[ticket.level].append(ticket)
+            self._dispatch()
+        return ticket
+
+    def _admitted(self, ticket: Ticket, waited: float):
+        stats = self.stats[PRIORITIES[ticket.level]]
+        with self._lock:
+            stats["admitted"] += 1
+            stats["wait_seconds"] += waited
+        metrics.observe_stage("llm_queue_wait", waited)
+
+    def _abandon(self, ticket: Ticket, timed_out: bool):
+        """Take a waiter out of its queue; a slot granted meanwhile is handed back."""
+        with self._lock:
+            if ticket.granted:
+                self._release_locked(ticket, "skipped", 0.0)
+                return
+            try:
+                self._queues[ticket.level].remove(ticket)
+            except ValueError:
+                pass
+            if timed_out:
+                self.stats[PRIORITIES[ticket.level]]["queue_timeouts"] += 1
+
+    # -- public API -----------------------------------------------------------
+
+    async def acquire(self, name: str, timeout: float) -> Ticket:
+        """
+        Wait for a slot and a token in class ``name``.
+
+        Raises:
+            QueueTimeout: none was free within ``timeout`` seconds
+        """
+        started = time.monotonic()
+        ticket = self._enqueue(name, asyncio.get_running_loop())
+        try:
+            while not ticket.granted:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise QueueTimeout(f"no LLM slot within {timeout:.1f}s")
+                with self._lock:
+                    wait = self._next_check(ticket.level, remaining)
+                try:
+                    await asyncio.wait_for(asyncio.shield(ticket.future), wait)
+                except asyncio.TimeoutError:
+                    with self._lock:
+                        self._dispatch()
+        except BaseException as e:
+            self._abandon(ticket, isinstance(e, QueueTimeout))
+            raise
+        self._admitted(ticket, time.monotonic() - started)
+        return ticket
+
+    def acquire_sync(self, name: str, timeout: float) -> Ticket:
+        """Blocking ``acquire`` for code running on a worker thread."""
+        started = time.monotonic()
+        ticket = self._enqueue(name)
+        try:
+            while not ticket.granted:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise QueueTimeout(f"no LLM slot within {timeout:.1f}s")
+                with self._lock:
+                    wait = self._next_check(ticket.level, remaining)
+                if not ticket.event.wait(wait):
+                    with self._lock:
+                        self._dispatch()
+        except BaseException as e:
+            self._abandon(ticket, isinstance(e, QueueTimeout))
+            raise
+        self._admitted(ticket, time.monotonic() - started)
+        return ticket
+
+    def release(self, ticket: Ticket, outcome: str, latency: float = 0.0):
+        """
+        Hand a slot back and adapt the concurrency limit.
+
+        Args:
+            ticket: from ``acquire``/``acquire_sync``
+            outcome: "ok", "throttled" (429), "timeout", "error" (other
+                failures, no signal), "cancelled" (the caller gave up, e.g.
+                a hedge's loser; no signal) or "skipped" (no request was
+                sent; the token is refunded)
+            latency: seconds the upstream took (to the first chunk for streams)
+        """
+        with self._lock:
+            self._release_locked(ticket, outcome, latency)
+
+    def _release_locked(self, ticket: Ticket, outcome: str, latency: float):
+        if ticket.released:
+            return
+        ticket.released = True
+        self.active -= 1
+        if outcome == "ok" and self.latency_target and latency > self.latency_target:
+            outcome = "slow"
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if outcome == "skipped":
+            self.tokens = min(self.capacity, self.tokens + 1.0) if self.rate else self.tokens
+        elif outcome == "ok":
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        elif outcome in ("throttled", "timeout", "slow"):
+            now = time.monotonic()
+            if now - self._decreased_at >= DECREASE_INTERVAL:
+                self._decreased_at = now
+                self.limit = max(float(self.min_concurrency), self.limit * BACKOFF)
+                self.decreases += 1
+        self._dispatch()
+
+    def has_headroom(self, name: str) -> bool:
+        """True when a call in class ``name`` would be admitted at once (for optional work such as hedges)."""
+        level = PRIORITIES.index(name)
+        with self._lock:
+            self._refill(time.monotonic())
+            return not any(self._queues[:level + 1]) and self._admissible(level)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "limit": round(self.limit, 2),
+                "active": self.active,
+                "tokens": round(self.tokens, 2) if self.rate else None,
+                "rpm": self.rate * 60,
+                "queued": {name: len(queue) for name, queue in zip(PRIORITIES, self._queues)},
+                "classes": {
+                    name: {**stats, "wait_seconds": round(stats["wait_seconds"], 3)} for name, stats in self.stats.items()
+                },
+                "outcomes": dict(self.outcomes),
+                "decreases": self.decreases,
+            }
+
+    def collect(self):
+        """Metric families for ``metrics.add_collector``."""
+        snap = self.snapshot()
+        yield metrics.Family("ai_llm_concurrency_limit", "gauge", "Current AIMD limit on upstream LLM requests",
+                             [({}, snap["limit"])])
+        yield metrics.Family("ai_llm_scheduler_active", "gauge", "Upstream LLM requests admitted and running",
+                             [({}, snap["active"])])
+        yield metrics.Family("ai_llm_queue_depth", "gauge", "LLM requests waiting for a slot or token",
+                             [({"priority": name}, depth) for name, depth in snap["queued"].items()])
+        yield metrics.Family("ai_llm_admitted_total", "counter", "LLM requests admitted by the scheduler",
+                             [({"priority": name}, stats["admitted"]) for name, stats in snap["classes"].items()])
+        yield metrics.Family("ai_llm_queue_wait_seconds_total", "counter", "Time LLM requests spent queued",
+                             [({"priority": name}, stats["wait_seconds"]) for name, stats in snap["classes"].items()])
+        yield metrics.Family("ai_llm_queue_timeouts_total", "counter", "LLM requests that gave up waiting for a slot",
+                             [({"priority": name}, stats["queue_timeouts"]) for name, stats in snap["classes"].items()])
+        yield metrics.Family("ai_llm_upstream_outcomes_total", "counter", "Upstream LLM attempts by outcome",
+                             [({"outcome": outcome}, count) for outcome, count in snap["outcomes"].items()])
+
+
+scheduler = Scheduler.from_env()
+metrics.add_collector(lambda: scheduler.collect())
@@ -0,0 +1,67 @@
+"""
+Schemas for the JSON each service asks the model for, used with
+``common.llm_output.extract``. They mirror the formats spelled out in the
+prompts and are lenient only where models commonly drift (wrapper keys,
+project objects instead of names).
+"""
+from typing import Annotated, List, Optional, Union
+
+from pydantic import BaseModel, Field, RootModel, StrictFloat, StrictInt, field_validator, model_validator
+
+NonEmptyStr = Annotated[str, Field(min_length=1)]
+Score = Annotated[Union[StrictInt, StrictFloat], Field(ge=0, le=100)]
+
+
+class Question(BaseModel):
+    question_id: Optional[int] = None
+    question: NonEmptyStr
+    difficulty: str = ""
+    skill_area: str = ""
+
+    @field_validator("question")
+    @classmethod
+    def _strip(cls, value):
+        value = value.strip()
+        if not value:
+            raise ValueError("question is blank")
+        return value
+
+
+class QuestionList(RootModel[Annotated[List[Question], Field(min_length=5)]]):
+    """One interview's questions; accepts ``{"questions": [...]}`` as well."""
+
+    @model_validator(mode="before")
+    @classmethod
+    def _unwrap(cls, value):
+        if isinstance(value, dict) and "questions" in value:
+            return value["questions"]
+        return value
+
+
+class Feedback(BaseModel):
+    feedback: NonEmptyStr
+    strengths: List[str] = []
+    improvements: List[str] = []
+    emotion_improvements: List[str] = []
+    score: Score
+
+
+class ResumeSkills(BaseModel):
+    tech_skills: List[str] = []
+    soft_skills: List[str] = []
+    projects: List[str] = []
+
+    @field_validator("tech_skills", "soft_skills", "projects", mode="before")
+    @classmethod
+    def _names(cls, value):
+        # Models sometimes describe projects as {"name": ..., "description": ...}
+        if not isinstance(value, list):
+            return value
+        names = []
+        for item in value:
+            if isinstance(item, dict):
+                item = item.get("name") or item.get("title") or ""
+            item = str(item).strip()
+            if item:
+                names.append(item)
+        return names
@@ -0,0 +1,309 @@
+"""
+Request metrics, per-stage timing and structured logs for every AI service.
+
+    metrics.install(app, "feedback")    # middleware + GET /metrics
+    with metrics.stage("prompt_build"):
+        prompt = ...
+    metrics.log("feedback_failed", level="error", error=str(e))
+
+Latency is kept in fixed-bucket histograms:
+
+    ai_stage_seconds{service, stage}          pdf_parse, segment, keyword_scan,
+                                              prompt_build, llm_queue_wait,
+                                              llm_call, llm_first_chunk,
+                                              json_parse,
+                                              fallback (request start until
+                                              a fallback was served)
+    ai_http_request_seconds{service, method, route, status}
+    ai_http_requests_in_flight{service}
+
+Modules that already keep counters (token usage, context cache, output
+parsing, result caches, limiters, LLM scheduler, hedging) register a
+collector that turns their snapshot into metric families at scrape time,
+so the hot path pays nothing extra for them. ``/metrics`` renders everything in the Prometheus
+text format; no client library is needed for a few counters.
+
+Every request carries an ID: the ``X-Request-ID`` header sent by the Node
+aiService, or a fresh one. It is echoed in the response, held in a
+context variable for the request (``run_blocking`` copies it to worker
+threads) and added to every ``log`` line. The service name is held the
+same way, so services sharing one process (``gateway.py``) label their
+own stages and logs.
+"""
+import bisect
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import NamedTuple
+
+from starlette.responses import Response
+from starlette.routing import Match
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# One structured line per HTTP request; errors are always logged
+LOG_REQUESTS = os.getenv("LOG_REQUESTS", "1") == "1"
+
+request_id = contextvars.ContextVar("request_id", default=None)
+service = contextvars.ContextVar("service", default=None)
+_request_started = contextvars.ContextVar("request_started", default=None)
+
+_service = os.getenv("SERVICE_NAME", "ai_service")
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+class Family(NamedTuple):
+    """One metric family produced by a collector: samples are (labels dict, value)."""
+    name: str
+    type: str
+    help: str
+    samples: list
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values; ``observe`` is O(log buckets)."""
+
+    def __init__(self, name: str, help: str, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                label_text = _labels(self.labelnames + ("le",), labels + (_number(bound),))
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {total!r}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Up/down value keyed by label values."""
+
+    def __init__(self, name: str, help: str, labelnames):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple, amount: float = 1):
+        self.inc(labels, -amount)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values)
+        return lines
+
+
+STAGE_SECONDS = Histogram("ai_stage_seconds", "Latency of one processing stage", ("service", "stage"))
+HTTP_SECONDS = Histogram("ai_http_request_seconds", "HTTP request latency", ("service", "method", "route", "status"))
+IN_FLIGHT = Gauge("ai_http_requests_in_flight", "HTTP requests being handled", ("service",))
+
+_collectors = []
+
+
+def add_collector(collect):
+    """Register a callable returning an iterable of ``Family``; it runs on every scrape."""
+    _collectors.append(collect)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = STAGE_SECONDS.render() + HTTP_SECONDS.render() + IN_FLIGHT.render()
+    # Several collectors may report one family (e.g. a limiter per service)
+    families = {}
+    for collect in _collectors:
+        try:
+            for family in collect():
+                families.setdefault(family.name, (family, []))[1].extend(family.samples)
+        except Exception as e:
+            log("metrics_collector_failed", level="error", error=str(e))
+    for family, samples in families.values():
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for labels, value in samples:
+            lines.append(f"{family.name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class stage:
+    """
+    Time a block into ``ai_stage_seconds{stage=name}``.
+
+    A plain class rather than a generator context manager: entering and
+    leaving cost about two microseconds.
+    """
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe((current_service(), self.name), time.perf_counter() - self.started)
+        return False
+
+
+def current_service() -> str:
+    """Service handling the current request, else the one named by ``install``."""
+    return service.get() or _service
+
+
+def observe_stage(name: str, seconds: float):
+    """Record a stage duration measured by the caller."""
+    STAGE_SECONDS.observe((current_service(), name), seconds)
+
+
+def observe_since_request(name: str):
+    """Record the time since the current request started, e.g. when a fallback is served."""
+    started = _request_started.get()
+    if started is not None:
+        STAGE_SECONDS.observe((current_service(), name), time.perf_counter() - started)
+
+
+def request_elapsed():
+    """Seconds since the current request started, or None outside a request."""
+    started = _request_started.get()
+    return None if started is None else time.perf_counter() - started
+
+
+def detach_from_request():
+    """
+    Forget the request start in the current task. A task spawned by a
+    handler copies its context, so background work would otherwise count
+    against the request's budget (``llm.deadline_for``) long after it returned.
+    """
+    _request_started.set(None)
+
+
+def log(event: str, level: str = "info", **fields):
+    """Write one JSON log line with the service name and current request ID."""
+    record = {"ts": round(time.time(), 3), "level": level, "service": current_service(), "event": event}
+    current = request_id.get()
+    if current:
+        record["request_id"] = current
+    record.update(fields)
+    print(json.dumps(record, default=str), flush=True)
+
+
+def _route(app, scope) -> str:
+    """Route template for the label ("/api/x/{id}"), never the raw path."""
+    route = scope.get("route")
+    if route is None:
+        for candidate in getattr(app, "routes", ()):
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request ID, in-flight gauge, latency histogram, access log."""
+
+    def __init__(self, app, service: str, router=None):
+        self.app = app
+        self.service = service
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        current = incoming if incoming and _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(current)
+        service_token = service.set(self.service)
+        started = time.perf_counter()
+        started_token = _request_started.set(started)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), (b"x-request-id", current.encode())]
+            await send(message)
+
+        labels = (self.service,)
+        IN_FLIGHT.inc(labels)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec(labels)
+            route = _route(self.router, scope)
+            HTTP_SECONDS.observe((self.service, scope["method"], route, str(status)), elapsed)
+            if LOG_REQUESTS and route != "/metrics":
+                log("request", method=scope["method"], route=route, status=status, ms=round(elapsed * 1000, 2))
+            _request_started.reset(started_token)
+            service.reset(service_token)
+            request_id.reset(token)
+
+
+async def endpoint():
+    """``GET /metrics`` handler."""
+    return Response(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def install(app, service: str):
+    """Add the middleware and ``GET /metrics`` to a FastAPI app, naming the service in every metric."""
+    global _service
+    _service = service
+    app.add_api_route("/metrics", endpoint, methods=["GET"], include_in_schema=False)
+    app.add_middleware(MetricsMiddleware, service=service, router=app.router)
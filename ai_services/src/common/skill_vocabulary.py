@@ -0,0 +1,117 @@
+"""
+Skill vocabulary shared by resume_analyzer (keyword scan) and
+question_generator (skill-set normalization).
+"""
+import re
+from typing import Iterable, List
+
+# Bump whenever the vocabulary, the alias table or the way resume text is
+# matched against them changes, so cached analyses are not reused.
+VOCABULARY_VERSION = "3"
+
+TECH_SKILLS = [
+    "Python", "Java", "C++", "C#", "JavaScript", "TypeScript", "GoLang", "Rust", "Ruby", "PHP", "Swift", "Kotlin",
+    "HTML", "CSS", "SASS", "Bootstrap", "Tailwind CSS", "React", "Next.js", "Angular", "Vue.js", "jQuery",
+    "Node.js", "Express.js", "Django", "Flask", "FastAPI", "Spring Boot", "Laravel", "Ruby on Rails", "ASP.NET Core",
+    "SQL", "MySQL", "PostgreSQL", "SQLite", "MongoDB", "Firebase", "Oracle", "Redis", "Cassandra",
+    "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Jenkins", "Terraform", "CI/CD", "Ansible", "Linux", "Bash",
+    "Pandas", "NumPy", "Matplotlib", "Seaborn", "Scikit-learn", "TensorFlow", "Keras", "PyTorch", "OpenCV", "NLP", "Hugging Face",
+    "LLM", "LangChain", "RAG", "Transformers", "Machine Learning", "Deep Learning", "Neural Networks", "Computer Vision",
+    "Apache Spark", "Hadoop", "Kafka", "Airflow", "ETL", "Data Warehousing", "Snowflake", "Databricks",
+    "React Native", "Flutter", "SwiftUI", "Android Studio", "Xcode", "Ionic",
+    "Ethical Hacking", "Penetration Testing", "Network Security", "Firewall", "Cryptography", "Wireshark",
+    "Git", "GitHub", "Bitbucket", "Agile", "Scrum", "Jira", "VS Code", "Eclipse", "IntelliJ IDEA", "Postman",
+    "Selenium", "JUnit", "PyTest", "Mocha", "Chai", "Jest", "Cypress", "Postman Testing", "Manual Testing", "Automation Testing",
+    "Figma", "Adobe XD", "Photoshop", "Canva", "Wireframing", "Prototyping",
+    "API Development", "Microservices", "GraphQL", "REST API", "WebSockets", "OAuth2", "JWT", "Blockchain", "Solidity", "IoT", "Edge Computing", "AR/VR", "Quantum Computing",
+]
+
+SOFT_SKILLS = [
+    "Communication", "Active Listening", "Public Speaking", "Presentation Skills", "Negotiation", "Collaboration", "Teamwork",
+    "Interpersonal Skills", "Empathy", "Relationship Building", "Conflict Resolution", "Customer Service",
+    "Problem Solving", "Analytical Thinking", "Critical Thinking", "Decision Making", "Creativity", "Innovation",
+    "Strategic Thinking", "Logical Reasoning", "Research Skills", "Troubleshooting",
+    "Leadership", "Mentoring", "Coaching", "Team Management", "Project Management", "Delegation", "Accountability",
+    "Goal Setting", "Motivational Skills", "Time Management", "Performance Management",
+    "Adaptability", "Flexibility", "Resilience", "Work Ethic", "Integrity", "Reliability", "Discipline",
+    "Self-Motivation", "Positive Attitude", "Emotional Intelligence", "Stress Management", "Patience",
+    "Organizational Skills", "Multitasking", "Planning", "Prioritization", "Attention to Detail", "Focus", "Meeting Deadlines",
+    "Remote Collaboration", "Cross-functional Communication", "Virtual Teamwork", "Feedback Management", "Stakeholder Communication",
+    "Design Thinking", "Brainstorming", "Open-mindedness", "Storytelling", "Curiosity", "Continuous Learning",
+    "Professionalism", "Cultural Awareness", "Ethical Judgment", "Diversity and Inclusion", "Confidentiality",
+    "Self-Reflection", "Growth Mindset", "Goal Orientation", "Learning Agility", "Initiative",
+]
+
+# Alternative spellings mapped to the canonical vocabulary entry.
+SKILL_ALIASES = {
+    "ReactJS": "React",
+    "React.js": "React",
+    "Node": "Node.js",
+    "NodeJS": "Node.js",
+    "Express": "Express.js",
+    "ExpressJS": "Express.js",
+    "NextJS": "Next.js",
+    "Vue": "Vue.js",
+    "VueJS": "Vue.js",
+    "AngularJS": "Angular",
+    "JS": "JavaScript",
+    "Go Lang": "GoLang",
+    "Postgres": "PostgreSQL",
+    "Mongo": "MongoDB",
+    "K8s": "Kubernetes",
+    "Tailwind": "Tailwind CSS",
+    "TailwindCSS": "Tailwind CSS",
+    "Springboot": "Spring Boot",
+    "Rails": "Ruby on Rails",
+    "sklearn": "Scikit-learn",
+    "HuggingFace": "Hugging Face",
+    "GCP": "Google Cloud",
+    "Google Cloud Platform": "Google Cloud",
+    "Amazon Web Services": "AWS",
+    "Spark": "Apache Spark",
+    "Apache Kafka": "Kafka",
+    "Apache Airflow": "Airflow",
+    "REST": "REST API",
+    "REST APIs": "REST API",
+    "RESTful API": "REST API",
+    "RESTful APIs": "REST API",
+    "WebSocket": "WebSockets",
+    "OAuth 2.0": "OAuth2",
+    "Large Language Models": "LLM",
+    "LLMs": "LLM",
+    "Natural Language Processing": "NLP",
+    "Visual Studio Code": "VS Code",
+    "VSCode": "VS Code",
+    "Team Work": "Teamwork",
+    "Problem-Solving": "Problem Solving",
+    "Time-Management": "Time Management",
+}
+
+# Names that are also everyday English words ("the rest of the year", "to
+# express my ideas", "a swift reply"). Resume text matches them only as
+# written here or in capitals; the rest of the vocabulary is case-insensitive.
+CASE_SENSITIVE_SKILLS = frozenset({
+    "REST", "Express", "Node", "Spark", "Rails", "Vue", "Mongo",
+    "Swift", "Rust", "Oracle", "Eclipse", "Jest", "Mocha", "Chai",
+})
+
+
+_SEPARATORS_RE = re.compile(r"[\s./\-_]+")
+
+
+def _lookup_key(name: str) -> str:
+    return _SEPARATORS_RE.sub(" ", name.casefold()).strip()
+
+
+_CANONICAL = {_lookup_key(skill): skill for skill in TECH_SKILLS + SOFT_SKILLS}
+_CANONICAL.update({_lookup_key(alias): canonical for alias, canonical in SKILL_ALIASES.items()})
+
+
+def canonical_skill(name: str) -> str:
+    """Canonical vocabulary name for ``name``, or the trimmed input if unknown."""
+    return _CANONICAL.get(_lookup_key(name), name.strip())
+
+
+def normalize_skill_set(skills: Iterable[str]) -> List[str]:
+    """Sorted, lower-cased, alias-collapsed and de-duplicated skill names."""
+    return sorted({canonical_skill(skill).casefold() for skill in skills if skill and skill.strip()})
@@ -1,9 +1,181 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+from typing import List
+import uvicorn
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import lifecycle, metrics
+from common.concurrency import run_blocking
+from utils.emotion_aggregator import AggregateRegistry
+from utils.text_emotion import analyze_text
 
 app = FastAPI()
+metrics.install(app, "emotion")
+
+
+def _load_audio_analysis():
+    # numpy is only needed once audio arrives; load it before the first stream
+    import utils.audio_analysis  # noqa: F401
+
+
+readiness = lifecycle.install(app, [_load_audio_analysis])
+
+aggregates = AggregateRegistry(
+    max_entries=int(os.getenv("EMOTION_MAX_AGGREGATES", "20000")),
+    ttl_seconds=float(os.getenv("EMOTION_AGGREGATE_TTL", "3600")),
+)
+
+# Samples accepted per WebSocket message
+MAX_BATCH = int(os.getenv("EMOTION_MAX_BATCH", "500"))
+metrics.add_collector(aggregates.collect)
 
+# Answers accepted per text-emotion batch request
+MAX_TEXT_BATCH = int(os.getenv("EMOTION_MAX_TEXT_BATCH", "100"))
+# Largest binary audio message (bytes of 16-bit PCM; 1 MB is ~30 s at 16 kHz)
+MAX_AUDIO_CHUNK = int(os.getenv("EMOTION_MAX_AUDIO_CHUNK", str(1024 * 1024)))
+
+
+class TextRequest(BaseModel):
+    text: str
+
+class TextBatchRequest(BaseModel):
+    texts: List[str]
 
 
 @app.get("/ping")
 async def ping():
-    return {"status" : "ok"}
\ No newline at end of file
+    return {"status" : "ok"}
+
+
+@app.websocket("/ws/emotion/{session_id}")
+async def emotion_stream(websocket: WebSocket, session_id: str):
+    """
+    Ingest per-frame emotion samples for one interview session.
+
+    Messages (JSON):
+        {"question_id": "...", "samples": [{"emotion", "confidence", "stressLevel", "engagement", "timestamp"}, ...]}
+            folds the samples into that answer's running aggregate (a single
+            "sample" object is accepted too); nothing is sent back
+        {"type": "summary", "question_id": "..."}
+            replies {"type": "summary", "question_id", "data": summary}
+        {"type": "audio_start", "question_id": "...", "sample_rate": 16000}
+            routes the binary messages that follow to that answer
+
+    Binary messages are 16-bit little-endian mono PCM of the answer named
+    by the last "audio_start"; the delivery metrics computed from them
+    appear in the summary under "delivery".
+
+    Aggregates outlive the connection, so the summary can also be fetched
+    over HTTP when the answer is submitted.
+    """
+    await websocket.accept()
+    audio_question = None
+    sample_rate = 16000
+    try:
+        while True:
+            raw = await websocket.receive()
+            if raw["type"] == "websocket.disconnect":
+                break
+            if raw.get("bytes") is not None:
+                if audio_question is None:
+                    await websocket.send_json({"type": "error", "error": "Send audio_start before audio"})
+                elif len(raw["bytes"]) > MAX_AUDIO_CHUNK:
+                    await websocket.send_json({"type": "error", "error": f"Audio chunks are limited to {MAX_AUDIO_CHUNK} bytes"})
+                else:
+                    # PCM analysis is CPU work: keep it off the loop other sessions share
+                    await run_blocking(aggregates.add_audio, session_id, audio_question, raw["bytes"], sample_rate)
+                continue
+            try:
+                message = json.loads(raw.get("text") or "")
+            except ValueError:
+                await websocket.send_json({"type": "error", "error": "Invalid JSON"})
+                continue
+            if not isinstance(message, dict) or message.get("question_id") is None:
+                await websocket.send_json({"type": "error", "error": "question_id is required"})
+                continue
+
+            question_id = str(message["question_id"])
+            if message.get("type") == "summary":
+                await websocket.send_json({
+                    "type": "summary",
+                    "question_id": question_id,
+                    "data": aggregates.summary(session_id, question_id),
+                })
+                continue
+            if message.get("type") == "audio_start":
+                rate = message.get("sample_rate", 16000)
+                if not isinstance(rate, int) or not 8000 <= rate <= 48000:
+                    await websocket.send_json({"type": "error", "error": "sample_rate must be between 8000 and 48000"})
+                    continue
+                audio_question, sample_rate = question_id, rate
+                continue
+
+            samples = message.get("samples")
+            if samples is None and "sample" in message:
+                samples = [message["sample"]]
+            if not isinstance(samples, list) or len(samples) > MAX_BATCH:
+                await websocket.send_json({"type": "error", "error": f"samples must be a list of at most {MAX_BATCH} items"})
+                continue
+            aggregates.add_samples(session_id, question_id, samples)
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/api/emotion_summary/{session_id}/{question_id}")
+async def emotion_summary(session_id: str, question_id: str):
+    """
+    Compact emotion summary of one answer, ready to pass to feedback_generator
+    as ``emotion_data``.
+    """
+    summary = aggregates.summary(session_id, question_id)
+    if summary is None:
+        return {
+            "error": "No emotion samples for this answer",
+            "success": False
+        }
+    return {
+        "success": True,
+        "data": summary
+    }
+
+
+@app.post("/api/text_emotion")
+async def text_emotion(request: TextRequest):
+    """
+    Estimate emotion metrics from the answer text when no video data exists.
+
+    Returns:
+        dict: emotion summary with source "text_analysis_fallback", ready to
+        pass to feedback_generator as ``emotion_data``
+    """
+    return {
+        "success": True,
+        "data": analyze_text(request.text)
+    }
+
+
+@app.post("/api/text_emotion/batch")
+async def text_emotion_batch(request: TextBatchRequest):
+    """Text-based emotion summaries for several answers, in request order"""
+    if len(request.texts) > MAX_TEXT_BATCH:
+        return {
+            "error": f"At most {MAX_TEXT_BATCH} answers per batch",
+            "success": False
+        }
+    return {
+        "success": True,
+        "data": [analyze_text(text) for text in request.texts]
+    }
+
+
+@app.get("/api/emotion_stats")
+async def emotion_stats():
+    """Sample counters and number of live aggregates"""
+    return aggregates.snapshot()
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8003)
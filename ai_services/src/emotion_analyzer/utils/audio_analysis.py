@@ -0,0 +1,262 @@
+"""
+Streaming delivery analysis of an answer's microphone audio.
+
+PCM chunks go into a fixed-size sample buffer; whenever it fills (and
+before a summary) every complete frame in it is analyzed in one
+vectorized pass:
+
+    frame energy (dBFS) -> adaptive noise floor -> speech / silence
+    FFT autocorrelation -> pitch and voicing
+    energy peaks -> syllable nuclei (speaking rate)
+    speech and silence runs -> pauses and filled pauses ("um", "uh")
+
+Only running totals and the current run survive a pass, so memory is the
+same for a ten-second answer as for a ten-minute one. ``summary()`` has
+source "audio_analysis" and is attached to the answer's emotion summary
+under "delivery".
+"""
+import os
+
+import numpy as np
+
+from utils.emotion_aggregator import RunningStats
+
+# Analysis frame and hop; 32 ms frames fit one period of a 70 Hz voice
+FRAME_MS = 32
+HOP_MS = 16
+# Seconds of 16-bit samples buffered before a vectorized pass
+BUFFER_SECONDS = float(os.getenv("EMOTION_AUDIO_BUFFER_SECONDS", "0.5"))
+
+PITCH_RANGE = (70.0, 400.0)
+# Normalized autocorrelation peak above which a frame counts as voiced
+VOICING_THRESHOLD = 0.4
+
+# Speech is this far above the tracked noise floor, and above an absolute floor
+SPEECH_MARGIN_DB = 12.0
+SILENCE_DB = -50.0
+# How fast (dB per frame) the noise floor creeps up after a quiet frame
+FLOOR_RISE_DB = 0.02
+
+# Energy rise (dB) over the preceding ~100 ms that marks a syllable nucleus
+PEAK_DB = 3.0
+PEAK_CONTEXT = 6
+
+# Silence between speech that counts as a pause, and as a long one
+PAUSE_MIN_MS = 250
+LONG_PAUSE_MS = 2000
+
+# A filled pause is a short, mostly voiced run with flat pitch and one
+# nucleus that sits in a hesitation gap: silence of FILLER_GAP_MS on both sides
+FILLER_MS = (250, 1200)
+FILLER_GAP_MS = 150
+FILLER_VOICED_SHARE = 0.8
+FILLER_PITCH_CV = 0.05
+
+# Average syllables per English word, for the words/minute estimate
+SYLLABLES_PER_WORD = 1.5
+
+
+def pcm16_to_array(data: bytes) -> np.ndarray:
+    """Little-endian 16-bit mono PCM to an int16 array (a trailing odd byte is dropped)."""
+    return np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+
+
+class AudioAnalyzer:
+    """
+    Incremental delivery metrics for one answer.
+
+    Usage:
+        analyzer = AudioAnalyzer(16000)
+        for chunk in pcm_chunks:
+            analyzer.feed(chunk)
+        analyzer.summary()
+    """
+
+    def __init__(self, sample_rate: int = 16000, buffer_seconds: float = BUFFER_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * FRAME_MS / 1000)
+        self.hop = int(sample_rate * HOP_MS / 1000)
+        self.min_lag = int(sample_rate / PITCH_RANGE[1])
+        self.max_lag = min(self.frame - 1, int(sample_rate / PITCH_RANGE[0]))
+        self._window = np.hanning(self.frame).astype(np.float32)
+        self._buffer = np.zeros(max(self.frame * 2, int(sample_rate * buffer_seconds)), dtype=np.int16)
+        self._filled = 0
+
+        self.frames = 0
+        self.speech_frames = 0
+        self.energy = RunningStats()
+        self.pitch = RunningStats()
+        self.syllables = 0
+        self.pauses = 0
+        self.long_pauses = 0
+        self.pause_frames = 0
+        self.fillers = 0
+        self._floor = None
+        self._context = np.full(PEAK_CONTEXT + 3, SILENCE_DB * 2, dtype=np.float32)
+        self._context_speech = np.zeros(1, dtype=bool)
+        self._spoken = False
+        self._last_gap_ms = LONG_PAUSE_MS
+        self._filler_pending = False
+        # Current run: [is_speech, frames, voiced frames, pitch sum, pitch sum of squares, nuclei]
+        self._run = None
+
+    def feed(self, chunk):
+        """
+        Add PCM audio.
+
+        Args:
+            chunk: 16-bit little-endian mono bytes, or an int16 array
+        """
+        samples = pcm16_to_array(chunk) if isinstance(chunk, (bytes, bytearray, memoryview)) else np.asarray(chunk, dtype=np.int16)
+        capacity = len(self._buffer)
+        while len(samples):
+            space = capacity - self._filled
+            taken = samples[:space]
+            self._buffer[self._filled:self._filled + len(taken)] = taken
+            self._filled += len(taken)
+            samples = samples[len(taken):]
+            if self._filled == capacity:
+                self._process()
+
+    def _process(self):
+        """Analyze every complete frame in the buffer and keep the overlap."""
+        if self._filled < self.frame:
+            return
+        count = (self._filled - self.frame) // self.hop + 1
+        frames = np.lib.stride_tricks.sliding_window_view(self._buffer[:self._filled], self.frame)[::self.hop][:count]
+        self._analyze(frames.astype(np.float32) / 32768.0)
+        consumed = count * self.hop
+        rest = self._filled - consumed
+        self._buffer[:rest] = self._buffer[consumed:self._filled]
+        self._filled = rest
+
+    def _analyze(self, frames: np.ndarray):
+        count = len(frames)
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        power = np.einsum("ij,ij->i", frames, frames) / self.frame
+        db = 10.0 * np.log10(power + 1e-10).astype(np.float32)
+
+        # Noise floor: running minimum that rises by FLOOR_RISE_DB per frame,
+        # i.e. floor[t] = min(floor_in + rise * (t + 1), min_k<=t db[k] + rise * (t - k))
+        ramp = FLOOR_RISE_DB * np.arange(count, dtype=np.float32)
+        floor = np.minimum.accumulate(db - ramp) + ramp
+        if self._floor is not None:
+            floor = np.minimum(floor, self._floor + FLOOR_RISE_DB * (ramp + 1))
+        self._floor = float(floor[-1])
+        speech = (db > floor + SPEECH_MARGIN_DB) & (db > SILENCE_DB)
+
+        # Pitch from the FFT autocorrelation of the windowed frames
+        spectrum = np.fft.rfft(frames * self._window, n=2 * self.frame, axis=1)
+        autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, axis=1)[:, :self.max_lag + 1]
+        lags = autocorr[:, self.min_lag:]
+        best = lags.argmax(axis=1)
+        strength = lags[np.arange(count), best] / np.maximum(autocorr[:, 0], 1e-12)
+        voiced = speech & (strength >= VOICING_THRESHOLD)
+        pitch = self.sample_rate / (best + self.min_lag)
+
+        # Syllable nucleus at t when the 3-frame energy envelope peaked at t-1
+        # after rising PEAK_DB over the preceding frames; context carries
+        # across passes
+        context = np.concatenate([self._context, db])
+        envelope = (context[2:] + context[1:-1] + context[:-2]) / 3
+        current = envelope[PEAK_CONTEXT + 1:]
+        previous = envelope[PEAK_CONTEXT:-1]
+        before = envelope[PEAK_CONTEXT - 1:-2]
+        valley = np.lib.stride_tricks.sliding_window_view(envelope[:-2], PEAK_CONTEXT).min(axis=1)
+        speech_context = np.concatenate([self._context_speech, speech])
+        nuclei = (previous > before) & (previous >= current) & (previous - valley >= PEAK_DB) & speech & speech_context[:-1]
+        self._context = context[-(PEAK_CONTEXT + 3):]
+        self._context_speech = speech[-1:]
+
+        self.frames += count
+        self.speech_frames += int(speech.sum())
+        self.energy.extend(db[speech])
+        self.pitch.extend(pitch[voiced])
+        self.syllables += int(nuclei.sum())
+        self._runs(speech, voiced, np.where(voiced, pitch, 0.0), nuclei)
+
+    def _runs(self, speech, voiced, pitch, nuclei):
+        """Fold per-frame flags into speech/silence runs; the last run stays open."""
+        starts = np.concatenate([[0], np.flatnonzero(speech[1:] != speech[:-1]) + 1])
+        lengths = np.diff(np.append(starts, len(speech)))
+        voiced_counts = np.add.reduceat(voiced.astype(np.int64), starts)
+        pitch_sums = np.add.reduceat(pitch, starts)
+        pitch_squares = np.add.reduceat(pitch * pitch, starts)
+        nuclei_counts = np.add.reduceat(nuclei.astype(np.int64), starts)
+
+        for index, start in enumerate(starts.tolist()):
+            run = [bool(speech[start]), int(lengths[index]), int(voiced_counts[index]),
+                   float(pitch_sums[index]), float(pitch_squares[index]), int(nuclei_counts[index])]
+            if self._run is not None and self._run[0] == run[0]:
+                for field in range(1, 6):
+                    self._run[field] += run[field]
+                continue
+            if self._run is not None:
+                self._close(self._run)
+            self._run = run
+
+    def _close(self, run):
+        if run[0]:
+            self._spoken = True
+            self._filler_pending = self._last_gap_ms >= FILLER_GAP_MS and self._is_filler(run)
+            return
+        duration_ms = run[1] * HOP_MS
+        self._last_gap_ms = duration_ms
+        if self._filler_pending and duration_ms >= FILLER_GAP_MS:
+            self.fillers += 1
+        self._filler_pending = False
+        # Silence before the first word is not a pause
+        if self._spoken and duration_ms >= PAUSE_MIN_MS:
+            self.pauses += 1
+            self.pause_frames += run[1]
+            if duration_ms >= LONG_PAUSE_MS:
+                self.long_pauses += 1
+
+    @staticmethod
+    def _is_filler(run) -> bool:
+        _, frames, voiced, pitch_sum, pitch_squares, nuclei = run
+        if not FILLER_MS[0] <= frames * HOP_MS <= FILLER_MS[1] or voiced < FILLER_VOICED_SHARE * frames or nuclei > 1:
+            return False
+        mean = pitch_sum / voiced
+        spread = max(0.0, pitch_squares / voiced - mean * mean) ** 0.5
+        return spread <= FILLER_PITCH_CV * mean
+
+    def summary(self) -> dict:
+        """
+        Delivery metrics so far.
+
+        Returns:
+            dict: speakingRate (estimated words/min), syllablesPerSecond,
+            pauseRatio, pauses, longPauses, fillers, fillersPerMinute,
+            avgEnergyDb, energyStdDb, avgPitchHz, pitchStdHz, speakingTime
+            and duration (ms), source "audio_analysis"
+        """
+        self._process()
+        # A filler at the very end of the audio has no gap after it yet; trailing
+        # silence is never a pause
+        run = self._run
+        fillers = self.fillers
+        if run is not None and run[0]:
+            fillers += self._last_gap_ms >= FILLER_GAP_MS and self._is_filler(run)
+        elif self._filler_pending:
+            fillers += 1
+        speaking_seconds = self.speech_frames * HOP_MS / 1000
+        minutes = max(speaking_seconds / 60, 1e-9)
+        syllable_rate = self.syllables / speaking_seconds if speaking_seconds else 0.0
+        spoken = self.speech_frames + self.pause_frames
+        return {
+            "speakingRate": round(syllable_rate * 60 / SYLLABLES_PER_WORD),
+            "syllablesPerSecond": round(syllable_rate, 2),
+            "pauseRatio": round(self.pause_frames / spoken, 3) if spoken else 0.0,
+            "pauses": self.pauses,
+            "longPauses": self.long_pauses,
+            "fillers": fillers,
+            "fillersPerMinute": round(fillers / minutes, 1) if speaking_seconds else 0.0,
+            "avgEnergyDb": round(self.energy.mean, 1),
+            "energyStdDb": round(self.energy.std, 1),
+            "avgPitchHz": round(self.pitch.mean),
+            "pitchStdHz": round(self.pitch.std, 1),
+            "speakingTime": round(speaking_seconds * 1000),
+            "duration": round(self.frames * HOP_MS),
+            "source": "audio_analysis",
+        }
@@ -0,0 +1,279 @@
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Emotions kept for the "journey" shown in the feedback prompt
+RECENT_WINDOW = 10
+
+METRICS = ("confidence", "stressLevel", "engagement")
+
+# Distinct emotion labels tracked per answer; guards memory against junk labels
+MAX_LABELS = 16
+MAX_LABEL_LENGTH = 32
+
+
+class RunningStats:
+    """Welford running mean/variance with min and max, O(1) memory."""
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def extend(self, values):
+        """Fold a NumPy array of values in at once (Chan et al. pairwise update)."""
+        count = len(values)
+        if not count:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        low, high = float(values.min()), float(values.max())
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / self.count) if self.count > 1 else 0.0
+
+
+def _metric(sample: dict, name: str):
+    value = sample.get(name)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return min(100.0, max(0.0, float(value)))
+
+
+class EmotionAggregate:
+    """
+    Running aggregates of the per-frame samples of one answer.
+
+    Memory is constant in the number of samples: three RunningStats, one
+    counter per distinct emotion label (at most MAX_LABELS), one per
+    observed transition and a fixed-size window of the latest emotions.
+    """
+
+    __slots__ = ("stats", "emotion_counts", "transitions", "transition_count", "recent", "last_emotion",
+                 "first_timestamp", "last_timestamp", "samples", "rejected", "updated_at", "audio", "lock")
+
+    def __init__(self):
+        self.stats = {name: RunningStats() for name in METRICS}
+        self.emotion_counts = {}
+        self.transitions = {}
+        self.transition_count = 0
+        self.recent = deque(maxlen=RECENT_WINDOW)
+        self.last_emotion = None
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.samples = 0
+        self.rejected = 0
+        self.updated_at = time.monotonic()
+        # AudioAnalyzer of the answer's microphone stream, if one was sent
+        self.audio = None
+        # Guards this answer only; the registry lock is never held while analysing
+        self.lock = threading.Lock()
+
+    def add(self, sample: dict) -> bool:
+        """Fold one frame sample in; returns False (and counts it) when it is unusable."""
+        emotion = sample.get("emotion") if isinstance(sample, dict) else None
+        counts = self.emotion_counts
+        if (
+            not isinstance(emotion, str) or not emotion or len(emotion) > MAX_LABEL_LENGTH
+            or (emotion not in counts and len(counts) >= MAX_LABELS)
+        ):
+            self.rejected += 1
+            return False
+        values = [_metric(sample, name) for name in METRICS]
+        if values == [None, None, None]:
+            self.rejected += 1
+            return False
+
+        self.samples += 1
+        stats = self.stats
+        for name, value in zip(METRICS, values):
+            if value is not None:
+                stats[name].add(value)
+        if emotion in counts:
+            counts[emotion] += 1
+        else:
+            # Labels repeat across thousands of aggregates; share one string
+            emotion = sys.intern(emotion)
+            counts[emotion] = 1
+        last = self.last_emotion
+        if last is not None and emotion != last:
+            pair = sys.intern(f"{last}->{emotion}")
+            self.transitions[pair] = self.transitions.get(pair, 0) + 1
+            self.transition_count += 1
+        self.last_emotion = emotion
+        self.recent.append(emotion)
+
+        timestamp = sample.get("timestamp")
+        if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+            if self.first_timestamp is None or timestamp < self.first_timestamp:
+                self.first_timestamp = timestamp
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+        return True
+
+    def summary(self) -> dict:
+        """
+        Compact summary in the shape feedback_generator reads as ``emotion_data``.
+
+        Returns:
+            dict: predominantEmotion, avgConfidence/avgStress/avgEngagement,
+            their std deviations, emotionCounts, distinctEmotions, transitions,
+            emotionHistory (latest RECENT_WINDOW emotions only), totalSamples,
+            duration (ms) and source; "delivery" holds the audio metrics when
+            audio was streamed, and source is "audio_analysis" when only
+            audio was
+        """
+        predominant = max(self.emotion_counts, key=self.emotion_counts.get) if self.emotion_counts else "neutral"
+        confidence, stress, engagement = (self.stats[name] for name in METRICS)
+        duration = 0
+        if self.first_timestamp is not None:
+            duration = self.last_timestamp - self.first_timestamp
+        summary = {
+            "predominantEmotion": predominant,
+            "avgConfidence": round(confidence.mean),
+            "avgStress": round(stress.mean),
+            "avgEngagement": round(engagement.mean),
+            "stdConfidence": round(confidence.std, 1),
+            "stdStress": round(stress.std, 1),
+            "stdEngagement": round(engagement.std, 1),
+            "emotionCounts": dict(self.emotion_counts),
+            "distinctEmotions": len(self.emotion_counts),
+            "transitions": self.transition_count,
+            "topTransitions": dict(sorted(self.transitions.items(), key=lambda item: -item[1])[:5]),
+            "emotionHistory": list(self.recent),
+            "totalSamples": self.samples,
+            "duration": duration,
+            "source": "video_tracking",
+        }
+        if self.audio is not None:
+            summary["delivery"] = self.audio.summary()
+            if not self.samples:
+                summary["source"] = "audio_analysis"
+        return summary
+
+
+class AggregateRegistry:
+    """
+    Aggregates keyed by (session_id, question_id), bounded in count and age.
+
+    Entries idle for ``ttl_seconds`` or beyond ``max_entries`` (least
+    recently updated first) are dropped on insert, so the registry stays
+    bounded however many sessions a worker sees.
+
+    The registry lock only covers lookups, eviction and counters; folding
+    samples and analysing audio happen under the answer's own lock, so a
+    slow stream holds up nobody else.
+    """
+
+    def __init__(self, max_entries: int = 20000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"samples": 0, "rejected": 0, "evicted": 0, "audio_bytes": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now: float):
+        entries = self._entries
+        while entries:
+            key, oldest = next(iter(entries.items()))
+            if len(entries) <= self.max_entries and now - oldest.updated_at < self.ttl_seconds:
+                break
+            del entries[key]
+            self.stats["evicted"] += 1
+
+    def _get(self, key) -> EmotionAggregate:
+        # Caller holds the lock
+        now = time.monotonic()
+        aggregate = self._entries.get(key)
+        if aggregate is None:
+            aggregate = self._entries[key] = EmotionAggregate()
+            self._evict(now)
+        else:
+            self._entries.move_to_end(key)
+        aggregate.updated_at = now
+        return aggregate
+
+    def add_samples(self, session_id: str, question_id: str, samples) -> EmotionAggregate:
+        """Fold a batch of samples into one answer's aggregate."""
+        with self._lock:
+            aggregate = self._get((session_id, question_id))
+        with aggregate.lock:
+            accepted = sum(aggregate.add(sample) for sample in samples)
+        with self._lock:
+            self.stats["samples"] += accepted
+            self.stats["rejected"] += len(samples) - accepted
+        return aggregate
+
+    def add_audio(self, session_id: str, question_id: str, chunk: bytes, sample_rate: int = 16000) -> EmotionAggregate:
+        """
+        Feed a chunk of 16-bit mono PCM into one answer's audio analyzer.
+
+        This is the heavy per-frame work: callers on the event loop run it
+        through ``run_blocking``.
+        """
+        with self._lock:
+            aggregate = self._get((session_id, question_id))
+        with aggregate.lock:
+            if aggregate.audio is None:
+                # audio_analysis builds on RunningStats, so import it late
+                from utils.audio_analysis import AudioAnalyzer
+
+                aggregate.audio = AudioAnalyzer(sample_rate)
+            aggregate.audio.feed(chunk)
+        with self._lock:
+            self.stats["audio_bytes"] += len(chunk)
+        return aggregate
+
+    def summary(self, session_id: str, question_id: str):
+        with self._lock:
+            aggregate = self._entries.get((session_id, question_id))
+        if aggregate is None:
+            return None
+        with aggregate.lock:
+            return aggregate.summary()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "aggregates": len(self._entries)}
+
+    def collect(self):
+        """Metric families for ``common.metrics.add_collector``."""
+        from common import metrics
+
+        snapshot = self.snapshot()
+        yield metrics.Family("ai_emotion_samples_total", "counter", "Emotion samples by outcome", [
+            ({"outcome": "accepted"}, snapshot["samples"]),
+            ({"outcome": "rejected"}, snapshot["rejected"]),
+        ])
+        yield metrics.Family("ai_emotion_audio_bytes_total", "counter", "PCM audio bytes analyzed", [({}, snapshot["audio_bytes"])])
+        yield metrics.Family("ai_emotion_aggregates", "gauge", "Answers with a live aggregate", [({}, snapshot["aggregates"])])
+        yield metrics.Family("ai_emotion_evicted_total", "counter", "Aggregates evicted by size or age", [({}, snapshot["evicted"])])
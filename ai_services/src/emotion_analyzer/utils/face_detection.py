@@ -0,0 +1,142 @@
+"""
+Batched face localisation for webcam interview frames, NumPy only.
+
+Every operation works on a whole batch of frames at once: frames are
+block-averaged down to ``DETECT_SIZE``, converted to chroma, thresholded
+to a skin mask, and the face box is read off the row and column
+projections of the mask. An interview webcam frame holds one roughly
+centred face, which is the case this cheap detector is built for.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+# (height, width) frames are reduced to before detection and scoring
+DETECT_SIZE = (120, 160)
+
+# Skin range in the YCrCb chroma plane (Chai & Ngan); robust to brightness
+CR_RANGE = (133.0, 173.0)
+CB_RANGE = (77.0, 127.0)
+
+# A face must cover at least this share of the frame to count as present
+MIN_FACE_COVERAGE = 0.01
+# Rows/columns whose skin share is below this fraction of the peak are background
+PROJECTION_THRESHOLD = 0.35
+
+
+class FaceBoxes(NamedTuple):
+    found: np.ndarray      # (N,) bool
+    boxes: np.ndarray      # (N, 4) float32, normalized x0, y0, x1, y1
+    coverage: np.ndarray   # (N,) float32, skin share of the frame
+
+
+def downscale(frames: np.ndarray, size=DETECT_SIZE) -> np.ndarray:
+    """
+    Reduce a batch of frames to ``size`` by averaging 2x2 taps per block.
+
+    Sampling four spread-out pixels of each block instead of all of them
+    is plenty for chroma thresholding and is several times cheaper than a
+    full block mean on camera-sized frames.
+
+    Args:
+        frames: (N, H, W, 3) uint8 RGB frames
+        size: target (height, width); H and W are cropped to whole blocks
+
+    Returns:
+        np.ndarray: (N, h, w, 3) float32
+    """
+    frames = np.asarray(frames)
+    if frames.ndim == 3:
+        frames = frames[None]
+    count, height, width = frames.shape[:3]
+    target_h, target_w = size
+    block_h = max(1, height // target_h)
+    block_w = max(1, width // target_w)
+    out_h, out_w = height // block_h, width // block_w
+    offsets_y = sorted({0, block_h // 2})
+    offsets_x = sorted({0, block_w // 2})
+    out = np.zeros((count, out_h, out_w, 3), dtype=np.float32)
+    for dy in offsets_y:
+        for dx in offsets_x:
+            out += frames[:, dy:dy + out_h * block_h:block_h, dx:dx + out_w * block_w:block_w, :3]
+    out /= len(offsets_y) * len(offsets_x)
+    return out
+
+
+def luminance(small: np.ndarray) -> np.ndarray:
+    """(N, h, w) luma of downscaled RGB frames."""
+    return small @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def skin_mask(small: np.ndarray) -> np.ndarray:
+    """(N, h, w) bool skin mask of downscaled RGB frames."""
+    red, green, blue = small[..., 0], small[..., 1], small[..., 2]
+    cr = 0.5 * red - 0.4187 * green - 0.0813 * blue + 128.0
+    cb = -0.1687 * red - 0.3313 * green + 0.5 * blue + 128.0
+    return (cr >= CR_RANGE[0]) & (cr <= CR_RANGE[1]) & (cb >= CB_RANGE[0]) & (cb <= CB_RANGE[1])
+
+
+def _extent(profile: np.ndarray):
+    """First and last index per row of a (N, L) profile above its threshold."""
+    length = profile.shape[1]
+    above = profile >= PROJECTION_THRESHOLD * profile.max(axis=1, keepdims=True)
+    first = above.argmax(axis=1)
+    last = length - 1 - above[:, ::-1].argmax(axis=1)
+    return first, last
+
+
+def detect_faces(small: np.ndarray) -> FaceBoxes:
+    """
+    Locate the face in each downscaled frame.
+
+    Args:
+        small: (N, h, w, 3) float32 frames from ``downscale``
+
+    Returns:
+        FaceBoxes with normalized boxes; ``found`` is False for frames
+        without enough skin or with an implausible box shape
+    """
+    mask = skin_mask(small)
+    count, height, width = mask.shape
+    coverage = mask.mean(axis=(1, 2)).astype(np.float32)
+    top, bottom = _extent(mask.mean(axis=2))
+    left, right = _extent(mask.mean(axis=1))
+
+    boxes = np.stack([left / width, top / height, (right + 1) / width, (bottom + 1) / height], axis=1).astype(np.float32)
+    box_w = boxes[:, 2] - boxes[:, 0]
+    box_h = boxes[:, 3] - boxes[:, 1]
+    aspect = np.divide(box_h, box_w, out=np.zeros_like(box_h), where=box_w > 0)
+    found = (coverage >= MIN_FACE_COVERAGE) & (aspect > 0.6) & (aspect < 2.5)
+    return FaceBoxes(found, boxes, coverage)
+
+
+def crop_regions(values: np.ndarray, boxes: np.ndarray, rows: tuple, cols: tuple = (0.0, 1.0)):
+    """
+    Mean and std of a (N, h, w) map inside a sub-rectangle of each face box.
+
+    Args:
+        values: per-pixel map, e.g. luminance
+        boxes: (N, 4) normalized boxes
+        rows: (start, stop) as fractions of the box height, e.g. (0.65, 0.9) for the mouth
+        cols: (start, stop) as fractions of the box width
+
+    Returns:
+        tuple: (mean, std), each (N,) float32
+    """
+    count, height, width = values.shape
+    ys = (np.arange(height, dtype=np.float32) + 0.5) / height
+    xs = (np.arange(width, dtype=np.float32) + 0.5) / width
+    box_w = boxes[:, 2] - boxes[:, 0]
+    box_h = boxes[:, 3] - boxes[:, 1]
+    y0 = boxes[:, 1] + rows[0] * box_h
+    y1 = boxes[:, 1] + rows[1] * box_h
+    x0 = boxes[:, 0] + cols[0] * box_w
+    x1 = boxes[:, 0] + cols[1] * box_w
+    in_rows = (ys[None, :] >= y0[:, None]) & (ys[None, :] < y1[:, None])
+    in_cols = (xs[None, :] >= x0[:, None]) & (xs[None, :] < x1[:, None])
+    region = in_rows[:, :, None] & in_cols[:, None, :]
+    pixels = region.sum(axis=(1, 2)).astype(np.float32)
+    safe = np.maximum(pixels, 1.0)
+    mean = (values * region).sum(axis=(1, 2)) / safe
+    variance = ((values - mean[:, None, None]) ** 2 * region).sum(axis=(1, 2)) / safe
+    return mean.astype(np.float32), np.sqrt(variance).astype(np.float32)
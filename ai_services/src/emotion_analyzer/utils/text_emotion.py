@@ -0,0 +1,165 @@
+"""
+Emotion estimates from answer text, for candidates without camera data.
+
+A small lexicon/feature model: one tokenizing pass finds hedges, filler
+phrases, assertiveness and engagement markers through a precompiled
+first-word index, sentence lengths give the variance feature, and fixed
+weights map the per-100-word rates onto the 0-100 confidence, stress and
+engagement scales of the video tracker. No LLM is involved; a typical
+answer takes about a microsecond per word.
+
+The result has the shape of an emotion summary with source
+"text_analysis_fallback", which ``build_emotion_context`` already
+describes as text-based.
+"""
+import re
+
+# Phrases per feature; multi-word phrases are matched before their prefixes
+LEXICON = {
+    "hedge": [
+        "maybe", "perhaps", "probably", "possibly", "might", "i think", "i guess", "i suppose",
+        "i believe", "not sure", "i'm not sure", "not really sure", "sort of", "kind of",
+        "somewhat", "could be", "i don't know", "don't remember", "if i remember", "hopefully",
+    ],
+    "filler": [
+        "um", "umm", "uh", "uhh", "er", "hmm", "you know", "i mean", "basically", "like i said",
+        "so yeah", "or something", "and stuff", "whatever", "literally",
+    ],
+    "assertive": [
+        "definitely", "certainly", "clearly", "absolutely", "always", "exactly", "i would",
+        "i will", "i built", "i implemented", "i designed", "i led", "i decided", "i chose",
+        "i know", "the key is", "the best way", "specifically", "in practice", "we shipped",
+    ],
+    "engagement": [
+        "for example", "for instance", "because", "therefore", "however", "first", "second",
+        "then", "finally", "trade-off", "tradeoff", "in my experience", "the reason",
+        "which means", "on the other hand", "such as", "step", "compared to", "instead of",
+    ],
+}
+
+# First word -> [(phrase words, feature)], longest phrase first, so one
+# dict lookup per word rejects almost every word of an answer
+_PHRASES = {}
+for _name, _phrases in LEXICON.items():
+    for _phrase in _phrases:
+        _words = tuple(_phrase.split())
+        _PHRASES.setdefault(_words[0], []).append((_words, _name))
+for _candidates in _PHRASES.values():
+    _candidates.sort(key=lambda candidate: -len(candidate[0]))
+
+# Words (with inner apostrophes/hyphens) and sentence terminators, in one pass
+_TOKEN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*|[.!?]+")
+
+# Model weights: score = base + sum(weight * rate per 100 words), clamped to 0-100
+WEIGHTS = {
+    "confidence": {"base": 55.0, "hedge": -3.0, "filler": -3.0, "assertive": 2.5},
+    "stress": {"base": 30.0, "hedge": 4.0, "filler": 4.0, "assertive": -1.5},
+    "engagement": {"base": 40.0, "engagement": 3.0},
+}
+# Cap on any feature rate, so one short answer full of "maybe" does not saturate
+MAX_RATE = 8.0
+# Sentence-length coefficient of variation above which delivery reads as erratic
+ERRATIC_CV = 0.8
+
+ANALYSIS_NOTE = "Emotion data estimated from answer text analysis (video tracking unavailable)"
+
+
+def text_features(text: str) -> dict:
+    """
+    Lexicon counts and sentence statistics of one answer.
+
+    Returns:
+        dict: words, sentences, hedge, filler, assertive, engagement (counts),
+        sentenceLengthMean and sentenceLengthCv
+    """
+    tokens = _TOKEN.findall(text.lower())
+    counts = {"hedge": 0, "filler": 0, "assertive": 0, "engagement": 0}
+    skip_to = 0
+    for index in [index for index, token in enumerate(tokens) if token in _PHRASES]:
+        if index < skip_to:
+            continue
+        for words, name in _PHRASES[tokens[index]]:
+            if len(words) == 1 or tuple(tokens[index:index + len(words)]) == words:
+                counts[name] += 1
+                skip_to = index + len(words)
+                break
+
+    # Sentence lengths in words, from the positions of the terminators
+    ends = [index for index, token in enumerate(tokens) if token[0] in ".!?"]
+    ends.append(len(tokens))
+    lengths = []
+    previous = -1
+    for end in ends:
+        if end - previous > 1:
+            lengths.append(end - previous - 1)
+        previous = end
+
+    words = sum(lengths)
+    mean = words / len(lengths) if lengths else 0.0
+    spread = (sum((length - mean) ** 2 for length in lengths) / len(lengths)) ** 0.5 if lengths else 0.0
+    return {
+        "words": words,
+        "sentences": len(lengths),
+        **counts,
+        "sentenceLengthMean": round(mean, 1),
+        "sentenceLengthCv": round(spread / mean, 2) if mean else 0.0,
+    }
+
+
+def _clamp(value: float) -> int:
+    return round(min(100.0, max(0.0, value)))
+
+
+def analyze_text(text: str) -> dict:
+    """
+    Estimate confidence, stress and engagement from an answer's text.
+
+    Args:
+        text: the candidate's answer
+
+    Returns:
+        dict: emotion summary (predominantEmotion, avgConfidence, avgStress,
+        avgEngagement, emotionCounts, emotionHistory, totalSamples, duration,
+        source "text_analysis_fallback", analysisNote) plus textFeatures
+    """
+    features = text_features(text or "")
+    words = features["words"]
+    if not words:
+        scores = {"confidence": 50, "stress": 50, "engagement": 50}
+    else:
+        rates = {name: min(MAX_RATE, features[name] * 100.0 / words) for name in ("hedge", "filler", "assertive", "engagement")}
+        scores = {}
+        for metric, weights in WEIGHTS.items():
+            scores[metric] = weights["base"] + sum(weight * rates[name] for name, weight in weights.items() if name != "base")
+
+        # Longer, structured answers read as more confident and engaged
+        scores["confidence"] += min(words / 10.0, 15.0)
+        scores["engagement"] += 20.0 if words > 80 else 10.0 if words > 30 else 0.0
+        if features["sentenceLengthCv"] > ERRATIC_CV:
+            # Run-ons next to fragments: the answer was likely assembled on the fly
+            scores["stress"] += 10.0
+            scores["confidence"] -= 5.0
+        scores = {metric: _clamp(value) for metric, value in scores.items()}
+
+    if scores["confidence"] >= 70 and scores["stress"] < 40:
+        predominant = "confident"
+    elif scores["confidence"] < 50 or scores["stress"] > 60:
+        predominant = "uncertain"
+    elif scores["engagement"] >= 70:
+        predominant = "engaged"
+    else:
+        predominant = "neutral"
+
+    return {
+        "predominantEmotion": predominant,
+        "avgConfidence": scores["confidence"],
+        "avgStress": scores["stress"],
+        "avgEngagement": scores["engagement"],
+        "emotionCounts": {predominant: 1},
+        "emotionHistory": [predominant],
+        "totalSamples": 1,
+        "duration": 0,
+        "source": "text_analysis_fallback",
+        "analysisNote": ANALYSIS_NOTE,
+        "textFeatures": features,
+    }
@@ -0,0 +1,261 @@
+"""
+CPU frame pipeline turning interview video into emotion samples.
+
+    decode (OpenCV, at most EMOTION_SAMPLE_FPS) -> sparse block-average downscale
+    -> adaptive sampling (skip near-identical frames) -> batched face
+    detection -> expression scores
+
+Each sample has the fields the browser tracker sends (emotion,
+confidence, stressLevel, engagement, timestamp), so results fold into the
+same ``EmotionAggregate`` and reach the feedback prompt in the same shape.
+
+Long clips are split into segments that worker processes decode and
+analyze on their own, so a clip scales across cores without shipping raw
+frames between processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.emotion_aggregator import EmotionAggregate
+from utils.face_detection import crop_regions, detect_faces, downscale, luminance
+
+# Frames decoded per second of video; the browser tracker samples at 2/s
+SAMPLE_FPS = float(os.getenv("EMOTION_SAMPLE_FPS", "4"))
+# Mean absolute luma change (0-255) below which a frame adds nothing new
+DIFF_THRESHOLD = float(os.getenv("EMOTION_DIFF_THRESHOLD", "1.5"))
+# Keep at least every Nth decoded frame even when nothing changes
+MAX_GAP = int(os.getenv("EMOTION_MAX_GAP", "8"))
+# Decoded frames per worker task and per vectorized batch
+CHUNK_FRAMES = int(os.getenv("EMOTION_CHUNK_FRAMES", "64"))
+BATCH_FRAMES = 32
+WORKERS = int(os.getenv("EMOTION_WORKERS", str(os.cpu_count() or 1)))
+
+# Face-motion level (mean luma change inside the box) treated as fidgeting
+MOTION_HIGH = 12.0
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=WORKERS)
+    return _pool
+
+
+def select_frames(gray: np.ndarray, threshold: float = DIFF_THRESHOLD, max_gap: int = MAX_GAP) -> np.ndarray:
+    """
+    Indices of the frames worth analyzing.
+
+    A frame is kept once the luma drift accumulated since the last kept
+    frame reaches ``threshold``, or after ``max_gap`` frames regardless.
+
+    Args:
+        gray: (N, h, w) downscaled luma
+    """
+    if len(gray) == 0:
+        return np.zeros(0, dtype=np.intp)
+    diffs = np.abs(np.diff(gray, axis=0)).mean(axis=(1, 2))
+    keep = [0]
+    drift = 0.0
+    gap = 0
+    for index, diff in enumerate(diffs.tolist(), start=1):
+        drift += diff
+        gap += 1
+        if drift >= threshold or gap >= max_gap:
+            keep.append(index)
+            drift = 0.0
+            gap = 0
+    return np.asarray(keep, dtype=np.intp)
+
+
+def score_expressions(gray: np.ndarray, faces) -> dict:
+    """
+    Confidence, stress and engagement per frame from face geometry, motion
+    and mouth brightness, on the same 0-100 scales as the browser tracker.
+
+    Args:
+        gray: (N, h, w) luma of the kept frames, in time order
+        faces: FaceBoxes for those frames
+
+    Returns:
+        dict of (N,) arrays: confidence, stressLevel, engagement, smile, found
+    """
+    boxes = faces.boxes
+    motion_map = np.abs(np.diff(gray, axis=0, prepend=gray[:1]))
+    motion, _ = crop_regions(motion_map, boxes, (0.0, 1.0))
+    # Central parts of the box, away from the background in its corners
+    face_mean, _ = crop_regions(gray, boxes, (0.2, 0.6), (0.25, 0.75))
+    mouth_mean, _ = crop_regions(gray, boxes, (0.68, 0.9), (0.3, 0.7))
+
+    # Teeth showing make the mouth area brighter than the cheeks
+    smile = np.clip((mouth_mean / np.maximum(face_mean, 1.0) - 0.95) / 0.25, 0.0, 1.0)
+    center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    center_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    centering = np.clip(1.0 - np.hypot(center_x - 0.5, center_y - 0.45) / 0.35, 0.0, 1.0)
+    size = np.clip((boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]) / 0.12, 0.0, 1.0)
+    attention = 100.0 * (0.6 * centering + 0.4 * size)
+    fidget = np.clip(motion / MOTION_HIGH, 0.0, 1.0)
+
+    # Same shape as the browser formulas, with head motion standing in for lip press
+    stress = np.clip(fidget * 80.0 + 20.0 - smile * 30.0, 0.0, 100.0)
+    confidence = np.clip(50.0 + attention * 0.3 + smile * 20.0 - fidget * 25.0 - stress * 0.2, 0.0, 100.0)
+    engagement = np.clip(attention * 0.7 + smile * 30.0, 0.0, 100.0)
+    return {
+        "confidence": confidence,
+        "stressLevel": stress,
+        "engagement": engagement,
+        "smile": smile,
+        "found": faces.found,
+    }
+
+
+def _label(found: bool, smile: float, stress: float) -> str:
+    if not found:
+        return "looking_away"
+    if smile >= 0.5:
+        return "happy"
+    if smile >= 0.25:
+        return "polite_smile"
+    if stress >= 70:
+        return "nervous"
+    return "neutral"
+
+
+def analyze_frames(frames: np.ndarray, timestamps=None) -> dict:
+    """
+    Run the pipeline on decoded frames in one process.
+
+    Args:
+        frames: (N, H, W, 3) uint8 RGB frames in time order
+        timestamps: per-frame times in ms (default: frame index * 1000 / SAMPLE_FPS)
+
+    Returns:
+        dict: {"samples": [sample, ...], "frames": N, "analyzed": kept count}
+    """
+    count = len(frames)
+    if count == 0:
+        return {"samples": [], "frames": 0, "analyzed": 0}
+    if timestamps is None:
+        timestamps = np.arange(count) * (1000.0 / SAMPLE_FPS)
+    small = np.concatenate([downscale(frames[start:start + BATCH_FRAMES]) for start in range(0, count, BATCH_FRAMES)])
+    gray = luminance(small)
+    kept = select_frames(gray)
+
+    faces = detect_faces(small[kept])
+    scores = score_expressions(gray[kept], faces)
+    samples = []
+    for position, index in enumerate(kept.tolist()):
+        found = bool(scores["found"][position])
+        sample = {
+            "emotion": _label(found, float(scores["smile"][position]), float(scores["stressLevel"][position])),
+            "engagement": round(float(scores["engagement"][position])) if found else 0,
+            "timestamp": float(timestamps[index]),
+        }
+        if found:
+            sample["confidence"] = round(float(scores["confidence"][position]))
+            sample["stressLevel"] = round(float(scores["stressLevel"][position]))
+        samples.append(sample)
+    return {"samples": samples, "frames": count, "analyzed": len(kept)}
+
+
+def _merge(results) -> dict:
+    merged = {"samples": [], "frames": 0, "analyzed": 0}
+    for result in results:
+        merged["samples"].extend(result["samples"])
+        merged["frames"] += result["frames"]
+        merged["analyzed"] += result["analyzed"]
+    return merged
+
+
+def _analyze_chunk(args):
+    frames, timestamps = args
+    return analyze_frames(frames, timestamps)
+
+
+def analyze_array(frames: np.ndarray, fps: float = SAMPLE_FPS, workers: int = None) -> dict:
+    """
+    Analyze already-decoded frames, spreading CHUNK_FRAMES chunks over the
+    process pool when there is more than one chunk per worker.
+    """
+    workers = WORKERS if workers is None else workers
+    timestamps = np.arange(len(frames)) * (1000.0 / fps)
+    if workers <= 1 or len(frames) < 2 * CHUNK_FRAMES:
+        return analyze_frames(frames, timestamps)
+    chunks = [
+        (frames[start:start + CHUNK_FRAMES], timestamps[start:start + CHUNK_FRAMES])
+        for start in range(0, len(frames), CHUNK_FRAMES)
+    ]
+    return _merge(_get_pool().map(_analyze_chunk, chunks))
+
+
+def _open(path: str):
+    # OpenCV is only needed to decode video; the analysis itself is NumPy
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError("Could not open video")
+    return cv2, capture
+
+
+def _analyze_segment(args):
+    path, start, stop, stride, fps = args
+    cv2, capture = _open(path)
+    try:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frames, timestamps = [], []
+        for index in range(start, stop):
+            if (index - start) % stride:
+                if not capture.grab():
+                    break
+                continue
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(frame[:, :, ::-1])  # BGR -> RGB
+            timestamps.append(index * 1000.0 / fps)
+    finally:
+        capture.release()
+    if not frames:
+        return {"samples": [], "frames": 0, "analyzed": 0}
+    return analyze_frames(np.stack(frames), timestamps)
+
+
+def analyze_video(path: str, workers: int = None, sample_fps: float = SAMPLE_FPS) -> dict:
+    """
+    Analyze a video file.
+
+    Frames are decoded at up to ``sample_fps``; the clip is split into
+    segments of CHUNK_FRAMES decoded frames that worker processes decode
+    and analyze independently.
+
+    Returns:
+        dict: {"summary": emotion summary, "samples": [...], "frames", "analyzed"}
+    """
+    cv2, capture = _open(path)
+    try:
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        capture.release()
+
+    stride = max(1, round(fps / sample_fps))
+    span = CHUNK_FRAMES * stride
+    segments = [(path, start, min(total, start + span), stride, fps) for start in range(0, total, span)]
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or len(segments) < 2:
+        result = _merge(map(_analyze_segment, segments))
+    else:
+        result = _merge(_get_pool().map(_analyze_segment, segments))
+    return {**result, "summary": summarize(result["samples"])}
+
+
+def summarize(samples) -> dict:
+    """Fold samples into the emotion summary feedback_generator reads."""
+    aggregate = EmotionAggregate()
+    for sample in samples:
+        aggregate.add(sample)
+    return {**aggregate.summary(), "source": "server_video_analysis"}
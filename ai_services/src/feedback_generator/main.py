@@ -1,30 +1,65 @@
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import uvicorn
 import os
-import google.generativeai as genai  # type: ignore
+import sys
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from typing import Optional
-from utils.feedback_prompt import create_feedback_prompt
+from typing import List, Optional
+import asyncio
+import functools
 import json
-import re
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.concurrency import ConcurrencyLimiter
+from common import hedging, lifecycle, llm, llm_output, metrics
+from common.llm_output import LLMOutputError
+from common.llm_schemas import Feedback
+from common.json_stream import IncrementalObjectParser
+from utils.feedback_prompt import FEEDBACK_PREFIX, create_feedback_prompt, create_batch_feedback_prompt
 
 load_dotenv()
 
 app = FastAPI()
+metrics.install(app, "feedback")
+readiness = lifecycle.install(app, [
+    llm.warm_up,
+    functools.partial(llm_output.warm_up, Feedback),
+    functools.partial(llm.prepare_prefixes, [FEEDBACK_PREFIX], "feedback"),
+], drains=[llm.drain])
 
 api_key = os.getenv("GEMINI_API_KEY")
 
 if not api_key:
-    print("Warning: GEMINI_API_KEY not found in environment variables")
+    metrics.log("api_key_missing", level="warning")
+
+llm_limiter = ConcurrencyLimiter.from_env("FEEDBACK")
+metrics.add_collector(llm_limiter.collect)
+
+# Answers evaluated per LLM call on the session batch endpoint
+BATCH_SIZE = int(os.getenv("FEEDBACK_BATCH_SIZE", "10"))
+# A batch holds one limiter slot but fans out into several LLM calls; across
+# all batches, at most as many of those run at once as the limiter has slots
+_batch_calls = asyncio.Semaphore(llm_limiter.limit)
 
-if api_key:
-    genai.configure(api_key=api_key)
+
+async def _batch_call(func, *args):
+    async with _batch_calls:
+        return await func(*args)
 
 class TextRequest(BaseModel):
     text: str
     emotion_data: Optional[dict] = None
 
+class AnswerItem(BaseModel):
+    text: str
+    emotion_data: Optional[dict] = None
+    question: Optional[str] = None
+
+class SessionFeedbackRequest(BaseModel):
+    answers: List[AnswerItem]
+
 @app.post("/api/feedbacke_generator")
 async def generator_feedback(request: TextRequest):
     """
@@ -36,6 +71,11 @@ async def generator_feedback(request: TextRequest):
     Returns:
         dict: Feedback containing strengths, improvements, and score
     """
+    async with llm_limiter:
+        return await _generate_feedback(request)
+
+
+async def _generate_feedback(request: TextRequest):
     try:
         if not request.text or not request.text.strip():
             return {
@@ -44,7 +84,8 @@ async def generator_feedback(request: TextRequest):
             }
         
        
-        prompt = create_feedback_prompt(request.text, request.emotion_data)
+        with metrics.stage("prompt_build"):
+            prompt = create_feedback_prompt(request.text, request.emotion_data)
         
         if not api_key:
             return {
@@ -64,8 +105,8 @@ async def generator_feedback(request: TextRequest):
             }
         
       
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        # A slow answer is hedged; the first one that validates is used
+        response, feedback_data = await hedging.generate(prompt, _validate_feedback, service="feedback", prefix=FEEDBACK_PREFIX)
         
         if not response or not response.text:
             return {
@@ -74,48 +115,252 @@ async def generator_feedback(request: TextRequest):
             }
         
         raw = response.text.strip()
-        
-       
-        raw = re.sub(r"```json|```", "", raw).strip()
-        
-       
-        try:
-            feedback_data = json.loads(raw)
-        except json.JSONDecodeError:
-           
-            feedback_data = {
-                "feedback": raw,
-                "strengths": [],
-                "improvements": [],
-                "score": None
-            }
+        if feedback_data is None:
+            feedback_data = _fallback_feedback(raw)
         
         result = {
             "success": True,
-            "data": {
-                "feedback": feedback_data.get("feedback", raw),
-                "strengths": feedback_data.get("strengths", []),
-                "improvements": feedback_data.get("improvements", []),
-                "emotion_improvements": feedback_data.get("emotion_improvements", []),
-                "score": feedback_data.get("score")
-            }
+            "data": _feedback_payload(feedback_data, raw)
         }
         
         return result
         
     except Exception as e:
-        print(f"Error generating feedback: {e}")
+        metrics.log("feedback_failed", level="error", error=str(e))
         return {
             "error": str(e),
             "success": False
         }
 
+def _validate_feedback(raw: str) -> dict:
+    """Validated feedback from the model output; raises LLMOutputError when unusable."""
+    try:
+        return llm_output.extract(raw, Feedback, source="feedback")
+    except LLMOutputError as e:
+        metrics.log("feedback_json_unusable", level="warning", error=str(e))
+        raise
+
+
+def _parse_feedback(raw: str) -> dict:
+    """Validated feedback from the model output, or the raw text as feedback."""
+    try:
+        return _validate_feedback(raw)
+    except LLMOutputError:
+        return _fallback_feedback(raw)
+
+
+def _fallback_feedback(raw: str) -> dict:
+    """The raw model text served as feedback."""
+    llm_output.record_fallback("feedback")
+    return {
+        "feedback": raw.strip(),
+        "strengths": [],
+        "improvements": [],
+        "score": None
+    }
+
+
+def _feedback_payload(feedback_data: dict, raw: str = "") -> dict:
+    """The per-answer shape stored by the Node feedbackController."""
+    return {
+        "feedback": feedback_data.get("feedback", raw),
+        "strengths": feedback_data.get("strengths", []),
+        "improvements": feedback_data.get("improvements", []),
+        "emotion_improvements": feedback_data.get("emotion_improvements", []),
+        "score": feedback_data.get("score")
+    }
+
+
+async def _evaluate_batch(answers: List[AnswerItem]) -> dict:
+    """
+    Evaluate several answers with one shared-instruction prompt.
+
+    Returns:
+        dict: position in ``answers`` -> evaluation, for the items that validated
+    """
+    with metrics.stage("prompt_build"):
+        prompt = create_batch_feedback_prompt([answer.model_dump() for answer in answers])
+    try:
+        response = await llm.generate(prompt, service="feedback", prefix=FEEDBACK_PREFIX)
+        parsed = llm_output.extract((response.text or "") if response else "", source="feedback")
+    except Exception as e:
+        metrics.log("feedback_batch_failed", level="error", error=str(e))
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    evaluations = {}
+    for index in range(len(answers)):
+        try:
+            evaluations[index] = llm_output.validate(parsed.get(str(index + 1)), Feedback)
+        except LLMOutputError:
+            continue
+    return evaluations
+
+
+def summarize_session(results: list) -> dict:
+    """Session-level roll-up of the per-answer results (no extra LLM call)."""
+    scored = [
+        (index, result["data"]["score"])
+        for index, result in enumerate(results)
+        if result.get("success") and isinstance(result.get("data", {}).get("score"), (int, float))
+    ]
+    summary = {
+        "answers": len(results),
+        "evaluated": sum(1 for result in results if result.get("success")),
+        "average_score": None,
+        "min_score": None,
+        "max_score": None,
+        "strongest_answer": None,
+        "weakest_answer": None,
+    }
+    if scored:
+        strongest = max(scored, key=lambda item: item[1])
+        weakest = min(scored, key=lambda item: item[1])
+        summary.update({
+            "average_score": round(sum(score for _, score in scored) / len(scored), 1),
+            "min_score": weakest[1],
+            "max_score": strongest[1],
+            "strongest_answer": strongest[0] + 1,
+            "weakest_answer": weakest[0] + 1,
+        })
+    return summary
+
+
+@app.post("/api/feedbacke_generator/batch")
+async def generator_feedback_batch(request: SessionFeedbackRequest):
+    """
+    Generate feedback for every answer of an interview session at once.
+
+    All answers share one prompt (FEEDBACK_BATCH_SIZE answers per LLM call);
+    each evaluation is validated and only the failed ones are retried
+    through the single-answer path.
+
+    Returns:
+        dict: {"success": True, "data": {"results": [per-answer result], "summary": {...}}}
+        where each result has the same shape as /api/feedbacke_generator
+    """
+    if not request.answers:
+        return {
+            "error": "Answers list cannot be empty",
+            "success": False
+        }
+
+    async with llm_limiter:
+        results = [None] * len(request.answers)
+        valid = [index for index, answer in enumerate(request.answers) if answer.text and answer.text.strip()]
+        for index in set(range(len(request.answers))) - set(valid):
+            results[index] = {"error": "Text answer is required", "success": False}
+
+        evaluations = {}
+        if api_key and valid:
+            chunks = [valid[start:start + BATCH_SIZE] for start in range(0, len(valid), BATCH_SIZE)]
+            found = await asyncio.gather(*(_batch_call(_evaluate_batch, [request.answers[index] for index in chunk]) for chunk in chunks))
+            for chunk, chunk_found in zip(chunks, found):
+                for position, evaluation in chunk_found.items():
+                    evaluations[chunk[position]] = evaluation
+
+        for index, evaluation in evaluations.items():
+            results[index] = {"success": True, "data": _feedback_payload(evaluation)}
+
+        # Retry only the items the batch response did not cover
+        retry = [index for index in valid if index not in evaluations]
+        retried = await asyncio.gather(*(
+            _batch_call(_generate_feedback, TextRequest(text=request.answers[index].text, emotion_data=request.answers[index].emotion_data))
+            for index in retry
+        ))
+        for index, result in zip(retry, retried):
+            results[index] = result
+
+    return {
+        "success": True,
+        "data": {
+            "results": results,
+            "summary": summarize_session(results)
+        }
+    }
+
+
+# Top-level feedback fields forwarded to the client as soon as they are parsed
+STREAM_FIELDS = ("score", "strengths", "improvements", "emotion_improvements", "feedback")
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/feedbacke_generator/stream")
+async def generator_feedback_stream(request: TextRequest):
+    """
+    Streaming variant of /api/feedbacke_generator over Server-Sent Events.
+
+    Sends a "field" event ({"field", "value"}) as soon as each top-level
+    field of the model's JSON is complete, then a "done" event with the
+    same payload the non-streaming endpoint returns, or an "error" event.
+    """
+    if not request.text or not request.text.strip():
+        return {
+            "error": "Text answer is required",
+            "success": False
+        }
+
+    await llm_limiter.acquire()
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            llm_limiter.release()
+
+    return StreamingResponse(
+        _stream_feedback(request, release),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release),
+    )
+
+
+async def _stream_feedback(request: TextRequest, release):
+    try:
+        if not api_key:
+            result = await _generate_feedback(request)
+            for field, value in result.get("data", {}).items():
+                yield _sse("field", {"field": field, "value": value})
+            yield _sse("done", result)
+            return
+
+        with metrics.stage("prompt_build"):
+            prompt = create_feedback_prompt(request.text, request.emotion_data)
+        parser = IncrementalObjectParser()
+        async for delta in llm.generate_stream(prompt, service="feedback", prefix=FEEDBACK_PREFIX):
+            for field, value in parser.feed(delta):
+                if field in STREAM_FIELDS:
+                    yield _sse("field", {"field": field, "value": value})
+
+        raw = parser.buffer.strip()
+        if not raw:
+            yield _sse("error", {"error": "Empty response from LLM", "success": False})
+            return
+        feedback_data = _parse_feedback(raw)
+        yield _sse("done", {"success": True, "data": _feedback_payload(feedback_data, raw)})
+
+    except Exception as e:
+        metrics.log("feedback_stream_failed", level="error", error=str(e))
+        yield _sse("error", {"error": str(e), "success": False})
+    finally:
+        release()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "service": "feedback_generator"
+        "service": "feedback_generator",
+        "readiness": readiness.status(),
+        "llm": llm.status(),
+        "hedging": hedging.policy.snapshot().get("feedback", {}),
+        "llm_output": llm_output.stats().get("feedback", {})
     }
 
 if __name__ == "__main__":
@@ -1,8 +1,65 @@
-def create_feedback_prompt(answer_text: str, emotion_data: dict = None) -> str:
-    
-  
+from common.context_cache import StaticPrefix
+
+EMOTION_ANALYSIS_INSTRUCTIONS = """
+CRITICAL: You MUST integrate the emotion-based insights into the "feedback" field. The overall feedback summary should:
+1. Mention the candidate's confidence level and emotional state when relevant
+2. Connect emotional observations to their answer quality (e.g., "Your confident demeanor complemented your technical explanation" or "Some nervousness was evident, which may have affected the clarity of your response")
+3. Make the feedback feel holistic - combining technical assessment with behavioral observations
+4. Do NOT create a separate section for emotions - weave them naturally into the main feedback text
+5. The feedback should read as one cohesive assessment that considers both content and delivery
+"""
+
+
+def build_delivery_context(delivery: dict):
+    """
+    Describe audio delivery metrics (speaking rate, pauses, fillers, pitch).
+
+    Returns:
+        tuple: (info lines, insight lines)
+    """
+    info = [
+        f"SPEAKING RATE: ~{delivery.get('speakingRate', 0)} words/min",
+        f"PAUSES: {delivery.get('pauses', 0)} ({delivery.get('longPauses', 0)} longer than 2s), "
+        f"{delivery.get('pauseRatio', 0) * 100:.0f}% of speaking time",
+        f"FILLER SOUNDS (um/uh): {delivery.get('fillers', 0)} ({delivery.get('fillersPerMinute', 0)}/min)",
+        f"PITCH VARIATION: {delivery.get('pitchStdHz', 0)} Hz around {delivery.get('avgPitchHz', 0)} Hz",
+    ]
+    insights = []
+    rate = delivery.get("speakingRate", 0)
+    if rate > 170:
+        insights.append("The candidate spoke quickly; slowing down would make the answer easier to follow")
+    elif 0 < rate < 110:
+        insights.append("The candidate spoke slowly, which can come across as hesitant")
+    if delivery.get("pauseRatio", 0) > 0.35 or delivery.get("longPauses", 0) >= 3:
+        insights.append("Frequent or long pauses suggest the candidate was searching for words or ideas")
+    if delivery.get("fillersPerMinute", 0) > 4:
+        insights.append("Filler sounds were frequent; replacing them with short silent pauses would sound more confident")
+    if delivery.get("avgPitchHz") and delivery.get("pitchStdHz", 0) < 12:
+        insights.append("The voice was fairly monotone; more vocal variety would help keep the listener engaged")
+    return info, insights
+
+
+def build_emotion_context(emotion_data: dict = None):
+    """
+    Describe the tracked emotion metrics for the prompt.
+
+    Returns:
+        str: the emotion context, "" without emotion data
+    """
     emotion_context = ""
-    emotion_analysis_instructions = ""
+    delivery = emotion_data.get("delivery") if emotion_data else None
+    if emotion_data and emotion_data.get("source") == "audio_analysis" and delivery:
+        # Audio only: the video metrics are empty, describe delivery alone
+        info, insights = build_delivery_context(delivery)
+        info_text = "\n".join(["DATA SOURCE: Audio-based delivery analysis (video tracking unavailable)", *info])
+        insights_text = "\n".join(insights) if insights else "No significant delivery issues detected"
+        return f"""
+VOCAL DELIVERY ANALYSIS (Tracked from question start to answer submission):
+{info_text}
+
+DELIVERY-BASED INSIGHTS:
+{insights_text}
+"""
     if emotion_data:
         emotion_info = []
         emotion_insights = []
@@ -32,11 +89,15 @@ def create_feedback_prompt(answer_text: str, emotion_data: dict = None) -> str:
         else:
             emotion_info.append(f"DATA SOURCE: Video-based tracking")
         
+        # Summaries from emotion_analyzer carry the distinct-emotion count; the
+        # browser's payload only has the full history
+        distinct_emotions = emotion_data.get("distinctEmotions")
+        if distinct_emotions is None and emotion_history:
+            distinct_emotions = len(set(emotion_history))
         if emotion_history:
             # Analyze emotion transitions
-            unique_emotions = list(set(emotion_history))
-            if len(unique_emotions) > 1:
-                emotion_info.append(f"EMOTION TRANSITIONS: {len(unique_emotions)} different emotions detected")
+            if distinct_emotions > 1:
+                emotion_info.append(f"EMOTION TRANSITIONS: {distinct_emotions} different emotions detected")
                 emotion_info.append(f"EMOTION JOURNEY: {', '.join(emotion_history[-10:])}")  # Last 10 emotions
             else:
                 emotion_info.append(f"EMOTION STABILITY: Maintained {predominant_emotion} throughout")
@@ -66,36 +127,26 @@ def create_feedback_prompt(answer_text: str, emotion_data: dict = None) -> str:
             emotion_insights.append("The candidate maintained a positive or neutral emotional state, which is favorable for interview performance")
         elif predominant_emotion in ["sad", "fear", "angry"]:
             emotion_insights.append(f"The candidate's predominant emotion ({predominant_emotion}) may have impacted their communication effectiveness")
+
+        if delivery:
+            delivery_info, delivery_insights = build_delivery_context(delivery)
+            emotion_info.extend(delivery_info)
+            emotion_insights.extend(delivery_insights)
         
         if emotion_info:
+            info_text = "\n".join(emotion_info)
+            insights_text = "\n".join(emotion_insights) if emotion_insights else "No significant emotional patterns detected"
             emotion_context = f"""
 BEHAVIORAL & EMOTIONAL ANALYSIS (Tracked from question start to answer submission):
-{'\n'.join(emotion_info)}
+{info_text}
 
 EMOTION-BASED INSIGHTS:
-{'\n'.join(emotion_insights) if emotion_insights else 'No significant emotional patterns detected'}
-"""
-            
-            emotion_analysis_instructions = """
-CRITICAL: You MUST integrate the emotion-based insights into the "feedback" field. The overall feedback summary should:
-1. Mention the candidate's confidence level and emotional state when relevant
-2. Connect emotional observations to their answer quality (e.g., "Your confident demeanor complemented your technical explanation" or "Some nervousness was evident, which may have affected the clarity of your response")
-3. Make the feedback feel holistic - combining technical assessment with behavioral observations
-4. Do NOT create a separate section for emotions - weave them naturally into the main feedback text
-5. The feedback should read as one cohesive assessment that considers both content and delivery
+{insights_text}
 """
-    
-    prompt = f"""
-You are an expert technical interviewer providing constructive feedback on interview answers.
+    return emotion_context
 
-Analyze the following interview answer and provide detailed feedback:
 
-ANSWER TO ANALYZE:
-{answer_text}
-{emotion_context}
-{emotion_analysis_instructions}
-Provide feedback in the following JSON format:
-{{
+FEEDBACK_JSON_FORMAT = """{
     "feedback": "Overall feedback summary (3-4 sentences that INTEGRATES technical assessment with emotional/behavioral observations)",
     "strengths": [
         "Strength 1",
@@ -112,9 +163,10 @@ Provide feedback in the following JSON format:
         "Emotion/behavioral feedback 2"
     ],
     "score": 85
-}}
+}"""
 
-EVALUATION CRITERIA:
+# Scoring guide and output rules, identical for every answer
+EVALUATION_GUIDE = """EVALUATION CRITERIA:
 1. Technical accuracy and depth
 2. Clarity and communication
 3. Problem-solving approach
@@ -154,7 +206,65 @@ INSTRUCTIONS:
 
 - Return ONLY valid JSON, no markdown, no code blocks, no explanations
 """
+
+
+# Bump whenever FEEDBACK_PREFIX changes; the version names its upstream context cache
+FEEDBACK_PROMPT_VERSION = "1"
+
+# Everything that is the same for every answer: sent once as a cached prefix
+FEEDBACK_PREFIX = StaticPrefix("feedback", FEEDBACK_PROMPT_VERSION, f"""You are an expert technical interviewer providing constructive feedback on interview answers.
+
+Analyze the interview answer(s) in the request and provide detailed feedback.
+
+WHEN EMOTION DATA IS PROVIDED FOR AN ANSWER:
+{EMOTION_ANALYSIS_INSTRUCTIONS}
+Provide feedback for each answer in the following JSON format:
+{FEEDBACK_JSON_FORMAT}
+
+{EVALUATION_GUIDE}""")
+
+
+def create_feedback_prompt(answer_text: str, emotion_data: dict = None) -> str:
+    """Per-answer part of the feedback prompt; the instructions are ``FEEDBACK_PREFIX``."""
+    emotion_context = build_emotion_context(emotion_data)
+
+    prompt = f"""ANSWER TO ANALYZE:
+{answer_text}
+{emotion_context}
+Return ONLY the JSON object for this answer."""
     return prompt
 
 
+def create_batch_feedback_prompt(answers: list) -> str:
+    """
+    Per-session part of the prompt evaluating every answer of a session.
+
+    The instructions are ``FEEDBACK_PREFIX``, shared with single answers;
+    each answer only adds its own text and emotion context.
+
+    Args:
+        answers: list of dicts with "text", optional "question" and "emotion_data"
+    """
+    sections = []
+    for number, answer in enumerate(answers, start=1):
+        emotion_context = build_emotion_context(answer.get("emotion_data"))
+        question = answer.get("question")
+        question_line = f"QUESTION:\n{question}\n" if question else ""
+        sections.append(f"""
+=== ANSWER {number} ===
+{question_line}ANSWER TO ANALYZE:
+{answer.get("text", "")}
+{emotion_context}""")
 
+    prompt = f"""Analyze EACH of the {len(answers)} interview answers below independently and provide detailed feedback for every one.
+
+Return ONLY a JSON object with one evaluation per answer, keyed by the answer number:
+{{
+    "1": {{ ... feedback fields ... }},
+    "2": {{ ... same fields ... }}
+}}
+
+Apply the emotion rules per answer: an answer without emotion data gets an empty emotion_improvements array.
+{"".join(sections)}
+"""
+    return prompt
@@ -0,0 +1,109 @@
+"""
+Optional single entry point that hosts every AI service in one ASGI app.
+
+    python gateway.py                   # GATEWAY_WORKERS processes on GATEWAY_PORT
+    uvicorn gateway:app --workers 4     # same, with uvicorn's own flags
+
+    /resume/...     resume_analyzer       RESUME_ANALYZER_URL=http://host:8080/resume
+    /feedback/...   feedback_generator    FEEDBACK_GEN_URL=http://host:8080/feedback
+    /question/...   question_generator    QUESTION_GEN_URL=http://host:8080/question
+    /emotion/...    emotion_analyzer      EMOTION_ANALYZER_URL=http://host:8080/emotion
+    /health/live, /health/ready, /metrics for the whole process
+
+Each worker process loads the four service apps unchanged and mounts them
+under a path prefix, so they share one Gemini client (and its connection
+pool), one blocking thread pool and one upstream context-cache registry
+per worker. The resume result cache, question pool and context-cache
+registry are SQLite files, shared by every worker on the host. Running
+each service's ``main.py`` on its own port keeps working as before.
+
+Shutdown (SIGTERM) stops accepting connections, lets in-flight requests
+finish for up to SHUTDOWN_DRAIN_SECONDS and then waits, within the same
+budget, for LLM calls still running in background tasks.
+
+Configuration (environment):
+    GATEWAY_HOST            bind address (default 0.0.0.0)
+    GATEWAY_PORT            port (default 8080)
+    GATEWAY_WORKERS         worker processes (default: CPU count)
+    SHUTDOWN_DRAIN_SECONDS  grace period for requests and LLM calls (default 20)
+"""
+import contextlib
+import importlib.util
+import os
+import sys
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.routing import Mount
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SRC)
+from common import lifecycle, metrics  # noqa: E402
+
+# Path prefix -> service directory
+SERVICES = {
+    "resume": "resume_analyzer",
+    "feedback": "feedback_generator",
+    "question": "question_generator",
+    "emotion": "emotion_analyzer",
+}
+
+# Each service imports its helpers as ``utils.<module>``. The utils
+# directories have no __init__.py, so with every service directory on the
+# path they form one namespace package; their module names do not overlap.
+for _directory in SERVICES.values():
+    sys.path.append(os.path.join(SRC, _directory))
+
+
+def load_service(directory: str):
+    """Import a service's main.py under a unique module name and return the module."""
+    name = f"{directory}_main"
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SRC, directory, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+services = {prefix: load_service(directory) for prefix, directory in SERVICES.items()}
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Mounted apps do not get lifespan events of their own: run each one's
+    # (warm-up on start, LLM drain on shutdown) inside the gateway's
+    async with contextlib.AsyncExitStack() as stack:
+        for module in services.values():
+            await stack.enter_async_context(module.app.router.lifespan_context(module.app))
+        yield
+
+
+app = FastAPI(lifespan=lifespan, routes=[Mount(f"/{prefix}", app=module.app) for prefix, module in services.items()])
+
+
+@app.get("/health/live", include_in_schema=False)
+async def live():
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", include_in_schema=False)
+async def ready():
+    report = {prefix: module.readiness.status() for prefix, module in services.items()}
+    ok = all(module.readiness.ready for module in services.values())
+    return JSONResponse({"status": "ready" if ok else "not_ready", "services": report}, status_code=200 if ok else 503)
+
+
+# One registry per process: the same text as each mounted service's /metrics
+app.add_api_route("/metrics", metrics.endpoint, methods=["GET"], include_in_schema=False)
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "gateway:app",
+        app_dir=SRC,
+        host=os.getenv("GATEWAY_HOST", "0.0.0.0"),
+        port=int(os.getenv("GATEWAY_PORT", "8080")),
+        workers=int(os.getenv("GATEWAY_WORKERS", str(os.cpu_count() or 1))),
+        timeout_graceful_shutdown=int(lifecycle.DRAIN_SECONDS),
+    )
@@ -1,38 +1,64 @@
-import json
-import re
+import asyncio
+import functools
 from fastapi import FastAPI 
 import uvicorn
 import os
-import google.generativeai as genai  # type: ignore
+import sys
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.concurrency import ConcurrencyLimiter, SingleFlight, run_blocking
+from common.context_cache import StaticPrefix
+from common import hedging, lifecycle, llm, llm_output, llm_scheduler, metrics
+from common.llm_output import LLMOutputError
+from common.llm_schemas import QuestionList
+from utils.question_pool import QuestionPool, pool_key, DEFAULT_DB_PATH
 
 load_dotenv()
 
 app = FastAPI()
+metrics.install(app, "question")
 api_key = os.getenv("GEMINI_API_KEY")
 
 if not api_key:
-    print("Warning: GEMINI_API_KEY not found in environment variables")
+    metrics.log("api_key_missing", level="warning")
+
+llm_limiter = ConcurrencyLimiter.from_env("QUESTION")
+metrics.add_collector(llm_limiter.collect)
+
+question_pool = QuestionPool(
+    db_path=os.getenv("QUESTION_POOL_DB", DEFAULT_DB_PATH),
+    max_per_pool=int(os.getenv("QUESTION_POOL_SIZE", "120")),
+)
+metrics.add_collector(question_pool.collect)
+
+# Background pool refills: one per pool key, bounded overall
+_refill_slots = asyncio.Semaphore(int(os.getenv("QUESTION_REFILL_CONCURRENCY", "2")))
+_refilling = set()
+_background_tasks = set()
 
-if api_key:
-    genai.configure(api_key=api_key)
+# Concurrent cold requests for the same skill set share one LLM call
+single_flight = SingleFlight()
+
+# Skill sets per LLM call on the batch endpoint
+BATCH_SIZE = int(os.getenv("QUESTION_BATCH_SIZE", "5"))
 
 class SkillsRequest(BaseModel):
     skills: List[str]
+    user_id: Optional[str] = None
 
-def create_prompt(skills: List[str]) -> str:
-    skills_str = ", ".join(skills)
+class BatchSkillsRequest(BaseModel):
+    requests: List[SkillsRequest]
 
-    prompt = f"""
+# Bump whenever a prefix below changes; the version names its upstream context cache
+QUESTION_PROMPT_VERSION = "1"
+
+QUESTION_PREFIX = StaticPrefix("question", QUESTION_PROMPT_VERSION, """
 You are an expert technical interviewer.
 fist  3 question are Theory base and 2 technical ,
 
-
-Generate exactly 5 interview questions based on these skills:
-{skills_str}
-
 STRICT OUTPUT RULES:
 - Output ONLY a valid JSON array.
 - NO markdown.
@@ -44,18 +70,18 @@ STRICT OUTPUT RULES:
 
 FORMAT (use exactly this structure):
 [
-  {{
+  {
     "question_id": 1,
     "question": "Question text",
     "difficulty": "Easy | Medium | Hard",
     "skill_area": "Skill being tested"
-  }},
-  {{
+  },
+  {
     "question_id": 2,
     "question": "Question text",
     "difficulty": "Easy | Medium | Hard",
     "skill_area": "Skill being tested"
-  }}
+  }
 ]
 
 CONTENT RULES:
@@ -66,6 +92,65 @@ CONTENT RULES:
 - Questions should test real-world problem-solving abilities.
 
 Return ONLY the JSON array.
+""")
+
+QUESTION_BATCH_PREFIX = StaticPrefix("question_batch", QUESTION_PROMPT_VERSION, """
+You are an expert technical interviewer.
+For EACH numbered skill set in the request, generate exactly 5 interview questions:
+first 3 theory based and 2 technical.
+
+STRICT OUTPUT RULES:
+- Output ONLY a valid JSON object, keyed by the skill set number.
+- NO markdown, NO code blocks, NO explanations.
+- JSON must be directly parseable.
+
+FORMAT (use exactly this structure):
+{
+  "1": [
+    {
+      "question_id": 1,
+      "question": "Question text",
+      "difficulty": "Easy | Medium | Hard",
+      "skill_area": "Skill being tested"
+    }
+  ],
+  "2": [ ... ]
+}
+
+CONTENT RULES (per skill set):
+- Generate exactly 5 questions.
+- Mix of difficulties: 2 Easy, 2 Medium, 1 Hard
+- Each question must be scenario-based and practical.
+- "skill_area" must match one of that set's skills.
+- Questions should test real-world problem-solving abilities.
+
+Return ONLY the JSON object.
+""")
+
+readiness = lifecycle.install(app, [
+    llm.warm_up,
+    functools.partial(llm_output.warm_up, QuestionList),
+    functools.partial(llm.prepare_prefixes, [QUESTION_PREFIX, QUESTION_BATCH_PREFIX], "question"),
+], drains=[llm.drain])
+
+
+def create_prompt(skills: List[str]) -> str:
+    """Per-request part of the question prompt; the instructions are ``QUESTION_PREFIX``."""
+    skills_str = ", ".join(skills)
+
+    prompt = f"""
+Generate exactly 5 interview questions based on these skills:
+{skills_str}
+"""
+    return prompt
+
+def create_batch_prompt(skill_sets: List[List[str]]) -> str:
+    """Per-request part of the batch prompt; the instructions are ``QUESTION_BATCH_PREFIX``."""
+    sets_str = "\n".join(f'"{number}": {", ".join(skills)}' for number, skills in enumerate(skill_sets, start=1))
+
+    prompt = f"""
+SKILL SETS:
+{sets_str}
 """
     return prompt
 
@@ -80,69 +165,248 @@ async def generat_question(request: SkillsRequest):
     Returns:
         list: Array of question objects
     """
+    # Pool hits need no LLM call, so they neither wait for nor take a slot
+    pooled = await _pooled_questions(request)
+    if pooled:
+        return pooled
+    async with llm_limiter:
+        return await _generate_questions(request)
+
+
+async def _pooled_questions(request: SkillsRequest):
+    """Questions for a common skill set from the local pool, or None."""
+    if not request.skills:
+        return None
+    key = pool_key(request.skills)
+    try:
+        pooled = await run_blocking(question_pool.sample, key, request.user_id)
+    except Exception as e:
+        metrics.log("question_pool_failed", level="error", error=str(e))
+        return None
+    if pooled:
+        _schedule_refill(request.skills, key)
+    return pooled
+
+
+async def _generate_questions(request: SkillsRequest):
     try:
         if not request.skills or len(request.skills) == 0:
             return {
                 "error": "Skills list cannot be empty",
                 "success": False
             }
-        
-      
+
+        key = pool_key(request.skills)
         if api_key:
-            prompt = create_prompt(request.skills)
-            
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(prompt)
-            
-            if not response or not response.text:
-                return get_mock_questions()
-            
-            raw = response.text.strip()
-            
-          
-            raw = re.sub(r"|```", "", raw).strip()
-            
-           
-            try:
-                result = json.loads(raw)
-            
-                if isinstance(result, list):
-                    return result
-                elif isinstance(result, dict) and "questions" in result:
-                    return result["questions"]
-                else:
-                  
-                    return [result]
-            except json.JSONDecodeError:
-            
-                pass
-            
-     
-            objects = re.findall(r"\{[\s\S]*?\}", raw)
-            
-            if not objects:
-                print("No JSON found in LLM response, using mock data")
+            result = await single_flight.do(key, generate_from_llm, request.skills)
+            if result is None:
+                llm_output.record_fallback("question")
                 return get_mock_questions()
-            
-            # Convert to array
-            json_text = "[" + ",".join(objects) + "]"
-            result = json.loads(json_text)
-            
-            # Ensure it's a list
-            if not isinstance(result, list):
-                result = [result]
-            
+
+            await run_blocking(_remember, key, request.user_id, result)
+            _schedule_refill(request.skills, key)
             return result
         else:
       
-            print("API key not configured, using mock data")
+            metrics.log("question_mock_served", reason="api_key_missing")
             return get_mock_questions()
         
     except Exception as e:
-        print(f"Error generating questions: {e}")
-       
+        metrics.log("question_failed", level="error", error=str(e))
+        llm_output.record_fallback("question")
         return get_mock_questions()
 
+
+async def generate_from_llm(skills: List[str]):
+    """
+    Ask the LLM for a fresh question list.
+
+    Returns:
+        list: question objects, or None when the response held no usable JSON
+    """
+    with metrics.stage("prompt_build"):
+        prompt = create_prompt(skills)
+    
+    # A slow answer is hedged; the first one that validates is used
+    _, questions = await hedging.generate(prompt, _validate_questions, service="question", prefix=QUESTION_PREFIX)
+    return questions
+
+
+def _validate_questions(raw: str) -> list:
+    """Validated question list from the model output; raises LLMOutputError when unusable."""
+    try:
+        return llm_output.extract(raw, QuestionList, source="question")
+    except LLMOutputError as e:
+        metrics.log("question_json_unusable", level="warning", error=str(e))
+        raise
+
+
+def _remember(key: str, user_id: Optional[str], questions: list):
+    """Pool freshly generated questions and mark them seen by the user; blocking."""
+    question_pool.add(key, questions)
+    question_pool.mark_seen(user_id, questions)
+
+
+def _schedule_refill(skills: List[str], key: str):
+    """Top a pool up in the background once it runs low."""
+    if not api_key or key in _refilling:
+        return
+    _refilling.add(key)
+    task = asyncio.create_task(_refill(list(skills), key))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _refill(skills: List[str], key: str):
+    # Pool top-ups queue behind the questions users are waiting for. They
+    # coalesce under their own key: an interactive request for the same
+    # skills must not join a background call and wait at its priority.
+    llm_scheduler.priority.set("background")
+    metrics.detach_from_request()
+    try:
+        if not await run_blocking(question_pool.needs_refill, key):
+            return
+        async with _refill_slots:
+            questions = await single_flight.do(f"refill:{key}", generate_from_llm, skills)
+        if questions:
+            await run_blocking(question_pool.add, key, questions)
+    except Exception as e:
+        metrics.log("question_refill_failed", level="error", error=str(e))
+    finally:
+        _refilling.discard(key)
+
+
+async def _batch_from_llm(skill_sets: List[List[str]]) -> dict:
+    """
+    One LLM call for several skill sets.
+
+    Returns:
+        dict: position in ``skill_sets`` -> validated question list; sets
+        missing or malformed in the response are left out
+    """
+    with metrics.stage("prompt_build"):
+        prompt = create_batch_prompt(skill_sets)
+    try:
+        response = await llm.generate(prompt, service="question", prefix=QUESTION_BATCH_PREFIX)
+        parsed = llm_output.extract((response.text or "") if response else "", source="question")
+    except Exception as e:
+        metrics.log("question_batch_failed", level="error", error=str(e))
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+
+    results = {}
+    for index in range(len(skill_sets)):
+        try:
+            results[index] = llm_output.validate(parsed.get(str(index + 1)), QuestionList)
+        except LLMOutputError:
+            continue
+    return results
+
+
+@app.post("/api/question_generator/batch")
+async def generate_question_batch(request: BatchSkillsRequest):
+    """
+    Generate question lists for many candidates at once (e.g. a cohort).
+
+    Pool hits are served locally; the remaining distinct skill sets are
+    generated QUESTION_BATCH_SIZE at a time in one LLM call, and any set
+    the batch response got wrong is retried on its own.
+
+    Returns:
+        dict: {"success": True, "data": [{"skills", "questions"}, ...]} in request order
+    """
+    if not request.requests:
+        return {
+            "error": "Requests list cannot be empty",
+            "success": False
+        }
+    return {"success": True, "data": await _generate_batch(request.requests)}
+
+
+def _sample_batch(items: List[SkillsRequest]):
+    """Pool hits of a batch; blocking. Returns (results with None for misses, misses by pool key)."""
+    results = [None] * len(items)
+    pending = {}
+    for index, item in enumerate(items):
+        if not item.skills:
+            results[index] = {"skills": item.skills, "questions": [], "error": "Skills list cannot be empty"}
+            continue
+        key = pool_key(item.skills)
+        pooled = question_pool.sample(key, item.user_id)
+        if pooled:
+            results[index] = {"skills": item.skills, "questions": pooled}
+        else:
+            pending.setdefault(key, (item.skills, []))[1].append(index)
+    return results, pending
+
+
+async def _generate_batch(items: List[SkillsRequest]):
+    results, pending = await run_blocking(_sample_batch, items)
+    generated = {}
+    if pending and api_key:
+        # Only the LLM work takes a slot; an all-hit batch answers at once
+        async with llm_limiter:
+            generated = await _generate_pending(pending)
+
+    stored, seen = [], []
+    for key, (skills, indexes) in pending.items():
+        questions = generated.get(key)
+        if questions:
+            stored.append((key, questions))
+        else:
+            if api_key:
+                llm_output.record_fallback("question")
+            questions = get_mock_questions()
+        for index in indexes:
+            seen.append((items[index].user_id, questions))
+            results[index] = {"skills": items[index].skills, "questions": questions}
+    if pending:
+        await run_blocking(_store_batch, stored, seen)
+    for key, _ in stored:
+        _schedule_refill(pending[key][0], key)
+    return results
+
+
+def _store_batch(stored: list, seen: list):
+    """Pool generated question lists and mark what each user was served; blocking."""
+    for key, questions in stored:
+        question_pool.add(key, questions)
+    for user_id, questions in seen:
+        question_pool.mark_seen(user_id, questions)
+
+
+async def _generate_pending(pending: dict) -> dict:
+    """Question lists for the missed skill sets (pool key -> list); sets that failed are left out."""
+    generated = {}
+    keys = list(pending)
+    chunks = [keys[start:start + BATCH_SIZE] for start in range(0, len(keys), BATCH_SIZE)]
+    chunk_results = await asyncio.gather(*(_batch_from_llm([pending[key][0] for key in chunk]) for chunk in chunks))
+    for chunk, found in zip(chunks, chunk_results):
+        for position, key in enumerate(chunk):
+            if position in found:
+                generated[key] = found[position]
+
+    # Only the sets the batch call failed on are retried individually
+    retry = [key for key in keys if key not in generated]
+    retried = await asyncio.gather(*(single_flight.do(key, generate_from_llm, pending[key][0]) for key in retry), return_exceptions=True)
+    for key, questions in zip(retry, retried):
+        if isinstance(questions, list):
+            generated[key] = questions
+    return generated
+
+
+@app.get("/api/pool_stats")
+async def pool_stats():
+    """Hit/miss counters and size of the question pool, plus LLM output parse and hedge rates"""
+    return {
+        **question_pool.snapshot(),
+        "llm_calls": single_flight.calls,
+        "coalesced": single_flight.coalesced,
+        "llm_output": llm_output.stats().get("question", {}),
+        "hedging": hedging.policy.snapshot().get("question", {}),
+    }
+
 def get_mock_questions():
     """Return mock questions as fallback"""
     return [
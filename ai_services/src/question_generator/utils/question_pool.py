@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from common import metrics
+from common.skill_vocabulary import normalize_skill_set
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "question_pool.sqlite3")
+
+# Questions served per interview, by difficulty (matches the generation prompt)
+DIFFICULTY_MIX = {"Easy": 2, "Medium": 2, "Hard": 1}
+
+
+def pool_key(skills) -> str:
+    """Pool identity for a skill list: sorted, lower-cased and alias-collapsed."""
+    return "|".join(normalize_skill_set(skills))
+
+
+def _question_hash(text: str) -> str:
+    return hashlib.sha1(" ".join(text.casefold().split()).encode()).hexdigest()
+
+
+def _difficulty(value) -> str:
+    value = str(value or "").strip().capitalize()
+    return value if value in DIFFICULTY_MIX else ""
+
+
+class QuestionPool:
+    """
+    Persistent pool of generated questions per normalized skill set.
+
+    ``sample`` draws a full difficulty mix from the pool while skipping
+    questions the same user saw within ``seen_window`` seconds, so common
+    skill sets are answered from SQLite in milliseconds. ``needs_refill``
+    tells the caller when to top the pool up in the background.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_per_pool: int = 120, low_water: int = 3, seen_window: float = 30 * 24 * 3600):
+        self.max_per_pool = max_per_pool
+        self.low_water = low_water
+        self.seen_window = seen_window
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "added": 0}
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS questions (
+                pool_key TEXT NOT NULL,
+                question_hash TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                body TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (pool_key, question_hash)
+            );
+            CREATE TABLE IF NOT EXISTS seen (
+                user_id TEXT NOT NULL,
+                question_hash TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (user_id, question_hash)
+            );
+            """
+        )
+
+    def add(self, key: str, questions) -> int:
+        """Add generated questions to a pool; returns how many were new."""
+        now = time.time()
+        rows = []
+        for question in questions:
+            if not isinstance(question, dict):
+                continue
+            text = str(question.get("question", "")).strip()
+            difficulty = _difficulty(question.get("difficulty"))
+            if not text or not difficulty:
+                continue
+            body = {"question": text, "difficulty": difficulty, "skill_area": question.get("skill_area", "")}
+            rows.append((key, _question_hash(text), difficulty, json.dumps(body), now))
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?, ?)", rows)
+            added = self._db.total_changes - before
+            # Keep pools bounded: drop the oldest questions beyond the cap
+            self._db.execute(
+                "DELETE FROM questions WHERE pool_key = ? AND rowid NOT IN ("
+                " SELECT rowid FROM questions WHERE pool_key = ? ORDER BY created_at DESC LIMIT ?)",
+                (key, key, self.max_per_pool),
+            )
+            self.stats["added"] += added
+        return added
+
+    def sample(self, key: str, user_id: str = None):
+        """
+        Draw one interview's worth of questions, or None if the pool cannot
+        cover the difficulty mix with questions this user has not seen.
+        """
+        params = [key]
+        unseen = ""
+        if user_id:
+            unseen = " AND question_hash NOT IN (SELECT question_hash FROM seen WHERE user_id = ? AND seen_at > ?)"
+            params += [user_id, time.time() - self.seen_window]
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT question_hash, difficulty, body FROM questions WHERE pool_key = ?{unseen}", params
+            ).fetchall()
+
+        by_difficulty = {difficulty: [] for difficulty in DIFFICULTY_MIX}
+        for row in rows:
+            by_difficulty[row[1]].append(row)
+        picked = []
+        for difficulty, count in DIFFICULTY_MIX.items():
+            candidates = by_difficulty[difficulty]
+            if len(candidates) < count:
+                with self._lock:
+                    self.stats["misses"] += 1
+                return None
+            picked.extend(random.sample(candidates, count))
+
+        with self._lock:
+            self.stats["hits"] += 1
+        questions = []
+        for number, (_, _, body) in enumerate(picked, start=1):
+            questions.append({"question_id": number, **json.loads(body)})
+        self.mark_seen(user_id, questions)
+        return questions
+
+    def needs_refill(self, key: str) -> bool:
+        """True when any difficulty has fewer than ``low_water`` interviews' worth of questions."""
+        with self._lock:
+            counts = dict(self._db.execute(
+                "SELECT difficulty, COUNT(*) FROM questions WHERE pool_key = ? GROUP BY difficulty", (key,)
+            ).fetchall())
+        return any(counts.get(difficulty, 0) < count * self.low_water for difficulty, count in DIFFICULTY_MIX.items())
+
+    def mark_seen(self, user_id: str, questions):
+        if not user_id:
+            return
+        now = time.time()
+        rows = [(user_id, _question_hash(str(q.get("question", ""))), now) for q in questions if isinstance(q, dict)]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO seen VALUES (?, ?, ?)", rows)
+            self._db.execute("DELETE FROM seen WHERE seen_at < ?", (now - self.seen_window,))
+
+    def collect(self):
+        """Metric families for ``metrics.add_collector``; counters only, no database query."""
+        with self._lock:
+            stats = dict(self.stats)
+        yield metrics.Family("ai_question_pool_total", "counter", "Question pool lookups and additions",
+                             [({"outcome": outcome}, value) for outcome, value in stats.items()])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pools = self._db.execute("SELECT COUNT(DISTINCT pool_key), COUNT(*) FROM questions").fetchone()
+            return {**self.stats, "pools": pools[0], "questions": pools[1]}
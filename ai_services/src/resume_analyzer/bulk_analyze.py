@@ -0,0 +1,71 @@
+"""
+Bulk resume analysis from the command line, without the HTTP service.
+
+Usage (from ai_services/src/resume_analyzer):
+    python bulk_analyze.py SOURCE [--job-id ID] [--output results.jsonl]
+                                  [--parse-workers N] [--llm-concurrency N]
+
+SOURCE is a directory or a .zip/.tar/.tar.gz archive of PDFs. Results are
+appended to the job's results.jsonl (or --output), progress goes to stderr
+once a second and the final job state to stdout as JSON. The job ID
+defaults to one derived from SOURCE, so running the same command again
+after a crash resumes the job and skips the files already in the results.
+The result cache is the service's (RESUME_CACHE_DB), so resumes analysed
+by either are not analysed again.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.bulk_jobs import JOBS_DIR, LLM_CONCURRENCY, PARSE_WORKERS, JobManager
+
+
+def _progress_line(progress: dict) -> str:
+    counts = " ".join(f"{status}={count}" for status, count in progress["counts"].items() if count)
+    rate = progress.get("resumes_per_minute")
+    return (f"[{progress['id']}] {progress['status']} {progress['done']}/{progress.get('total') or '?'}"
+            f" {counts}" + (f" {rate}/min" if rate else ""))
+
+
+async def _run(manager: JobManager, job):
+    task = asyncio.ensure_future(manager.run(job))
+    while not task.done():
+        await asyncio.wait([task], timeout=1.0)
+        print(_progress_line(job.progress()), file=sys.stderr, flush=True)
+    return task.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory or .zip/.tar/.tar.gz archive of PDFs")
+    parser.add_argument("--job-id", help="job to create or resume (default: derived from SOURCE)")
+    parser.add_argument("--output", help="results JSONL path (default: results.jsonl in the job directory)")
+    parser.add_argument("--jobs-dir", default=JOBS_DIR)
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS)
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_CONCURRENCY)
+    args = parser.parse_args()
+
+    # The service module owns the result cache and its version
+    from main import result_cache
+
+    job_id = args.job_id or "cli-" + hashlib.sha256(os.path.abspath(args.source).encode()).hexdigest()[:16]
+    manager = JobManager(args.jobs_dir, cache=result_cache, parse_workers=args.parse_workers,
+                         llm_concurrency=args.llm_concurrency)
+    try:
+        job = manager.create(args.source, job_id=job_id, results_path=args.output)
+    except ValueError as e:
+        parser.error(str(e))
+    if job.state["status"] == "done":
+        print(f"[{job.id}] already done; results in {job.results_path}", file=sys.stderr)
+    else:
+        asyncio.run(_run(manager, job))
+    print(json.dumps({**job.progress(), "results_path": job.results_path}, indent=2))
+    sys.exit(0 if job.state["status"] == "done" else 1)
+
+
+if __name__ == "__main__":
+    main()
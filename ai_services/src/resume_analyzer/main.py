@@ -1,25 +1,236 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from utils.pdf_parser import extract_text_from_pdf
-from utils.skill_extractor import extract_skills
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, ValidationError
+import contextlib
+import functools
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.pdf_parser import extract_text_from_pdf, MAX_PDF_BYTES, warm_up as warm_up_pdf_parser
+from utils.skill_extractor import extract_skills_with_status, LLM_CONFIDENCE, PROMPT_VERSION
+from utils import skill_extractor
+from utils.local_extractor import TIER_VERSION, warm_up as warm_up_local_extractor
+from utils.resume_sections import CONTEXT_TOKENS
+from utils.skill_matcher import VOCABULARY_VERSION
+from utils.result_cache import ResultCache, content_digest, DEFAULT_DB_PATH
+from utils.bulk_jobs import SOURCE_ROOT, JobManager
 import uvicorn
+from common.concurrency import ConcurrencyLimiter, run_blocking
+from common import lifecycle, llm, llm_output, metrics
+from common.llm_schemas import ResumeSkills
 
 class ResumeRequest(BaseModel):
     file_path :str
-    
 
+class JobRequest(BaseModel):
+    path: str
+
+# Archive uploads accepted by POST /api/resume_jobs, by content type
+ARCHIVE_TYPES = {
+    "application/zip": ".zip",
+    "application/x-zip-compressed": ".zip",
+    "application/x-tar": ".tar",
+    "application/gzip": ".tar.gz",
+    "application/x-gzip": ".tar.gz",
+}
+MAX_ARCHIVE_BYTES = int(os.getenv("RESUME_JOBS_MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Pick up bulk jobs a previous process left unfinished
+    resumed = jobs.resume_incomplete()
+    if resumed:
+        metrics.log("resume_jobs_resumed", job_ids=resumed)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+metrics.install(app, "resume")
+
+result_cache = ResultCache(
+    db_path=os.getenv("RESUME_CACHE_DB", DEFAULT_DB_PATH),
+    max_entries=int(os.getenv("RESUME_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("RESUME_CACHE_TTL", str(7 * 24 * 3600))),
+    version=f"vocab{VOCABULARY_VERSION}-prompt{PROMPT_VERSION}-tier{TIER_VERSION}-{LLM_CONFIDENCE:g}-ctx{CONTEXT_TOKENS}",
+)
+
+llm_limiter = ConcurrencyLimiter.from_env("RESUME", default_limit=8)
+metrics.add_collector(llm_limiter.collect)
+metrics.add_collector(result_cache.collect)
+metrics.add_collector(skill_extractor.collect)
+
+jobs = JobManager(cache=result_cache)
+metrics.add_collector(jobs.collect)
+readiness = lifecycle.install(
+    app,
+    [llm.warm_up, warm_up_pdf_parser, warm_up_local_extractor, functools.partial(llm_output.warm_up, ResumeSkills)],
+    drains=[jobs.drain, llm.drain],
+)
+
+async def _read_body(request: Request) -> bytes:
+    """Read a raw request body, refusing anything over MAX_PDF_BYTES."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > MAX_PDF_BYTES:
+        raise HTTPException(status_code=413, detail=f"Resume exceeds {MAX_PDF_BYTES} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_PDF_BYTES:
+            raise HTTPException(status_code=413, detail=f"Resume exceeds {MAX_PDF_BYTES} bytes")
+    return bytes(body)
+
+
+async def _read_upload(request: Request) -> bytes:
+    """Read the "file" part of a multipart upload (spooled by Starlette)."""
+    form = await request.form(max_files=1, max_fields=4, max_part_size=MAX_PDF_BYTES)
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        raise HTTPException(status_code=400, detail='Multipart upload must include a "file" part')
+    try:
+        pdf_bytes = await upload.read(MAX_PDF_BYTES + 1)
+    finally:
+        await form.close()
+    if len(pdf_bytes) > MAX_PDF_BYTES:
+        raise HTTPException(status_code=413, detail=f"Resume exceeds {MAX_PDF_BYTES} bytes")
+    return pdf_bytes
+
+
+def _read_path(file_path: str) -> bytes:
+    """Legacy mode: the caller wrote the upload to a shared filesystem."""
+    try:
+        if os.path.getsize(file_path) > MAX_PDF_BYTES:
+            raise HTTPException(status_code=413, detail=f"Resume exceeds {MAX_PDF_BYTES} bytes")
+        with open(file_path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        metrics.log("resume_read_failed", level="error", error=str(e))
+        return b""
 
-app = FastAPI()
 
 @app.post("/api/analyze_resume")
-async def analyze_resume(request: ResumeRequest):
-    text = extract_text_from_pdf(request.file_path)
-    print("file path ",request.file_path)
-    skill_json= extract_skills(text)
+async def analyze_resume(request: Request):
+    """
+    Analyze a resume PDF.
+
+    Accepts the PDF directly, either as a raw ``application/pdf`` body or as
+    a multipart upload with a ``file`` part, or, for compatibility, a JSON
+    body ``{"file_path": ...}`` pointing at a file on a shared filesystem.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type == "application/json":
+        try:
+            body = ResumeRequest.model_validate(await request.json())
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        pdf_bytes = await run_blocking(_read_path, body.file_path)
+    elif content_type == "multipart/form-data":
+        pdf_bytes = await _read_upload(request)
+    elif content_type in ("application/pdf", "application/octet-stream"):
+        pdf_bytes = await _read_body(request)
+    else:
+        raise HTTPException(status_code=415, detail="Send application/pdf, multipart/form-data or JSON with file_path")
+
+    digest = content_digest(pdf_bytes) if pdf_bytes else None
+    if digest:
+        # SQLite lookup; the store happens in _analyze_pdf, also off the loop
+        cached = await run_blocking(result_cache.get, digest)
+        if cached is not None:
+            return {"data" : cached}
+
+    async with llm_limiter:
+        skill_json = await run_blocking(_analyze_pdf, pdf_bytes, digest)
 
     return {"data" : skill_json}
 
 
+def _analyze_pdf(pdf_bytes: bytes, digest: str):
+    """Blocking part of the analysis (PDF parsing + Gemini), run on the thread pool."""
+    with metrics.stage("pdf_parse"):
+        text = extract_text_from_pdf(pdf_bytes)
+    skill_json, complete = extract_skills_with_status(text)
+
+    # Only cache complete analyses; a failed LLM refinement should be retried
+    if digest and text and complete:
+        result_cache.set(digest, skill_json)
+
+    return skill_json
+
+
+@app.post("/api/resume_jobs", status_code=202)
+async def create_resume_job(request: Request):
+    """
+    Start a bulk analysis job; poll GET /api/resume_jobs/{job_id} for progress.
+
+    Accepts a JSON body ``{"path": ...}`` naming a directory or a
+    .zip/.tar/.tar.gz archive of PDFs under RESUME_JOBS_SOURCE_ROOT on a
+    shared filesystem, or the archive itself as the body (application/zip,
+    application/x-tar, application/gzip). Jobs by path are refused (403)
+    while RESUME_JOBS_SOURCE_ROOT is unset.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type == "application/json":
+        if not SOURCE_ROOT:
+            raise HTTPException(status_code=403, detail="Jobs by path are disabled; set RESUME_JOBS_SOURCE_ROOT or upload an archive")
+        try:
+            body = JobRequest.model_validate(await request.json())
+            job = jobs.create(body.path, source_root=SOURCE_ROOT)
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    elif content_type in ARCHIVE_TYPES:
+        job = jobs.create(upload_suffix=ARCHIVE_TYPES[content_type])
+        size = 0
+        try:
+            with open(job.state["source"], "wb") as f:
+                async for chunk in request.stream():
+                    size += len(chunk)
+                    if size > MAX_ARCHIVE_BYTES:
+                        raise HTTPException(status_code=413, detail=f"Archive exceeds {MAX_ARCHIVE_BYTES} bytes")
+                    f.write(chunk)
+        except Exception as e:
+            # Never resumed: the upload is incomplete
+            job.state.update(status="failed", error=getattr(e, "detail", None) or "Upload interrupted")
+            job.save(force=True)
+            raise
+    else:
+        raise HTTPException(status_code=415, detail="Send JSON with path, or a zip/tar archive")
+
+    jobs.start(job)
+    return job.progress()
+
+
+@app.get("/api/resume_jobs/{job_id}")
+async def resume_job_status(job_id: str):
+    """Progress of a bulk job: status, counts per outcome, resumes per minute and ETA."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.progress()
+
+
+@app.get("/api/resume_jobs/{job_id}/results")
+async def resume_job_results(job_id: str):
+    """The job's results so far, one JSON object per line."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if not os.path.exists(job.results_path):
+        return Response(b"", media_type="application/x-ndjson")
+    return FileResponse(job.results_path, media_type="application/x-ndjson")
+
+
+@app.get("/api/cache_stats")
+async def cache_stats():
+    """Hit/miss counters for the resume analysis cache, plus extraction paths and LLM output parse rates"""
+    return {
+        **result_cache.snapshot(),
+        "extraction": skill_extractor.path_stats(),
+        "llm_output": llm_output.stats().get("resume", {}),
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
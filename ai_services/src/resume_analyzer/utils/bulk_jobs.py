@@ -0,0 +1,488 @@
+"""
+Bulk resume analysis jobs: a directory or archive of PDFs in, JSONL out.
+
+    jobs = JobManager(cache=result_cache)
+    job = jobs.create("/shared/imports/batch-7.zip")
+    jobs.start(job)              # background task on the running loop
+    jobs.get(job.id).progress()  # from any worker
+
+Each job lives in RESUME_JOBS_DIR/<job id>/: job.json (source and
+progress, rewritten at most once a second) and results.jsonl, one line
+per PDF in completion order:
+
+    {"file": "a/b.pdf", "digest": "...", "status": "ok", "cached": false, "data": {...}, "ms": 812.4}
+
+status is "ok" (complete analysis), "partial" (Gemini refinement failed,
+local result only), "unreadable" (no text), "failed" (with "error") or
+"duplicate" (with "duplicate_of": the first file with the same content).
+
+Files are read one at a time and deduplicated by content digest. Text is
+extracted on a process pool of RESUME_JOBS_PARSE_WORKERS, and at most
+RESUME_JOBS_LLM_CONCURRENCY extractions run at once; a few documents are
+read ahead so both stay busy. Results already in the result cache are
+reused and complete ones are added to it.
+
+Jobs are resumable. results.jsonl is flushed line by line, and a
+restarted job skips every file that already has a line (a torn last line
+from a crash is dropped). The process running a job holds a lock on its
+directory, so with several workers each unfinished job found at startup
+is resumed by exactly one of them.
+"""
+import asyncio
+import fcntl
+import functools
+import json
+import os
+import re
+import tarfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from common import llm_scheduler, metrics
+from common.concurrency import run_blocking
+from utils.pdf_parser import MAX_PDF_BYTES, extract_text_from_pdf
+from utils.result_cache import content_digest
+from utils.skill_extractor import extract_skills_with_status
+
+DEFAULT_JOBS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "resume_jobs")
+JOBS_DIR = os.getenv("RESUME_JOBS_DIR", DEFAULT_JOBS_DIR)
+PARSE_WORKERS = int(os.getenv("RESUME_JOBS_PARSE_WORKERS", str(os.cpu_count() or 1)))
+LLM_CONCURRENCY = int(os.getenv("RESUME_JOBS_LLM_CONCURRENCY", "4"))
+# Jobs submitted over HTTP by path must name something under this directory;
+# unset, the service refuses them (the CLI takes any path)
+SOURCE_ROOT = os.getenv("RESUME_JOBS_SOURCE_ROOT", "")
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+STATUSES = ("ok", "partial", "unreadable", "failed", "duplicate")
+# Statuses a job is picked up again from after a restart
+UNFINISHED = ("queued", "running", "interrupted")
+PROGRESS_INTERVAL = 1.0
+
+_JOB_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _is_pdf(name: str) -> bool:
+    base = os.path.basename(name)
+    return base.lower().endswith(".pdf") and not base.startswith(".")
+
+
+def _read_limited(f):
+    """Returns (bytes, None) or (None, error) for a PDF over MAX_PDF_BYTES."""
+    data = f.read(MAX_PDF_BYTES + 1)
+    if len(data) > MAX_PDF_BYTES:
+        return None, f"PDF exceeds {MAX_PDF_BYTES} bytes"
+    return data, None
+
+
+def _within(path: str, root: str) -> bool:
+    """Whether ``path`` resolves (symlinks included) to ``root`` or below it."""
+    path, root = os.path.realpath(path), os.path.realpath(root)
+    return os.path.commonpath([path, root]) == root
+
+
+def list_source(source: str) -> list:
+    """
+    Names of the PDFs in a directory or archive, in processing order.
+
+    Raises:
+        ValueError: source is neither a directory nor a supported archive
+    """
+    if os.path.isdir(source):
+        names = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            names.extend(os.path.relpath(os.path.join(root, name), source) for name in sorted(files) if _is_pdf(name))
+        return names
+    lower = source.lower()
+    if lower.endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            return [info.filename for info in archive.infolist() if not info.is_dir() and _is_pdf(info.filename)]
+    if lower.endswith(ARCHIVE_SUFFIXES):
+        with tarfile.open(source) as archive:
+            return [member.name for member in archive if member.isfile() and _is_pdf(member.name)]
+    raise ValueError(f"Expected a directory or a {'/'.join(ARCHIVE_SUFFIXES)} archive: {source}")
+
+
+def iter_source(source: str, root: str = None):
+    """
+    Yield (name, bytes, error) for each PDF of a directory or archive.
+
+    Archives are read member by member and never extracted to disk. With
+    ``root``, a file of a directory source that is a symlink to somewhere
+    outside it is reported as an error instead of read.
+    """
+    if os.path.isdir(source):
+        for name in list_source(source):
+            if root and not _within(os.path.join(source, name), root):
+                yield name, None, "Outside the source root"
+                continue
+            try:
+                with open(os.path.join(source, name), "rb") as f:
+                    yield (name, *_read_limited(f))
+            except OSError as e:
+                yield name, None, str(e)
+    elif source.lower().endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_pdf(info.filename):
+                    with archive.open(info) as f:
+                        yield (info.filename, *_read_limited(f))
+    else:
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and _is_pdf(member.name):
+                    yield (member.name, *_read_limited(archive.extractfile(member)))
+
+
+def _next_document(documents):
+    """Next (name, data, digest, error) from ``iter_source``, or None; runs on the thread pool."""
+    item = next(documents, None)
+    if item is None:
+        return None
+    name, data, error = item
+    return name, data, content_digest(data) if data is not None else None, error
+
+
+class BulkJob:
+    """One job's on-disk state: job.json, results.jsonl and the directory lock."""
+
+    def __init__(self, directory: str, state: dict):
+        self.dir = directory
+        self.state = state
+        self._saved_at = 0.0
+        self._lock_fd = None
+
+    @property
+    def id(self) -> str:
+        return self.state["id"]
+
+    @property
+    def results_path(self) -> str:
+        return self.state.get("results_path") or os.path.join(self.dir, "results.jsonl")
+
+    @classmethod
+    def load(cls, directory: str):
+        """The job stored in ``directory``, or None."""
+        try:
+            with open(os.path.join(directory, "job.json")) as f:
+                return cls(directory, json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, force: bool = False):
+        """Write job.json atomically, at most once per PROGRESS_INTERVAL unless forced."""
+        now = time.monotonic()
+        if not force and now - self._saved_at < PROGRESS_INTERVAL:
+            return
+        self._saved_at = now
+        self.state["updated_at"] = time.time()
+        path = os.path.join(self.dir, "job.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.state, f)
+        os.replace(path + ".tmp", path)
+
+    def claim(self) -> bool:
+        """Take the job's directory lock; False when another process is running it."""
+        fd = os.open(os.path.join(self.dir, "lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # A POSIX record lock, not flock: parse pool workers forked while it
+            # is held do not inherit it, so it dies with this process
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def release(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def recorded(self):
+        """
+        Files and digests already in results.jsonl, and counts per status.
+
+        A last line without its newline (the process died mid-write) is cut
+        off so appending continues on a line boundary.
+        """
+        files, digests, counts = set(), {}, dict.fromkeys(STATUSES, 0)
+        try:
+            with open(self.results_path, "rb+") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    f.truncate(end)
+        except FileNotFoundError:
+            return files, digests, counts
+        for raw in data[:end].splitlines():
+            try:
+                line = json.loads(raw)
+            except ValueError:
+                continue
+            files.add(line["file"])
+            if line.get("digest") and line["status"] != "duplicate":
+                digests[line["digest"]] = line["file"]
+            counts[line["status"]] = counts.get(line["status"], 0) + 1
+        return files, digests, counts
+
+    def progress(self) -> dict:
+        """Job state plus done/remaining counts, throughput and an ETA."""
+        state = self.state
+        done = sum(state.get("counts", {}).values())
+        report = {**state, "done": done}
+        total = state.get("total")
+        if total is not None:
+            report["remaining"] = max(0, total - done)
+        processed = done - state.get("resumed", 0)
+        if state.get("started_at") and processed > 0:
+            elapsed = (state.get("finished_at") or time.time()) - state["started_at"]
+            if elapsed > 0:
+                report["resumes_per_minute"] = round(processed / elapsed * 60, 1)
+                if total is not None and state["status"] == "running":
+                    report["eta_seconds"] = round(report["remaining"] * elapsed / processed, 1)
+        return report
+
+
+class JobManager:
+    """Creates, runs and resumes bulk jobs under one jobs directory."""
+
+    def __init__(self, jobs_dir: str = JOBS_DIR, cache=None, parse_workers: int = PARSE_WORKERS,
+                 llm_concurrency: int = LLM_CONCURRENCY):
+        self.jobs_dir = jobs_dir
+        self.cache = cache
+        self.parse_workers = parse_workers
+        self.llm_concurrency = llm_concurrency
+        # Background tasks carry no request context; label their metrics and logs
+        self.service = metrics.current_service()
+        self.documents = dict.fromkeys(STATUSES, 0)
+        self._running = {}
+        self._stopping = False
+        self._pool = None
+        self._llm_slots = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self._pool
+
+    def _job_dir(self, job_id: str) -> str:
+        if not _JOB_ID.match(job_id or ""):
+            raise ValueError(f"Invalid job id: {job_id!r}")
+        return os.path.join(self.jobs_dir, job_id)
+
+    def create(self, source: str = None, job_id: str = None, results_path: str = None, upload_suffix: str = None,
+               source_root: str = None) -> BulkJob:
+        """
+        Register a job, or return the existing one with the same ID.
+
+        Args:
+            source: directory or archive of PDFs
+            job_id: ID to use (a rerun with the same ID resumes); random when None
+            results_path: JSONL output, default results.jsonl in the job directory
+            upload_suffix: instead of ``source``, the job reads an archive
+                the caller writes to ``state["source"]`` (``<job dir>/source<suffix>``)
+                before starting it
+            source_root: when set, ``source`` and the files read from it
+                must resolve to this directory or below it
+
+        Raises:
+            ValueError: invalid ID, or the source is missing, outside
+                ``source_root`` or not a directory/archive
+        """
+        job_id = job_id or uuid.uuid4().hex
+        directory = self._job_dir(job_id)
+        existing = BulkJob.load(directory)
+        if existing is not None:
+            return existing
+
+        if upload_suffix is not None:
+            source = os.path.join(directory, "source" + upload_suffix)
+        else:
+            source = os.path.realpath(source)
+            if source_root and not _within(source, source_root):
+                raise ValueError(f"Source must be under {source_root}")
+            if not os.path.exists(source):
+                raise ValueError(f"No such directory or archive: {source}")
+            if not os.path.isdir(source) and not source.lower().endswith(ARCHIVE_SUFFIXES):
+                raise ValueError(f"Expected a directory or a {'/'.join(ARCHIVE_SUFFIXES)} archive: {source}")
+
+        os.makedirs(directory, exist_ok=True)
+        job = BulkJob(directory, {
+            "id": job_id,
+            "source": source,
+            "source_root": os.path.realpath(source_root) if source_root else None,
+            "results_path": os.path.abspath(results_path) if results_path else None,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "total": None,
+            "resumed": 0,
+            "counts": dict.fromkeys(STATUSES, 0),
+        })
+        job.save(force=True)
+        return job
+
+    def get(self, job_id: str):
+        """The job with this ID (live state when this process runs it), or None."""
+        running = self._running.get(job_id)
+        if running is not None:
+            return running[0]
+        try:
+            return BulkJob.load(self._job_dir(job_id))
+        except ValueError:
+            return None
+
+    def start(self, job: BulkJob):
+        """Run the job in a background task unless this process already runs it."""
+        if job.id not in self._running:
+            self._running[job.id] = (job, asyncio.ensure_future(self.run(job)))
+
+    def resume_incomplete(self) -> list:
+        """Start every unfinished job found in the jobs directory; returns their IDs."""
+        try:
+            names = sorted(os.listdir(self.jobs_dir))
+        except FileNotFoundError:
+            return []
+        resumed = []
+        for name in names:
+            job = BulkJob.load(os.path.join(self.jobs_dir, name))
+            if job is not None and job.state["status"] in UNFINISHED:
+                self.start(job)
+                resumed.append(job.id)
+        return resumed
+
+    async def run(self, job: BulkJob):
+        """Process the job to the end (or until ``drain``); returns its final state."""
+        metrics.service.set(self.service)
+        metrics.request_id.set(f"job-{job.id}")
+        metrics.detach_from_request()
+        llm_scheduler.priority.set("background")
+        try:
+            if not job.claim():
+                metrics.log("resume_job_claimed_elsewhere", job_id=job.id)
+                return job.state
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                job.state["status"] = "interrupted"
+                raise
+            except Exception as e:
+                job.state.update(status="failed", error=str(e))
+                metrics.log("resume_job_failed", level="error", job_id=job.id, error=str(e))
+            finally:
+                if job.state["status"] != "running":
+                    job.state["finished_at"] = time.time() if job.state["status"] in ("done", "failed") else None
+                job.save(force=True)
+                job.release()
+            return job.state
+        finally:
+            self._running.pop(job.id, None)
+
+    async def _run(self, job: BulkJob):
+        state = job.state
+        if self._llm_slots is None:
+            self._llm_slots = asyncio.Semaphore(self.llm_concurrency)
+        files, digests, counts = await run_blocking(job.recorded)
+        state["total"] = len(await run_blocking(list_source, state["source"]))
+        state.update(status="running", started_at=time.time(), finished_at=None, resumed=len(files), counts=counts)
+        state.pop("error", None)
+        job.save(force=True)
+        metrics.log("resume_job_started", job_id=job.id, total=state["total"], resumed=len(files))
+
+        # Documents read ahead of the parse pool and LLM slots
+        window = asyncio.Semaphore(self.parse_workers + self.llm_concurrency)
+        pending = set()
+        with open(job.results_path, "a") as out:
+            record = functools.partial(self._record, job, out)
+            documents = iter_source(state["source"], state.get("source_root"))
+            while not self._stopping:
+                await window.acquire()
+                item = await run_blocking(_next_document, documents)
+                if item is None:
+                    window.release()
+                    break
+                name, data, digest, error = item
+                if name in files:
+                    window.release()
+                    continue
+                files.add(name)
+                if error:
+                    record({"file": name, "digest": digest, "status": "failed", "error": error})
+                elif digest in digests:
+                    record({"file": name, "digest": digest, "status": "duplicate", "duplicate_of": digests[digest]})
+                else:
+                    # Later copies point here even while this one is still in flight
+                    digests[digest] = name
+                    task = asyncio.ensure_future(self._analyze(record, name, digest, data))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    task.add_done_callback(lambda _: window.release())
+                    continue
+                window.release()
+            if pending:
+                await asyncio.gather(*pending)
+        state["status"] = "interrupted" if self._stopping else "done"
+        metrics.log("resume_job_finished", job_id=job.id, status=state["status"], counts=state["counts"])
+
+    async def _analyze(self, record, name: str, digest: str, data: bytes):
+        started = time.perf_counter()
+        line = {"file": name, "digest": digest}
+        try:
+            cached = await run_blocking(self.cache.get, digest) if self.cache is not None else None
+            if cached is not None:
+                line.update(status="ok", cached=True, data=cached)
+            else:
+                loop = asyncio.get_running_loop()
+                with metrics.stage("pdf_parse"):
+                    text = await loop.run_in_executor(
+                        self._get_pool(), functools.partial(extract_text_from_pdf, data, parallel=False)
+                    )
+                if not text.strip():
+                    line.update(status="unreadable")
+                else:
+                    async with self._llm_slots:
+                        result, complete = await run_blocking(extract_skills_with_status, text)
+                    if complete and self.cache is not None:
+                        await run_blocking(self.cache.set, digest, result)
+                    line.update(status="ok" if complete else "partial", cached=False, data=result)
+        except Exception as e:
+            line.update(status="failed", error=str(e))
+        line["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        record(line)
+
+    def _record(self, job: BulkJob, out, line: dict):
+        out.write(json.dumps(line) + "\n")
+        out.flush()
+        job.state["counts"][line["status"]] += 1
+        self.documents[line["status"]] += 1
+        job.save()
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Stop reading new documents and wait up to ``timeout`` for those in
+        flight; jobs left unfinished are marked "interrupted" and resumed on
+        the next start. Returns the number of jobs still running.
+        """
+        self._stopping = True
+        still_running = set()
+        tasks = [task for _, task in self._running.values()]
+        if tasks:
+            _, still_running = await asyncio.wait(tasks, timeout=timeout)
+            for task in still_running:
+                task.cancel()
+            if still_running:
+                await asyncio.wait(still_running)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        return len(still_running)
+
+    def collect(self):
+        """Metric families for ``metrics.add_collector``."""
+        yield metrics.Family("ai_resume_job_documents_total", "counter", "Bulk job documents processed by outcome",
+                             [({"status": status}, count) for status, count in self.documents.items()])
+        yield metrics.Family("ai_resume_jobs_running", "gauge", "Bulk jobs running in this process", [({}, len(self._running))])
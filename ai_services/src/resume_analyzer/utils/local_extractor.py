@@ -0,0 +1,157 @@
+"""
+Local (no-LLM) resume pass and a confidence score for its result.
+
+    local = analyze_locally(text)
+    local.result        {"tech_skills", "soft_skills", "projects"}
+    local.confidence    0..1, how much of the resume's skill-like content
+                        the vocabulary recognised
+    local.unknown       skill-like terms it did not recognise
+
+Skills come from the vocabulary phrase matcher (``MATCHER``). Coverage is
+measured on candidate terms: the items of list-like lines ("Python,
+Docker, Svelte" or "Languages: Go | Elixir") plus, when spaCy and a model
+are installed (RESUME_SPACY_MODEL, e.g. "en_core_web_sm"), short proper-noun
+chunks from the rest of the text. A candidate the matcher recognises is
+covered; a capitalised list item, or a chunk that looks technical
+(inner capitals, digits or symbols), that is not in the vocabulary counts
+against coverage. Projects are the entry titles
+of the "Projects" section(s) found by ``resume_sections.segment``.
+
+``skill_extractor`` calls Gemini only when the confidence is below
+RESUME_LLM_CONFIDENCE or no project was found.
+
+The spaCy tier is off unless RESUME_SPACY_MODEL is set and the model is
+installed (``python -m spacy download en_core_web_sm``); spacy itself is
+in requirements.txt, the model is not. Without it, prose outside list-like
+lines yields no candidates, so coverage is measured on list items only.
+The default mode is what benchmarks/bench_tiered_extraction.py measures:
+on its corpus Gemini is skipped for 25% of resumes (the formatted ones),
+or 75% with RESUME_LLM_FOR_PROJECTS=0, with local recall 1.0 on those.
+"""
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+from common import metrics
+from utils.resume_sections import Section, project_titles, segment
+from utils.skill_matcher import MATCHER
+
+# Bump whenever the local pass or the confidence formula changes so cached
+# analyses are rebuilt.
+TIER_VERSION = "3"
+
+SPACY_MODEL = os.getenv("RESUME_SPACY_MODEL", "")
+
+# Tech skills a resume needs before the local result counts as complete
+FULL_SKILL_COUNT = 6
+COVERAGE_WEIGHT = 0.7
+
+# A line splits into list items on these; items longer than MAX_ITEM_WORDS
+# are prose, not skills
+_ITEM_SPLIT = re.compile(r"\s*(?:[,;|•·▪●()]|\s[-–]\s)\s*")
+_LABEL = re.compile(r"^\s*[\w /&+-]{2,30}:\s*")
+_LETTER = re.compile(r"[A-Za-z]")
+MAX_ITEM_WORDS = 3
+MIN_LIST_ITEMS = 3
+
+# Looks like a technology name: a capital after the first letter, a digit
+# or a symbol ("PyTorch", "S3", "C++", "Next.js"), or an all-caps acronym
+_TECHNICAL = re.compile(r"[A-Za-z][a-z]*[A-Z0-9]|[+#.]|^[A-Z]{2,}$")
+
+
+class LocalAnalysis(NamedTuple):
+    result: dict
+    confidence: float
+    coverage: float
+    unknown: List[str]
+
+
+_nlp = None
+
+
+def _load_spacy():
+    """The spaCy pipeline named by RESUME_SPACY_MODEL, or None when unavailable."""
+    global _nlp
+    if _nlp is None:
+        _nlp = False
+        if SPACY_MODEL:
+            try:
+                import spacy
+
+                _nlp = spacy.load(SPACY_MODEL, disable=["ner", "lemmatizer"])
+            except (ImportError, OSError) as e:
+                metrics.log("spacy_unavailable", level="warning", model=SPACY_MODEL, error=str(e))
+    return _nlp or None
+
+
+def warm_up():
+    """Load the spaCy model ahead of the first upload (no-op without one)."""
+    _load_spacy()
+
+
+def _list_items(line: str) -> List[str]:
+    items = [item.strip(" .") for item in _ITEM_SPLIT.split(_LABEL.sub("", line))]
+    items = [item for item in items if _LETTER.search(item) and len(item.split()) <= MAX_ITEM_WORDS]
+    return items if len(items) >= MIN_LIST_ITEMS else []
+
+
+def _chunk_candidates(prose: str) -> List[str]:
+    nlp = _load_spacy()
+    if nlp is None or not prose:
+        return []
+    return [
+        chunk.text for chunk in nlp(prose).noun_chunks
+        if len(chunk) <= MAX_ITEM_WORDS and any(token.pos_ == "PROPN" for token in chunk)
+    ]
+
+
+def analyze_locally(text: str, sections: Optional[List[Section]] = None) -> LocalAnalysis:
+    """
+    Vocabulary skills, project titles and a confidence score, without the LLM.
+
+    Args:
+        text: extracted resume text
+        sections: ``segment(text)`` when the caller already has it
+
+    Returns:
+        LocalAnalysis: result dict, confidence and coverage (0..1) and the
+        unrecognised skill-like terms
+    """
+    detected = MATCHER.detect(text or "")
+    if sections is None:
+        sections = segment(text)
+
+    # Section bodies only: headings are neither skills nor prose
+    items, prose = [], []
+    for section in sections:
+        for line in section.lines:
+            line_items = _list_items(line)
+            if line_items:
+                items.extend(line_items)
+            else:
+                prose.append(line)
+
+    covered, unknown = 0, []
+    # List items after a comma are lower-case when they are prose ("built
+    # pipelines"); chunks start sentences, so only inner capitals count there
+    candidates = [(item, item[:1].isupper() or bool(_TECHNICAL.search(item))) for item in items]
+    candidates += [(chunk, bool(_TECHNICAL.search(chunk))) for chunk in _chunk_candidates("\n".join(prose))]
+    for candidate, skill_like in candidates:
+        if MATCHER.scan(candidate):
+            covered += 1
+        elif skill_like and candidate not in unknown:
+            unknown.append(candidate)
+    tech = detected.get("tech", [])
+    if covered + len(unknown):
+        coverage = covered / (covered + len(unknown))
+    else:
+        # No list to judge by: trust the matcher only as far as it found things
+        coverage = min(1.0, len(tech) / FULL_SKILL_COUNT)
+    confidence = COVERAGE_WEIGHT * coverage + (1 - COVERAGE_WEIGHT) * min(1.0, len(tech) / FULL_SKILL_COUNT)
+
+    result = {
+        "tech_skills": list(tech),
+        "soft_skills": list(detected.get("soft", [])),
+        "projects": project_titles(sections),
+    }
+    return LocalAnalysis(result, round(confidence, 3), round(coverage, 3), unknown)
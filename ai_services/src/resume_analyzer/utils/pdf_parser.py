@@ -1,21 +1,128 @@
 import io
-from pypdf import PdfReader
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_text_from_pdf(pdf_input):
-    
+from common import metrics
+
+# Hard limits so a pathological upload cannot stall a worker.
+MAX_PDF_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+
+# Default extraction budget. Resumes rarely exceed a few thousand
+# characters; anything after the budget is never looked at downstream.
+DEFAULT_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "20000"))
+
+# Documents with at least this many pages are extracted on a process pool.
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+PARALLEL_CHUNK_PAGES = 4
+PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool = None
+
+
+class PdfTooLargeError(ValueError):
+    """Raised when a PDF exceeds MAX_PDF_BYTES."""
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS)
+    return _pool
+
+
+def _read_bytes(pdf_input):
+    if isinstance(pdf_input, (bytes, bytearray, memoryview)):
+        data = bytes(pdf_input)
+    elif hasattr(pdf_input, "read"):
+        data = pdf_input.read(MAX_PDF_BYTES + 1)
+    else:
+        if os.path.getsize(pdf_input) > MAX_PDF_BYTES:
+            raise PdfTooLargeError(f"PDF exceeds {MAX_PDF_BYTES} bytes")
+        with open(pdf_input, "rb") as f:
+            data = f.read()
+    if len(data) > MAX_PDF_BYTES:
+        raise PdfTooLargeError(f"PDF exceeds {MAX_PDF_BYTES} bytes")
+    return data
+
+
+def _reader(data: bytes):
+    # pypdf is imported on first use; it is a sizeable share of startup time
+    from pypdf import PdfReader
+
+    return PdfReader(io.BytesIO(data))
+
+
+def warm_up():
+    """Import pypdf ahead of the first upload."""
+    import pypdf  # noqa: F401
+
+
+def _extract_page_range(data: bytes, start: int, stop: int):
+    """Process pool task: extract pages [start, stop) from raw PDF bytes."""
+    reader = _reader(data)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pdf_pages(pdf_input, max_pages: int = None, parallel: bool = True):
+    """
+    Lazily yield the text of each page, in order.
+
+    Args:
+        pdf_input: file path, bytes or binary file object
+        max_pages: stop after this many pages (capped at MAX_PDF_PAGES)
+        parallel: fan long documents out across a process pool
+
+    Yields:
+        str: page text ("" for pages without extractable text)
+    """
+    data = _read_bytes(pdf_input)
+    reader = _reader(data)
+    page_count = min(len(reader.pages), MAX_PDF_PAGES, max_pages or MAX_PDF_PAGES)
+
+    if not parallel or page_count < PARALLEL_MIN_PAGES or PARALLEL_WORKERS < 2:
+        for i in range(page_count):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_page_range, data, start, min(start + PARALLEL_CHUNK_PAGES, page_count))
+        for start in range(0, page_count, PARALLEL_CHUNK_PAGES)
+    ]
     try:
-        if isinstance(pdf_input, bytes):
-            # Handle binary data (e.g. from MongoDB)
-            reader = PdfReader(io.BytesIO(pdf_input))
-        else:
-            reader = PdfReader(pdf_input)
-        text = ""
-        for page in reader.pages:
-            # Handle cases where extraction might return None
-            text += (page.extract_text() or "") + "\n"
-        return text
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Consumer stopped early (budget reached) or failed: drop queued work
+        for future in futures:
+            future.cancel()
+
+
+def extract_text_from_pdf(pdf_input, max_chars: int = DEFAULT_MAX_CHARS, max_pages: int = None, parallel: bool = True):
+    """
+    Extract text from a PDF, stopping once the character or page budget is reached.
+
+    Args:
+        pdf_input: file path, bytes (e.g. from MongoDB) or binary file object
+        max_chars: character budget, None for no limit
+        max_pages: page budget, None for MAX_PDF_PAGES
+        parallel: fan long documents out across the process pool (False
+            when already running in a pool worker)
+
+    Returns:
+        str: extracted text, "" if the PDF could not be read
+    """
+    try:
+        parts = []
+        size = 0
+        for page_text in iter_pdf_pages(pdf_input, max_pages=max_pages, parallel=parallel):
+            parts.append(page_text)
+            size += len(page_text) + 1
+            if max_chars and size >= max_chars:
+                break
+        text = "\n".join(parts) + "\n" if parts else ""
+        return text[:max_chars] if max_chars else text
     except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
+        metrics.log("pdf_extract_failed", level="error", error=str(e))
         return ""
-
-    
\ No newline at end of file
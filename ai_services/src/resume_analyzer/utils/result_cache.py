@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from common import metrics
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "resume_analysis.sqlite3")
+
+
+def content_digest(data: bytes) -> str:
+    """SHA-256 hex digest of the uploaded file bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for resume analysis results keyed by content digest.
+
+    Tier 1 is an in-process LRU bounded by entry count and TTL.
+    Tier 2 is a SQLite file shared by every worker on the host, so a
+    repeat upload is served without re-parsing or calling the LLM even
+    when it lands on a different process.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_entries: int = 256, ttl_seconds: float = 7 * 24 * 3600, version: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+        self._db = None
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+            except sqlite3.Error as e:
+                metrics.log("resume_cache_disk_disabled", level="warning", error=str(e))
+                self._db = None
+
+    def _key(self, digest: str) -> str:
+        return f"{digest}:{self.version}"
+
+    def get(self, digest: str):
+        key = self._key(digest)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created_at FROM results WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    metrics.log("resume_cache_read_failed", level="warning", error=str(e))
+                    row = None
+                if row and now - row[1] < self.ttl_seconds:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.stats["disk_hits"] += 1
+                    return value
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, digest: str, value: dict):
+        key = self._key(digest)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self.stats["stores"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), now),
+                    )
+                    self._db.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,))
+                except sqlite3.Error as e:
+                    metrics.log("resume_cache_write_failed", level="warning", error=str(e))
+
+    def _remember(self, key, created_at, value):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def collect(self):
+        """Metric families for ``metrics.add_collector``."""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._memory)
+        yield metrics.Family("ai_resume_cache_total", "counter", "Resume result cache lookups and writes",
+                             [({"outcome": outcome}, value) for outcome, value in stats.items()])
+        yield metrics.Family("ai_resume_cache_entries", "gauge", "Resume results held in memory", [({}, entries)])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = lookups - self.stats["misses"]
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "version": self.version,
+            }
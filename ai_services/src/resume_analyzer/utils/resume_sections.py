@@ -0,0 +1,213 @@
+"""
+Resume section segmentation and token-budgeted context for the LLM.
+
+    sections = segment(text)
+    [s.name for s in sections]   ["header", "summary", "skills", "experience", "projects", ...]
+    build_context(sections, 450)  the most useful sections, at most ~450 tokens
+    project_titles(sections)      entry titles of the Projects section(s)
+
+A heading is a short line whose words (after bullets, decoration and a
+trailing colon are stripped) are a known heading phrase, optionally with
+a qualifier ("Technical Skills", "WORK EXPERIENCE", "Personal Projects:",
+"S K I L L S"), or such a phrase followed by a colon and content
+("Skills: Python, Go"). Anything before the first heading is the
+"header" section; headings outside the main five map to "other". One
+pass over the lines with a dict lookup per short line, so segmentation
+costs tens of microseconds per resume.
+"""
+import os
+import re
+from typing import List, NamedTuple
+
+# Section names in the order their content is worth to skill extraction
+CONTEXT_PRIORITY = ("skills", "projects", "experience", "summary", "header", "other", "education")
+
+# Tokens of resume text sent to Gemini
+CONTEXT_TOKENS = int(os.getenv("RESUME_CONTEXT_TOKENS", "450"))
+# Same estimate as ``context_cache.StaticPrefix``
+CHARS_PER_TOKEN = 4
+
+_HEADINGS = {
+    "summary": ["summary", "profile", "objective", "about", "about me", "overview", "career objective", "introduction"],
+    "experience": ["experience", "employment", "employment history", "work history", "career history",
+                   "internship", "internships", "work", "positions held"],
+    "skills": ["skills", "skill set", "skillset", "competencies", "core competencies", "technologies", "tech stack",
+               "tools", "skills and tools", "tools and technologies", "technical proficiencies", "expertise"],
+    "projects": ["projects", "project", "project experience", "portfolio"],
+    "education": ["education", "academic background", "qualifications", "coursework", "education and training"],
+    "other": ["certifications", "certification", "certificates", "licenses and certifications", "achievements",
+              "awards", "honors", "honors and awards", "publications", "languages", "interests", "hobbies",
+              "activities", "extracurricular activities", "volunteering", "volunteer experience", "leadership",
+              "references", "contact", "contact information", "links"],
+}
+# Words that may precede a heading phrase ("Relevant Experience", "Key Skills")
+_QUALIFIERS = {"technical", "professional", "work", "relevant", "key", "core", "academic", "personal",
+               "selected", "side", "notable", "additional", "other", "soft", "hard", "my"}
+_HEADING_NAMES = {phrase: name for name, phrases in _HEADINGS.items() for phrase in phrases}
+# Also ordinary list entries ("Leadership" under soft skills): headings only
+# when written in capitals or followed by a colon
+_AMBIGUOUS = {"about", "activities", "contact", "expertise", "languages", "leadership", "links", "overview",
+              "profile", "project", "tools", "work"}
+
+MAX_HEADING_CHARS = 40
+# Smallest leftover budget worth starting another section with
+MIN_PIECE_CHARS = 40
+_DECORATION = re.compile(r"^[\s\-–—*•·▪●#=_|>]+|[\s\-–—*•·▪●#=_|:]+$")
+# "S K I L L S", "W O R K   E X P E R I E N C E" (wider gaps between words)
+_SPACED_LETTERS = re.compile(r"^(?:[A-Za-z] {1,3}){2,}[A-Za-z]$")
+_WORD_GAP = re.compile(r" {2,}")
+_NON_WORD = re.compile(r"[^a-z ]+")
+
+# Project entry titles: a short unbulleted line (else a bulleted entry), up to the first
+# separator ("Chat Relay - a websocket app", "Budget Tracker (React)")
+_BULLET = re.compile(r"^\s*(?:[-*•·▪●–]|\d+[.)])\s*")
+_TITLE_END = re.compile(r"\s+[-–|:]\s+|:\s|\s\(")
+MAX_TITLE_WORDS = 8
+MAX_PROJECTS = 10
+
+
+class Section(NamedTuple):
+    name: str
+    heading: str
+    lines: List[str]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _heading_name(candidate: str, marked: bool):
+    """
+    Section name of a heading line (already stripped of decoration), or None.
+
+    ``marked`` tells whether the line was written as a heading (capitals or
+    a trailing colon), which ambiguous single words need.
+    """
+    if _SPACED_LETTERS.match(candidate):
+        candidate = " ".join(word.replace(" ", "") for word in _WORD_GAP.split(candidate))
+    key = " ".join(_NON_WORD.sub(" ", candidate.lower().replace("&", " and ")).split())
+    if key in _AMBIGUOUS and not (marked or candidate.isupper()):
+        return None
+    name = _HEADING_NAMES.get(key)
+    if name is None:
+        first, _, rest = key.partition(" ")
+        if first in _QUALIFIERS and rest:
+            name = _HEADING_NAMES.get(rest)
+    return name
+
+
+def segment(text: str) -> List[Section]:
+    """
+    Split resume text into sections by heading heuristics.
+
+    Args:
+        text: extracted resume text
+
+    Returns:
+        List[Section]: sections in document order; the first is "header"
+        (possibly empty) and a name may repeat
+    """
+    sections = [Section("header", "", [])]
+    for line in (text or "").splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if _BULLET.match(stripped):
+            sections[-1].lines.append(stripped)
+            continue
+        if len(stripped) <= MAX_HEADING_CHARS:
+            name = _heading_name(_DECORATION.sub("", stripped), stripped.endswith(":"))
+            if name:
+                sections.append(Section(name, stripped, []))
+                continue
+        # "Skills: Python, Go" opens a section with its content; "Languages:
+        # English, Spanish" stays a line of the section it is in
+        label, colon, content = stripped.partition(":")
+        if colon and content.strip() and len(label) <= MAX_HEADING_CHARS:
+            name = _heading_name(_DECORATION.sub("", label), True)
+            if name and name != "other" and name != sections[-1].name:
+                sections.append(Section(name, label.strip(), [content.strip()]))
+                continue
+        sections[-1].lines.append(stripped)
+    return sections
+
+
+def _fit(section: Section, chars: int) -> str:
+    """The section's heading and as many whole lines as fit in ``chars``."""
+    kept = [section.heading] if section.heading else []
+    used = len(section.heading)
+    for line in section.lines:
+        if used + len(line) + 1 > chars:
+            if not kept or kept == [section.heading]:
+                # Nothing of the body fits whole: cut the first line
+                kept.append(line[: max(0, chars - used - 1)])
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return "\n".join(part for part in kept if part)
+
+
+def build_context(sections: List[Section], budget_tokens: int = CONTEXT_TOKENS) -> str:
+    """
+    Pack the sections most useful for skill extraction into a token budget.
+
+    Sections are taken in ``CONTEXT_PRIORITY`` order (skills and projects
+    first, education last), each cut at a line boundary when it no longer
+    fits, and joined back in document order.
+
+    Args:
+        sections: output of ``segment``
+        budget_tokens: approximate token budget (4 characters per token)
+
+    Returns:
+        str: resume text for the prompt
+    """
+    remaining = budget_tokens * CHARS_PER_TOKEN
+    rank = {name: index for index, name in enumerate(CONTEXT_PRIORITY)}
+    order = sorted(range(len(sections)), key=lambda index: (rank[sections[index].name], index))
+    chosen = {}
+    for index in order:
+        if remaining < MIN_PIECE_CHARS:
+            break
+        section = sections[index]
+        if not section.lines:
+            continue
+        piece = _fit(section, remaining)
+        if piece:
+            chosen[index] = piece
+            remaining -= len(piece) + 2
+    return "\n\n".join(chosen[index] for index in sorted(chosen))
+
+
+def project_titles(sections: List[Section]) -> List[str]:
+    """
+    Entry titles of the Projects section(s), without the LLM.
+
+    Args:
+        sections: output of ``segment``
+
+    Returns:
+        List[str]: up to MAX_PROJECTS titles in document order
+    """
+    titles = []
+    for section in sections:
+        if section.name != "projects":
+            continue
+        # Candidates: bulleted entries and short unbulleted lines
+        entries = []
+        for line in section.lines:
+            bulleted = bool(_BULLET.match(line))
+            title = _TITLE_END.split(_BULLET.sub("", line).strip(), 1)[0].strip(" .:")
+            if title and (bulleted or len(line.split()) <= MAX_TITLE_WORDS) and len(title.split()) <= MAX_TITLE_WORDS:
+                entries.append((bulleted, title))
+        # Bullets are the entries only in a plain list of projects; under
+        # unbulleted titles they are those projects' descriptions
+        if not all(bulleted for bulleted, _ in entries):
+            entries = [entry for entry in entries if not entry[0]]
+        for _, title in entries:
+            if title not in titles:
+                titles.append(title)
+            if len(titles) >= MAX_PROJECTS:
+                return titles
+    return titles
+    return titles
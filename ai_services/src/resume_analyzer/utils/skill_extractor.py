@@ -1,84 +1,61 @@
 
 import os
-import json
-from google import genai
+import threading
 from dotenv import load_dotenv
+from common import llm, llm_output, metrics
+from common.llm_output import LLMOutputError
+from common.llm_schemas import ResumeSkills
+from utils.local_extractor import analyze_locally
+from utils.resume_sections import CONTEXT_TOKENS, build_context, segment
 
 load_dotenv()
 
 api_key = os.getenv("GEMINI_API_KEY")
 
 if not api_key:
-    print("api key not found")
+    metrics.log("api_key_missing", level="warning")
 
+# Bump whenever the refinement prompt changes so cached results are rebuilt.
+PROMPT_VERSION = "2"
 
-Client =  genai.Client(api_key=api_key)
+# Gemini is called only when the local pass is less confident than this
+# (0..1; 0 never calls it for skills, anything above 1 always does) ...
+LLM_CONFIDENCE = float(os.getenv("RESUME_LLM_CONFIDENCE", "0.85"))
+# ... or found no projects
+LLM_FOR_PROJECTS = os.getenv("RESUME_LLM_FOR_PROJECTS", "1") == "1"
 
+# Which path each extraction took: "local" (Gemini bypassed) or the reason it was called
+_paths = {"local": 0, "low_confidence": 0, "no_projects": 0}
+_paths_lock = threading.Lock()
 
-def extract_skills(text):
-    """
-    Hybrid skill extraction using:
-    1. Local keyword scan (fast)
-    2. Gemini LLM refinement (semantic understanding)
-    
-    Returns:
-        dict: {
-            'tech_skills': list of technical skills,
-            'soft_skills': list of soft skills,
-            'projects': list of projects
-        }
-    """
-   
-    tech_keywords = [
-            "Python", "Java", "C++", "C#", "JavaScript", "TypeScript", "GoLang", "Rust", "Ruby", "PHP", "Swift", "Kotlin",
-            "HTML", "CSS", "SASS", "Bootstrap", "Tailwind CSS", "React", "Next.js", "Angular", "Vue.js", "jQuery",
-            "Node.js", "Express.js", "Django", "Flask", "FastAPI", "Spring Boot", "Laravel", "Ruby on Rails", "ASP.NET Core",
-            "SQL", "MySQL", "PostgreSQL", "SQLite", "MongoDB", "Firebase", "Oracle", "Redis", "Cassandra",
-            "AWS", "Azure", "Google Cloud", "Firebase", "Docker", "Kubernetes", "Jenkins", "Terraform", "CI/CD", "Ansible", "Linux", "Bash",
-            "Pandas", "NumPy", "Matplotlib", "Seaborn", "Scikit-learn", "TensorFlow", "Keras", "PyTorch", "OpenCV", "NLP", "Hugging Face",
-            "LLM", "LangChain", "RAG", "Transformers", "Machine Learning", "Deep Learning", "Neural Networks", "Computer Vision",
-            "Apache Spark", "Hadoop", "Kafka", "Airflow", "ETL", "Data Warehousing", "Snowflake", "Databricks",
-            "React Native", "Flutter", "SwiftUI", "Android Studio", "Xcode", "Ionic",
-            "Ethical Hacking", "Penetration Testing", "Network Security", "Firewall", "Cryptography", "Wireshark",
-            "Git", "GitHub", "Bitbucket", "Agile", "Scrum", "Jira", "VS Code", "Eclipse", "IntelliJ IDEA", "Postman",
-            "Selenium", "JUnit", "PyTest", "Mocha", "Chai", "Jest", "Cypress", "Postman Testing", "Manual Testing", "Automation Testing",
-            "Figma", "Adobe XD", "Photoshop", "Canva", "Wireframing", "Prototyping",
-            "API Development", "Microservices", "GraphQL", "REST API", "WebSockets", "OAuth2", "JWT", "Blockchain", "Solidity", "IoT", "Edge Computing", "AR/VR", "Quantum Computing",
-    ]
-
-    soft_skills = [
-
-        "Communication", "Active Listening", "Public Speaking", "Presentation Skills", "Negotiation", "Collaboration", "Teamwork", 
-        "Interpersonal Skills", "Empathy", "Relationship Building", "Conflict Resolution", "Customer Service",
-        "Problem Solving", "Analytical Thinking", "Critical Thinking", "Decision Making", "Creativity", "Innovation", 
-        "Strategic Thinking", "Logical Reasoning", "Research Skills", "Troubleshooting",
-        "Leadership", "Mentoring", "Coaching", "Team Management", "Project Management", "Delegation", "Accountability",
-        "Goal Setting", "Motivational Skills", "Time Management", "Performance Management",
-        "Adaptability", "Flexibility", "Resilience", "Work Ethic", "Integrity", "Reliability", "Discipline",
-        "Self-Motivation", "Positive Attitude", "Emotional Intelligence", "Stress Management", "Patience",
-        "Organizational Skills", "Multitasking", "Planning", "Prioritization", "Attention to Detail", "Focus", "Meeting Deadlines",
-        "Remote Collaboration", "Cross-functional Communication", "Virtual Teamwork", "Feedback Management", "Stakeholder Communication",
-        "Design Thinking", "Brainstorming", "Open-mindedness", "Storytelling", "Curiosity", "Continuous Learning",
-        "Professionalism", "Cultural Awareness", "Ethical Judgment", "Diversity and Inclusion", "Accountability", "Confidentiality",
-        "Self-Reflection", "Growth Mindset", "Goal Orientation", "Learning Agility", "Initiative"
-    ]
-
-    projects =[
-
-    ]
-
-    detected_tech_skills = [
-        skill for skill in tech_keywords if skill.lower() in text.lower()
-    ]
-
-    detected_soft_skills = [
-        skill for skill in soft_skills if skill.lower() in text.lower()
-    ]
-    detected_projects = [
-        skill for skill in projects if skill.lower() in text.lower()
-    ]
-
-    prompt = f"""You are a resume analyzer AI. From the following resume text, extract all relevant information and output ONLY valid JSON (no markdown, no code blocks, no explanations).
+
+def _llm_reason(local):
+    """Why the local result needs Gemini, or None when it is enough."""
+    if local.confidence < LLM_CONFIDENCE:
+        return "low_confidence"
+    if LLM_FOR_PROJECTS and not local.result["projects"]:
+        return "no_projects"
+    return None
+
+
+def path_stats() -> dict:
+    """Extraction counts per path and the share that skipped Gemini."""
+    with _paths_lock:
+        counts = dict(_paths)
+    total = sum(counts.values())
+    return {**counts, "bypass_rate": round(counts["local"] / total, 3) if total else 0.0}
+
+
+def collect():
+    """Metric families for ``metrics.add_collector``."""
+    with _paths_lock:
+        samples = [({"path": path}, count) for path, count in _paths.items()]
+    yield metrics.Family("ai_resume_extraction_total", "counter", "Skill extractions by path (local = Gemini bypassed)", samples)
+
+
+def _build_prompt(sections):
+    """Gemini refinement prompt for the resume sections that fit RESUME_CONTEXT_TOKENS."""
+    return f"""You are a resume analyzer AI. From the following resume text, extract all relevant information and output ONLY valid JSON (no markdown, no code blocks, no explanations).
 
             Extract:
             1. Technical skills - programming languages, frameworks, tools, technologies
@@ -93,63 +70,70 @@ def extract_skills(text):
             }}
 
             Resume Text:
-            {text[:2000]}
+            {build_context(sections, CONTEXT_TOKENS)}
             """
 
-    result = {
-        'tech_skills': detected_tech_skills.copy(),
-        'soft_skills': detected_soft_skills.copy(),
-        'projects': detected_projects.copy()
-    }
 
+def extract_skills(text):
+    """
+    Hybrid skill extraction, see ``extract_skills_with_status``.
+    """
+    return extract_skills_with_status(text)[0]
+
+
+def extract_skills_with_status(text):
+    """
+    Tiered skill extraction:
+    1. Section segmentation
+    2. Local pass (vocabulary matcher, project titles, confidence score)
+    3. Gemini LLM refinement on the highest-value sections within
+       RESUME_CONTEXT_TOKENS, only when the local confidence is below
+       RESUME_LLM_CONFIDENCE or no project was found
+    
+    Returns:
+        dict: {
+            'tech_skills': list of technical skills,
+            'soft_skills': list of soft skills,
+            'projects': list of projects
+        }, plus a bool telling whether the result is complete (the local
+        pass was enough or the Gemini refinement succeeded)
+    """
+   
+    with metrics.stage("segment"):
+        sections = segment(text)
+    with metrics.stage("keyword_scan"):
+        local = analyze_locally(text, sections)
+    result = {field: list(values) for field, values in local.result.items()}
+
+    reason = _llm_reason(local)
+    with _paths_lock:
+        _paths[reason or "local"] += 1
+    if reason is None:
+        return result, True
+
+    with metrics.stage("prompt_build"):
+        prompt = _build_prompt(sections)
+
+    refined = False
     try:
-        response = Client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=prompt
-        )
+        response = llm.generate_sync(prompt, service="resume")
 
         if response and response.text:
-            gemini_output = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if gemini_output.startswith('```json'):
-                gemini_output = gemini_output[7:]
-            elif gemini_output.startswith('```'):
-                gemini_output = gemini_output[3:]
-            if gemini_output.endswith('```'):
-                gemini_output = gemini_output[:-3]
-            gemini_output = gemini_output.strip()
-            
-            try:
-                parsed_data = json.loads(gemini_output)
-                
-                # Merge tech skills
-                if 'tech_skills' in parsed_data:
-                    for skill in parsed_data['tech_skills']:
-                        skill = skill.strip()
-                        if skill and skill not in result['tech_skills']:
-                            result['tech_skills'].append(skill)
-                
-                # Add soft skills
-                if 'soft_skills' in parsed_data:
-                    for skill in parsed_data['soft_skills']:
-                        skill = skill.strip()
-                        if skill and skill not in result['soft_skills']:
-                            result['soft_skills'].append(skill)
-                
-                # Add projects
-                if 'projects' in parsed_data:
-                     for skill in parsed_data['projects']:
-                        skill = skill.strip()
-                        if skill and skill not in result['projects']:
-                            result['projects'].append(skill)
-                    
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse JSON from Gemini: {e}")
-                print(f"Raw output: {gemini_output[:200]}")
-                
+            parsed_data = llm_output.extract(response.text, ResumeSkills, source="resume")
+            refined = True
+
+            # Merge the refined lists into the keyword-scan results
+            for field in ('tech_skills', 'soft_skills', 'projects'):
+                for skill in parsed_data[field]:
+                    if skill not in result[field]:
+                        result[field].append(skill)
+
+    except LLMOutputError as e:
+        metrics.log("resume_json_unusable", level="warning", error=str(e))
     except Exception as e:
-        print("Gemini refinement failed:", e)
+        metrics.log("resume_refinement_failed", level="error", error=str(e))
 
-    return result 
+    if not refined:
+        llm_output.record_fallback("resume")
+    return result, refined
     
\ No newline at end of file
@@ -0,0 +1,117 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from common.skill_vocabulary import (  # noqa: F401
+    CASE_SENSITIVE_SKILLS, SKILL_ALIASES, SOFT_SKILLS, TECH_SKILLS, VOCABULARY_VERSION,
+)
+
+# Word runs, the symbol suffixes used by language names (C++, C#), the
+# joiners ". / -" when they sit between two word characters ("Node.js",
+# "CI/CD", "C/C++"), and any other punctuation as a standalone token.
+# A joiner next to whitespace ("React. JS", "CI / CD") is punctuation like
+# a comma: it becomes BREAK and ends any multi-word phrase.
+_TOKEN_RE = re.compile(r"[^\W_]+|\+\+|#|(?P<joiner>(?<=[^\W_])[./\-](?=[^\W_]))|[^\s\w+#]")
+_JOINERS = frozenset("./-")
+BREAK = "\n"
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    category: str
+    start: int
+    end: int
+
+
+def _tokenize(text: str) -> Tuple[List[str], List[int], List[int]]:
+    tokens, starts, ends = [], [], []
+    for match in _TOKEN_RE.finditer(text):
+        token = match.group()
+        if token in _JOINERS and match.lastgroup != "joiner":
+            token = BREAK
+        tokens.append(token.casefold())
+        starts.append(match.start())
+        ends.append(match.end())
+    return tokens, starts, ends
+
+
+def _keys(phrase: str) -> List[Tuple[str, ...]]:
+    """
+    Index keys of a phrase: its tokens with the joiners intact ("react . js")
+    and, when it has joiners, the space-separated spelling ("react js").
+    A differently joined spelling ("React-JS") only matches as an alias.
+    """
+    tokens = _tokenize(phrase)[0]
+    spaced = [token for token in tokens if token not in _JOINERS]
+    return [tuple(tokens)] if len(spaced) == len(tokens) else [tuple(tokens), tuple(spaced)]
+
+
+class SkillMatcher:
+    """
+    Whole-word, case-insensitive skill matcher built once per vocabulary.
+
+    Phrases are indexed by their token tuple, so a scan is a single pass
+    over the text doing at most ``max_phrase_len`` dict lookups per token.
+    The cost depends on the text length, not on the vocabulary size.
+    Phrases in ``case_sensitive`` match only as spelled or in capitals.
+    """
+
+    def __init__(self, vocabulary: Dict[str, Iterable[str]], aliases: Optional[Dict[str, str]] = None,
+                 case_sensitive: Iterable[str] = ()):
+        # key -> (skill, category, accepted spellings or None for any case)
+        self._index: Dict[Tuple[str, ...], Tuple[str, str, Optional[frozenset]]] = {}
+        case_sensitive = frozenset(case_sensitive)
+
+        def add(phrase, skill, category):
+            spellings = frozenset({phrase, phrase.upper()}) if phrase in case_sensitive else None
+            for key in _keys(phrase):
+                self._index.setdefault(key, (skill, category, spellings))
+
+        category_of = {}
+        for category, skills in vocabulary.items():
+            for skill in skills:
+                category_of.setdefault(skill, category)
+                add(skill, skill, category)
+        for alias, canonical in (aliases or {}).items():
+            if canonical in category_of:
+                add(alias, canonical, category_of[canonical])
+        self.max_phrase_len = max((len(key) for key in self._index), default=0)
+
+    def __len__(self):
+        return len(self._index)
+
+    def scan(self, text: str) -> List[SkillMatch]:
+        """
+        Find every skill mention in ``text`` (leftmost-longest, non-overlapping).
+
+        Returns:
+            list: SkillMatch(skill, category, start, end) with canonical skill
+            names and character offsets into the original text.
+        """
+        if not text:
+            return []
+        tokens, starts, ends = _tokenize(text)
+        index = self._index
+        matches = []
+        i, count = 0, len(tokens)
+        while i < count:
+            for n in range(min(self.max_phrase_len, count - i), 0, -1):
+                hit = index.get(tuple(tokens[i:i + n]))
+                if hit and (hit[2] is None or text[starts[i]:ends[i + n - 1]] in hit[2]):
+                    matches.append(SkillMatch(hit[0], hit[1], starts[i], ends[i + n - 1]))
+                    i += n
+                    break
+            else:
+                i += 1
+        return matches
+
+    def detect(self, text: str) -> Dict[str, List[str]]:
+        """Return the distinct canonical skills per category, in order of first mention."""
+        found: Dict[str, List[str]] = {}
+        for match in self.scan(text):
+            skills = found.setdefault(match.category, [])
+            if match.skill not in skills:
+                skills.append(match.skill)
+        return found
+
+
+MATCHER = SkillMatcher({"tech": TECH_SKILLS, "soft": SOFT_SKILLS}, SKILL_ALIASES, CASE_SENSITIVE_SKILLS)
@@ -0,0 +1,86 @@
+"""
+Background work started by a request gets the full per-call LLM deadline,
+not what is left of the request's budget.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "resume_analyzer"))
+
+import pytest  # noqa: E402
+
+from common import llm, metrics  # noqa: E402
+
+DEADLINE = 25.0
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    monkeypatch.setenv("LLM_DEADLINE_SECONDS", str(DEADLINE))
+    monkeypatch.setenv("LLM_REQUEST_BUDGET_SECONDS", "25")
+    monkeypatch.setenv("LLM_FALLBACK_RESERVE_SECONDS", "1")
+
+
+async def late_in_a_request(spawn):
+    """Run ``spawn`` as a handler would, 24 s into its request; returns the spawned task."""
+    token = metrics._request_started.set(time.perf_counter() - 24)
+    try:
+        # The request itself has next to no time left
+        assert llm.deadline_for() < 0.5
+        return spawn()
+    finally:
+        metrics._request_started.reset(token)
+
+
+def test_bulk_job_gets_the_full_deadline(tmp_path, monkeypatch):
+    from utils.bulk_jobs import JobManager
+
+    source = tmp_path / "source"
+    source.mkdir()
+    manager = JobManager(jobs_dir=str(tmp_path / "jobs"))
+    job = manager.create(str(source))
+    deadlines = []
+
+    async def record_deadline(job):
+        deadlines.append(llm.deadline_for())
+
+    monkeypatch.setattr(manager, "_run", record_deadline)
+
+    async def scenario():
+        await late_in_a_request(lambda: manager.start(job))
+        await manager._running[job.id][1]
+
+    asyncio.run(scenario())
+    assert deadlines == [DEADLINE]
+
+
+def test_pool_refill_gets_the_full_deadline(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("QUESTION_POOL_DB", str(tmp_path / "pool.db"))
+    service_dir = os.path.join(SRC, "question_generator")
+    monkeypatch.syspath_prepend(service_dir)
+    spec = importlib.util.spec_from_file_location("question_generator_main", os.path.join(service_dir, "main.py"))
+    question = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(question)
+    deadlines = []
+
+    async def record_deadline(skills):
+        deadlines.append(llm.deadline_for())
+        return None
+
+    monkeypatch.setattr(question, "generate_from_llm", record_deadline)
+
+    async def scenario():
+        await late_in_a_request(lambda: question._schedule_refill(["Python"], question.pool_key(["Python"])))
+        await asyncio.gather(*question._background_tasks)
+
+    asyncio.run(scenario())
+    assert deadlines == [DEADLINE]
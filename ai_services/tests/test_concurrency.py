@@ -0,0 +1,185 @@
+"""
+Concurrent requests against a slow in-process LLM stand-in, per service.
+
+N requests within the concurrency limit finish in about one LLM latency
+(the calls overlap instead of queueing on the event loop), and requests
+beyond the limit are turned away with 503 and Retry-After.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+LIMIT = 4
+LATENCY = 0.5
+
+ANSWERS = {
+    "feedback": {"feedback": "ok", "strengths": [], "improvements": [], "score": 80},
+    "question": {"questions": [{"question_id": n, "question": f"Question {n}?"} for n in range(1, 6)]},
+    "resume": {"tech_skills": [], "soft_skills": [], "projects": []},
+}
+
+
+class SlowResponse:
+    def __init__(self, service):
+        self.text = json.dumps(ANSWERS[service])
+        self.usage_metadata = None
+
+
+async def slow_generate(prompt, service=None, **kwargs):
+    await asyncio.sleep(LATENCY)
+    return SlowResponse(service)
+
+
+def slow_generate_sync(prompt, service=None, **kwargs):
+    time.sleep(LATENCY)
+    return SlowResponse(service)
+
+
+def make_pdf(text: str) -> bytes:
+    """A one-page PDF showing ``text``."""
+    stream = f"BT /F1 12 Tf 40 800 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def load_service(name):
+    service_dir = os.path.join(SRC, name)
+    sys.path.insert(0, service_dir)
+    spec = importlib.util.spec_from_file_location(f"{name}_main", os.path.join(service_dir, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def services(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("services")
+    patch = pytest.MonkeyPatch()
+    patch.setenv("GEMINI_API_KEY", "test")
+    patch.setenv("LOG_REQUESTS", "0")
+    patch.setenv("RESUME_CACHE_DB", "")
+    patch.setenv("QUESTION_POOL_DB", str(tmp / "pool.db"))
+    for prefix in ("FEEDBACK", "QUESTION", "RESUME"):
+        patch.setenv(f"{prefix}_MAX_CONCURRENCY", str(LIMIT))
+        patch.setenv(f"{prefix}_QUEUE_TIMEOUT", "0.2")
+    loaded = {name: load_service(name) for name in ("feedback_generator", "question_generator", "resume_analyzer")}
+
+    from common import llm
+    patch.setattr(llm, "generate", slow_generate)
+    patch.setattr(llm, "generate_sync", slow_generate_sync)
+    # Every resume goes to the (stand-in) LLM
+    patch.setattr(sys.modules["utils.skill_extractor"], "LLM_CONFIDENCE", 2.0)
+    yield loaded
+    patch.undo()
+
+
+# Distinct content per request, so no cache, pool or single-flight call answers it
+CASES = {
+    "feedback_generator": ("/api/feedbacke_generator", lambda n: {"json": {"text": f"Answer {n}: I would add an index."}}),
+    "question_generator": ("/api/question_generator", lambda n: {"json": {"skills": [f"Skill{n}"]}}),
+    "resume_analyzer": ("/api/analyze_resume",
+                        lambda n: {"content": make_pdf(f"Resume {n}"), "headers": {"content-type": "application/pdf"}}),
+}
+
+
+async def fire(app, path, request_for, count):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post(path, **request_for(n)) for n in range(count)))
+        return time.perf_counter() - started, responses
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_requests_within_the_limit_overlap(services, name):
+    path, request_for = CASES[name]
+    elapsed, responses = asyncio.run(fire(services[name].app, path, request_for, LIMIT))
+    assert [response.status_code for response in responses] == [200] * LIMIT
+    assert LATENCY <= elapsed < 2 * LATENCY
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_requests_over_the_limit_get_503(services, name):
+    path, request_for = CASES[name]
+    _, responses = asyncio.run(fire(services[name].app, path, lambda n: request_for(100 + n), 3 * LIMIT))
+    codes = [response.status_code for response in responses]
+    assert codes.count(200) == LIMIT
+    assert codes.count(503) == 2 * LIMIT
+    assert all(response.headers.get("retry-after") == "1" for response in responses if response.status_code == 503)
+
+
+def test_pool_hits_do_not_wait_for_a_slot(services, monkeypatch):
+    question = services["question_generator"]
+    # A limiter of this test's own event loop
+    monkeypatch.setattr(question, "llm_limiter", type(question.llm_limiter)(LIMIT, queue_timeout=0.2))
+    skills = ["Pooled Skill"]
+    difficulties = ["Easy"] * 4 + ["Medium"] * 4 + ["Hard"] * 2
+    question.question_pool.add(question.pool_key(skills), [
+        {"question": f"Pooled question {n}?", "difficulty": difficulty} for n, difficulty in enumerate(difficulties)
+    ])
+
+    async def scenario():
+        # Every LLM slot is taken
+        for _ in range(LIMIT):
+            await question.llm_limiter.acquire()
+        try:
+            return await fire(question.app, "/api/question_generator", lambda n: {"json": {"skills": skills}}, 1)
+        finally:
+            for _ in range(LIMIT):
+                question.llm_limiter.release()
+
+    elapsed, (response,) = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert [item["question"] for item in response.json()][0].startswith("Pooled question")
+    assert elapsed < LATENCY
+
+
+def test_batch_fan_out_stays_within_the_limit(services, monkeypatch):
+    from common import llm
+
+    running = peak = 0
+
+    async def counting_generate(prompt, service=None, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            return await slow_generate(prompt, service=service, **kwargs)
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(llm, "generate", counting_generate)
+    # The stand-in's answer is not in the batch format, so every answer is retried on its own
+    answers = [{"text": f"Batch answer {n}"} for n in range(3 * LIMIT)]
+    _, (response,) = asyncio.run(fire(services["feedback_generator"].app, "/api/feedbacke_generator/batch",
+                                      lambda n: {"json": {"answers": answers}}, 1))
+    results = response.json()["data"]["results"]
+    assert [result["success"] for result in results] == [True] * len(answers)
+    assert peak == LIMIT
@@ -0,0 +1,64 @@
+"""
+Upstream context caches are created off the request path.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import os
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from common.context_cache import ContextCache, StaticPrefix  # noqa: E402
+
+PREFIX = StaticPrefix("test", "1", "x" * 8000)
+
+
+class SlowCaches:
+    """Stands in for ``client.caches``: creation takes ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.created = 0
+        self.done = threading.Event()
+
+    def create(self, model, config):
+        time.sleep(self.delay)
+        self.created += 1
+        self.done.set()
+        return types.SimpleNamespace(name=f"cachedContents/{self.created}")
+
+
+def test_request_does_not_wait_for_cache_creation(tmp_path):
+    cache = ContextCache(db_path=str(tmp_path / "registry.sqlite3"))
+    client = types.SimpleNamespace(caches=SlowCaches(delay=0.3))
+
+    started = time.perf_counter()
+    first = cache.config_for_sync(client, PREFIX, "model")
+    assert time.perf_counter() - started < 0.1
+    assert first == {"system_instruction": PREFIX.text}
+
+    # Requests while the cache is being created fall back too, without a second creation
+    assert cache.config_for_sync(client, PREFIX, "model") == {"system_instruction": PREFIX.text}
+    assert client.caches.done.wait(2)
+    for _ in range(50):
+        if cache.config_for_sync(client, PREFIX, "model") != {"system_instruction": PREFIX.text}:
+            break
+        time.sleep(0.01)
+    assert cache.config_for_sync(client, PREFIX, "model") == {"cached_content": "cachedContents/1"}
+    assert client.caches.created == 1
+
+
+def test_prepare_reuses_a_cache_another_process_registered(tmp_path):
+    db_path = str(tmp_path / "registry.sqlite3")
+    creator = ContextCache(db_path=db_path)
+    assert creator.prepare(types.SimpleNamespace(caches=SlowCaches(delay=0)), PREFIX, "model") == "cachedContents/1"
+
+    other = ContextCache(db_path=db_path)
+    caches = SlowCaches(delay=0)
+    assert other.prepare(types.SimpleNamespace(caches=caches), PREFIX, "model") == "cachedContents/1"
+    assert caches.created == 0
+    assert other.config_for_sync(None, PREFIX, "model") == {"cached_content": "cachedContents/1"}
@@ -0,0 +1,149 @@
+"""
+Circuit breaker trials that end without an outcome must be handed back.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import asyncio
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pytest  # noqa: E402
+
+from common import hedging, llm, llm_scheduler  # noqa: E402
+
+
+class FakeClient:
+    """Stands in for ``genai.Client``: each call sleeps ``delay`` seconds, then answers or raises ``error``."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.aio = types.SimpleNamespace(models=types.SimpleNamespace(generate_content=self._generate))
+
+    async def _generate(self, model, contents, config):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return types.SimpleNamespace(text="ok", usage_metadata=None)
+
+
+@pytest.fixture
+def half_open(monkeypatch):
+    """A fresh breaker that has just turned half-open, and an unlimited scheduler."""
+    breaker = llm.CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == "half_open"
+    monkeypatch.setattr(llm, "breaker", breaker)
+    monkeypatch.setattr(llm_scheduler, "scheduler", llm_scheduler.Scheduler())
+    monkeypatch.setattr(llm.token_usage, "record", lambda *args: None)
+    return breaker
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+
+
+def test_cancelled_trial_is_handed_back(half_open, monkeypatch):
+    async def scenario():
+        use_client(monkeypatch, FakeClient(delay=10))
+        trial = asyncio.ensure_future(llm.generate("prompt", deadline=5))
+        await asyncio.sleep(0.05)
+        assert half_open._trial_in_flight
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert not half_open._trial_in_flight
+        assert half_open.state == "half_open"
+
+        # The next call becomes the trial and closes the breaker
+        use_client(monkeypatch, FakeClient())
+        response = await llm.generate("prompt", deadline=5)
+        assert response.text == "ok"
+        assert half_open.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_trial_without_budget_is_handed_back(half_open):
+    attempts = llm._Attempts(deadline=5)
+    attempts.deadline_at = time.monotonic() - 1
+    with pytest.raises(llm.LLMUnavailable):
+        attempts.start()
+    assert not half_open._trial_in_flight
+    assert half_open.allow() == llm.CircuitBreaker.TRIAL
+
+
+def test_only_the_trial_holder_hands_it_back(half_open):
+    holder = llm._Attempts(deadline=5)
+    holder.start()
+    with pytest.raises(llm.LLMUnavailable):
+        llm._Attempts(deadline=5).start()
+    other = llm._Attempts(deadline=5)
+    other.abandon()
+    assert half_open._trial_in_flight
+    holder.abandon()
+    assert not half_open._trial_in_flight
+
+
+def test_hedge_loser_hands_back_the_trial(half_open, monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(hedging, "policy", hedging.HedgePolicy(min_delay=0.01, initial_delay=0.01))
+        use_client(monkeypatch, FakeClient(delay=10))
+        call = asyncio.ensure_future(hedging.generate("prompt", validate=str, service="feedback", deadline=5))
+        await asyncio.sleep(0.1)
+        # The primary holds the trial, so the breaker turned the hedge away
+        assert half_open._trial_in_flight
+        assert hedging.policy.snapshot()["feedback"]["hedged"] == 1
+
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        while hedging._abandoned:
+            await asyncio.sleep(0.01)
+        assert not half_open._trial_in_flight
+        outcomes = llm_scheduler.scheduler.snapshot()["outcomes"]
+        assert (outcomes["cancelled"], outcomes["error"]) == (1, 0)
+
+        use_client(monkeypatch, FakeClient())
+        response, value = await hedging.generate("prompt", validate=lambda text: text, service="feedback", deadline=5)
+        assert value == "ok"
+        assert half_open.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_local_error_hands_back_the_trial_without_closing(half_open, monkeypatch):
+    use_client(monkeypatch, FakeClient(error=TypeError("bad config")))
+    with pytest.raises(TypeError):
+        asyncio.run(llm.generate("prompt", deadline=5))
+    assert not half_open._trial_in_flight
+    assert half_open.state == "half_open"
+
+
+def test_upstream_client_error_closes_the_breaker(half_open, monkeypatch):
+    from google.genai import errors
+
+    use_client(monkeypatch, FakeClient(error=errors.ClientError(400, {"error": {"message": "bad", "status": "INVALID_ARGUMENT"}})))
+    with pytest.raises(errors.ClientError):
+        asyncio.run(llm.generate("prompt", deadline=5))
+    assert half_open.state == "closed"
+
+
+def test_local_error_does_not_reset_failures(monkeypatch):
+    breaker = llm.CircuitBreaker(threshold=3, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    monkeypatch.setattr(llm, "breaker", breaker)
+    monkeypatch.setattr(llm_scheduler, "scheduler", llm_scheduler.Scheduler())
+    use_client(monkeypatch, FakeClient(error=ValueError("schema mismatch")))
+    with pytest.raises(ValueError):
+        asyncio.run(llm.generate("prompt", deadline=5))
+    assert breaker.failures == 2
@@ -0,0 +1,84 @@
+"""
+The LLM scheduler against the local Gemini stand-in (benchmarks/fake_gemini.py):
+interactive latency holds up under a background flood, and 429s shrink
+the concurrency limit.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, "..", "src"), os.path.join(HERE, "..", "benchmarks")]
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from bench_llm_scheduler import run_mode  # noqa: E402
+from bench_tiered_extraction import start_fake_gemini  # noqa: E402
+from common import llm, llm_scheduler  # noqa: E402
+
+LATENCY = 0.2
+QUOTA_RPM = 600
+MAX_CONCURRENCY = 16
+ARGS = argparse.Namespace(duration=4.0, interactive_rps=4.0, background_workers=24, seed=1)
+SCENARIO = {
+    "latency": {"dist": "lognormal", "median": LATENCY, "sigma": 0.2},
+    "context_cache": False,
+    "quota": {"rpm": QUOTA_RPM, "burst": 10},
+    "capacity": 8,
+}
+
+
+@pytest.fixture(scope="module")
+def port(tmp_path_factory):
+    proc, port = start_fake_gemini(LATENCY, str(tmp_path_factory.mktemp("gemini") / "scenario.json"))
+    yield port
+    proc.kill()
+    proc.wait(timeout=10)
+
+
+@pytest.fixture
+def upstream(port, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("GEMINI_BASE_URL", f"http://127.0.0.1:{port}")
+    monkeypatch.setenv("LOG_REQUESTS", "0")
+    # A client for the stand-in; run_mode swaps these, so put them back after
+    monkeypatch.setattr(llm, "_client", None)
+    monkeypatch.setattr(llm, "breaker", llm.breaker)
+    monkeypatch.setattr(llm_scheduler, "scheduler", llm_scheduler.scheduler)
+    return port
+
+
+def scheduler(rpm=QUOTA_RPM):
+    return llm_scheduler.Scheduler(rpm=rpm, burst=10, min_concurrency=1, max_concurrency=MAX_CONCURRENCY,
+                                   latency_target=LATENCY * 4)
+
+
+def run(port, scheduler, background, args=ARGS):
+    async def modes():
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as admin:
+            return await run_mode(llm, llm_scheduler, admin, SCENARIO, "test", scheduler, background, args)
+
+    return asyncio.run(modes())
+
+
+def test_interactive_p99_holds_under_background_flood(upstream, capsys):
+    baseline = run(upstream, scheduler(), None)
+    flooded = run(upstream, scheduler(), "background")
+    assert baseline["interactive"]["errors"] == flooded["interactive"]["errors"] == 0
+    # The flood is real: it keeps the quota busy
+    assert flooded["background_per_minute"] > QUOTA_RPM / 4
+    assert flooded["interactive"]["p99_s"] < 2 * baseline["interactive"]["p99_s"] + LATENCY
+
+
+def test_429s_shrink_the_concurrency_limit(upstream, capsys):
+    # A bucket twice the upstream quota: only the 429s can hold the calls back
+    flooded = run(upstream, scheduler(rpm=2 * QUOTA_RPM), "background",
+                  argparse.Namespace(**{**vars(ARGS), "interactive_rps": 1.0}))
+    assert flooded["upstream_429s"] > 0
+    assert flooded["limit_decreases"] > 0
+    assert flooded["final_limit"] < MAX_CONCURRENCY
@@ -0,0 +1,75 @@
+"""
+The local pass skips Gemini only for resumes it reads correctly: every
+tech skill found and none invented, and the right project titles.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path[:0] = [SRC, os.path.join(SRC, "resume_analyzer")]
+
+from utils import skill_extractor  # noqa: E402
+from utils.local_extractor import analyze_locally  # noqa: E402
+
+# (resume text, its tech skills by their vocabulary names, its projects)
+CORPUS = [
+    # Formatted, every skill in the vocabulary, a bulleted list of projects
+    ("Alex Candidate\nBackend Engineer\n"
+     "SKILLS\n"
+     "Languages and frameworks: Python, Django, PostgreSQL\n"
+     "Tools: Docker, Kubernetes, AWS, Redis\n"
+     "Soft skills: Communication, Teamwork, Leadership\n"
+     "EXPERIENCE\n"
+     "Backend Engineer, Example Corp (2021-2024)\n"
+     "- Built services in Python handling 4M requests per day.\n"
+     "- Helped the team go live a month early and express concerns early.\n"
+     "PROJECTS\n"
+     "- Interview Coach - a small app built with Django\n"
+     "- Fleet Monitor - a small app built with Redis\n"
+     "EDUCATION\nB.Sc. Computer Science",
+     {"Python", "Django", "PostgreSQL", "Docker", "Kubernetes", "AWS", "Redis"},
+     ["Interview Coach", "Fleet Monitor"]),
+    # Project titles on their own lines with bulleted descriptions
+    ("Sam Candidate\n"
+     "Technical Skills: JavaScript, TypeScript, React, Node.js, MongoDB, Jest\n"
+     "Projects\n"
+     "Chat Relay - websocket app\n"
+     "- Built a realtime server handling 5k concurrent connections\n"
+     "- Deployed on AWS with Docker\n"
+     "Budget Tracker (React)\n"
+     "- Wrote unit tests with Jest\n",
+     {"JavaScript", "TypeScript", "React", "Node.js", "MongoDB", "Jest", "WebSockets", "AWS", "Docker"},
+     ["Chat Relay", "Budget Tracker"]),
+    # Skills the vocabulary does not know
+    ("SKILLS\nLanguages: Python, Elixir, Phoenix, ClickHouse, Svelte, Docker\n"
+     "PROJECTS\n- Recipe Finder - built with Phoenix\n",
+     {"Python", "Elixir", "Phoenix", "ClickHouse", "Svelte", "Docker"},
+     ["Recipe Finder"]),
+    # Prose only
+    ("I am a data engineer who enjoys working with Python, Spark and Airflow. "
+     "Recently I built study planner tooling for my team.\n",
+     {"Python", "Apache Spark", "Airflow"},
+     ["Study Planner"]),
+    # No projects section
+    ("SKILLS\nPython, Java, SQL, Docker, Kubernetes, Git\n"
+     "EXPERIENCE\n- Maintained the billing service\n",
+     {"Python", "Java", "SQL", "Docker", "Kubernetes", "Git"},
+     []),
+]
+
+
+def test_bypass_only_when_the_local_result_is_right(monkeypatch):
+    monkeypatch.setattr(skill_extractor, "LLM_CONFIDENCE", 0.85)
+    monkeypatch.setattr(skill_extractor, "LLM_FOR_PROJECTS", True)
+    bypassed = []
+    for text, skills, projects in CORPUS:
+        local = analyze_locally(text)
+        correct = set(local.result["tech_skills"]) == skills and local.result["projects"] == projects
+        if skill_extractor._llm_reason(local) is None:
+            assert correct, (text.splitlines()[0], local)
+            bypassed.append(text)
+    # Both kinds of resume are in the corpus: the formatted ones skip Gemini
+    assert len(bypassed) == 2
@@ -0,0 +1,39 @@
+"""
+Project titles read from the Projects section without the LLM.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "resume_analyzer"))
+
+import pytest  # noqa: E402
+
+from utils.resume_sections import project_titles, segment  # noqa: E402
+
+CASES = [
+    # Titles on their own lines, bulleted descriptions under them
+    ("Projects\n"
+     "Chat Relay - websocket app\n"
+     "- Built a realtime server handling 5k concurrent connections\n"
+     "- Deployed on AWS with Docker\n"
+     "Budget Tracker (React)\n"
+     "- Wrote unit tests with Jest",
+     ["Chat Relay", "Budget Tracker"]),
+    # A bulleted list of projects
+    ("PROJECTS\n- Chat Relay: websocket app\n- Budget Tracker (React)", ["Chat Relay", "Budget Tracker"]),
+    # Titles with unbulleted descriptions
+    ("Personal Projects:\n"
+     "Chat Relay\n"
+     "A realtime websocket server in Go that relays messages between rooms of users\n"
+     "Budget Tracker | React, Firebase",
+     ["Chat Relay", "Budget Tracker"]),
+    ("Experience\n- Built dashboards", []),
+]
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_project_titles(text, expected):
+    assert project_titles(segment(text)) == expected
@@ -0,0 +1,32 @@
+"""
+Skill matching in resume text: joiners and case-sensitive names.
+
+Run from the repository root:
+    python -m pytest -q ai_services/tests
+"""
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path[:0] = [SRC, os.path.join(SRC, "resume_analyzer")]
+
+import pytest  # noqa: E402
+
+from utils.skill_matcher import MATCHER  # noqa: E402
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I took the rest of the year off", []),
+    ("I like to express my ideas clearly", []),
+    ("We went to the node and back", []),
+    ("To spark interest, off the rails", []),
+    ("A swift reply, rust on the oracle", []),
+    ("Express, Node, Vue, Mongo, Rails, Spark", ["Express.js", "Node.js", "Vue.js", "MongoDB", "Ruby on Rails", "Apache Spark"]),
+    ("Built a REST backend", ["REST API"]),
+    ("NODE and REST", ["Node.js", "REST API"]),
+    ("node.js, express.js and rest api", ["Node.js", "Express.js", "REST API"]),
+    ("React. JS tooling came later", ["React", "JavaScript"]),
+    ("CI/CD, C/C++ and C#", ["CI/CD", "C++", "C#"]),
+])
+def test_detects_tech_skills(text, expected):
+    assert MATCHER.detect(text).get("tech", []) == expected
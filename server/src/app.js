@@ -8,6 +8,7 @@ import questionRoutes from "./routes/questionRoutes.js";
 import userRouters from "./routes/userRouters.js";
 import feedbackRoutes from "./routes/feedbackRoutes.js";
 import interviewRoutes from "./routes/interviewRoutes.js";
+import { requestId } from "./middleware/requestId.js";
 // import emotionRoutes from "./routes/emotionRoutes.js";
 
 const app = express();
@@ -21,8 +22,10 @@ app.use(cors({
   origin: config.CLIENT_URL, // Vite default port
   credentials: true, // Allow cookies
   methods: ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-  allowedHeaders: ["Content-Type", "Authorization"]
+  allowedHeaders: ["Content-Type", "Authorization", "X-Request-ID"],
+  exposedHeaders: ["X-Request-ID"]
 }));
+app.use(requestId);
 app.use(express.json());
 app.use(cookie_parser());
 
@@ -28,6 +28,7 @@ export const config = {
   RESUME_ANALYZER_URL: process.env.RESUME_ANALYZER_URL || "http://0.0.0.0:8000",
   QUESTION_GEN_URL: process.env.QUESTION_GEN_URL || "http://0.0.0.0:8001",
   FEEDBACK_GEN_URL: process.env.FEEDBACK_GEN_URL || "http://0.0.0.0:8002",
+  EMOTION_ANALYZER_URL: process.env.EMOTION_ANALYZER_URL || "http://0.0.0.0:8003",
   
   // File Upload Configuration
   MAX_FILE_SIZE: parseInt(process.env.MAX_FILE_SIZE) || 5 * 1024 * 1024, // 5MB default
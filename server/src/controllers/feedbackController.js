@@ -2,9 +2,61 @@ import aiService from "../services/aiService.js";
 import { Feedback } from "../models/Feedback.models.js";
 import { InterviewSession } from "../models/interviewSession.model.js";
 
+// Upsert one answer's feedback for a session question
+async function saveFeedback({ user_id, session_id, question_id, text_ans, emotion_data, feedbackData }) {
+  try {
+    // Check if feedback already exists for this question in this session
+    const existingFeedback = await Feedback.findOne({
+      session_id,
+      question_id,
+      user_id
+    });
+
+    // Store only essential emotion metrics, not full history arrays
+    const emotionSummary = emotion_data ? {
+      predominantEmotion: emotion_data.predominantEmotion || "neutral",
+      avgConfidence: emotion_data.avgConfidence || 0,
+      avgStress: emotion_data.avgStress || 0,
+      avgEngagement: emotion_data.avgEngagement || 0,
+      source: emotion_data.source || "video_tracking"
+    } : null;
+
+    const feedbackToSave = {
+      user_id,
+      session_id,
+      question_id,
+      user_answer: text_ans,
+      feedback_text: typeof feedbackData === 'string' ? feedbackData : feedbackData.feedback || '',
+      strengths: Array.isArray(feedbackData.strengths) ? feedbackData.strengths : (feedbackData.strengths ? [feedbackData.strengths] : []),
+      improvements: Array.isArray(feedbackData.improvements) ? feedbackData.improvements : (feedbackData.improvements ? [feedbackData.improvements] : []),
+      emotion_improvements: Array.isArray(feedbackData.emotion_improvements) ? feedbackData.emotion_improvements : [],
+      score: feedbackData.score,
+      emotion: emotionSummary ? [emotionSummary.predominantEmotion] : [],
+      // Store only essential feedback data, not full duplicate object
+      feedback_data: {
+        emotion_summary: emotionSummary,
+        emotion_improvements: feedbackData.emotion_improvements || []
+      }
+    };
+
+    if (existingFeedback) {
+      // Update existing feedback
+      Object.assign(existingFeedback, feedbackToSave);
+      await existingFeedback.save();
+    } else {
+      // Create new feedback
+      await Feedback.create(feedbackToSave);
+    }
+  } catch (dbError) {
+    console.error("Error saving feedback to database:", dbError);
+    // Continue even if DB save fails, still return the feedback
+  }
+}
+
 export const feedbackGenerater = async(req, res) => {
   try {
-    const { text_ans, session_id, question_id, user_id, emotion_data } = req.body;
+    const { text_ans, session_id, question_id, user_id } = req.body;
+    let { emotion_data } = req.body;
     
     if (!text_ans) {
       return res.status(400).json({ 
@@ -20,6 +72,15 @@ export const feedbackGenerater = async(req, res) => {
       });
     }
 
+    // Prefer the server-side aggregate when the browser streamed its samples
+    if (!emotion_data && session_id && question_id) {
+      emotion_data = await aiService.emotionSummary(session_id, question_id);
+    }
+    // No camera data at all: estimate from the answer text instead
+    if (!emotion_data) {
+      emotion_data = await aiService.textEmotion(text_ans);
+    }
+
     // Generate feedback using AI service
     const aiFeedback = await aiService.feedbackGenerater(text_ans, emotion_data);
     
@@ -37,53 +98,7 @@ export const feedbackGenerater = async(req, res) => {
     
     // Save feedback to database if session_id, question_id, and user_id are provided
     if (session_id && question_id && user_id) {
-      try {
-        // Check if feedback already exists for this question in this session
-        const existingFeedback = await Feedback.findOne({
-          session_id,
-          question_id,
-          user_id
-        });
-
-        // Store only essential emotion metrics, not full history arrays
-        const emotionSummary = emotion_data ? {
-          predominantEmotion: emotion_data.predominantEmotion || "neutral",
-          avgConfidence: emotion_data.avgConfidence || 0,
-          avgStress: emotion_data.avgStress || 0,
-          avgEngagement: emotion_data.avgEngagement || 0,
-          source: emotion_data.source || "video_tracking"
-        } : null;
-
-        const feedbackToSave = {
-          user_id,
-          session_id,
-          question_id,
-          user_answer: text_ans,
-          feedback_text: typeof feedbackData === 'string' ? feedbackData : feedbackData.feedback || '',
-          strengths: Array.isArray(feedbackData.strengths) ? feedbackData.strengths : (feedbackData.strengths ? [feedbackData.strengths] : []),
-          improvements: Array.isArray(feedbackData.improvements) ? feedbackData.improvements : (feedbackData.improvements ? [feedbackData.improvements] : []),
-          emotion_improvements: Array.isArray(feedbackData.emotion_improvements) ? feedbackData.emotion_improvements : [],
-          score: feedbackData.score,
-          emotion: emotionSummary ? [emotionSummary.predominantEmotion] : [],
-          // Store only essential feedback data, not full duplicate object
-          feedback_data: {
-            emotion_summary: emotionSummary,
-            emotion_improvements: feedbackData.emotion_improvements || []
-          }
-        };
-
-        if (existingFeedback) {
-          // Update existing feedback
-          Object.assign(existingFeedback, feedbackToSave);
-          await existingFeedback.save();
-        } else {
-          // Create new feedback
-          await Feedback.create(feedbackToSave);
-        }
-      } catch (dbError) {
-        console.error("Error saving feedback to database:", dbError);
-        // Continue even if DB save fails, still return the feedback
-      }
+      await saveFeedback({ user_id, session_id, question_id, text_ans, emotion_data, feedbackData });
     }
 
     return res.json({
@@ -101,6 +116,137 @@ export const feedbackGenerater = async(req, res) => {
   }
 };
 
+// Relay feedback fields to the client as Server-Sent Events while the model writes them
+export const feedbackStream = async (req, res) => {
+  const { text_ans, session_id, question_id, user_id } = req.body;
+  let { emotion_data } = req.body;
+
+  if (!text_ans || !text_ans.trim()) {
+    return res.status(400).json({
+      success: false,
+      message: "Text answer is required"
+    });
+  }
+
+  if (!emotion_data && session_id && question_id) {
+    emotion_data = await aiService.emotionSummary(session_id, question_id);
+  }
+  if (!emotion_data) {
+    emotion_data = await aiService.textEmotion(text_ans);
+  }
+
+  let upstream;
+  try {
+    upstream = await aiService.feedbackStream(text_ans, emotion_data);
+  } catch (error) {
+    return res.status(502).json({
+      success: false,
+      error: "Failed to generate feedback",
+      message: error.message
+    });
+  }
+
+  res.set({
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+  });
+  res.flushHeaders();
+
+  // Watch for the final "done" event so the result is stored like the non-streaming route
+  let pending = "";
+  upstream.on("data", (chunk) => {
+    res.write(chunk);
+    pending += chunk.toString();
+    const events = pending.split("\n\n");
+    pending = events.pop();
+    for (const event of events) {
+      if (!event.startsWith("event: done")) continue;
+      const data = event.split("\n").find(line => line.startsWith("data: "));
+      try {
+        const result = JSON.parse(data.slice(6));
+        if (result.success && session_id && question_id && user_id) {
+          saveFeedback({ user_id, session_id, question_id, text_ans, emotion_data, feedbackData: result.data });
+        }
+      } catch (parseError) {
+        console.error("Error reading streamed feedback:", parseError.message);
+      }
+    }
+  });
+  upstream.on("end", () => res.end());
+  upstream.on("error", (error) => {
+    console.error("Feedback stream error:", error.message);
+    res.end();
+  });
+  req.on("close", () => upstream.destroy());
+};
+
+// Evaluate every answer of a session with a single AI service call
+export const sessionFeedbackGenerater = async (req, res) => {
+  try {
+    const { session_id, user_id, answers } = req.body;
+
+    if (!Array.isArray(answers) || answers.length === 0) {
+      return res.status(400).json({
+        success: false,
+        message: "Answers are required"
+      });
+    }
+
+    // Text-based estimates for every answer without emotion data, in one call
+    const missing = answers.filter(a => !a.emotion_data);
+    if (missing.length) {
+      const estimates = await aiService.textEmotionBatch(missing.map(a => a.text_ans || ""));
+      missing.forEach((a, idx) => { a.emotion_data = estimates[idx]; });
+    }
+
+    const aiFeedback = await aiService.sessionFeedbackGenerater(answers.map(a => ({
+      text: a.text_ans || "",
+      question: a.question_text || null,
+      emotion_data: a.emotion_data || null
+    })));
+
+    if (!aiFeedback.success) {
+      return res.status(500).json({
+        success: false,
+        error: "Failed to generate feedback",
+        message: aiFeedback.error || "AI service returned an error"
+      });
+    }
+
+    const { results, summary } = aiFeedback.data;
+
+    if (session_id && user_id) {
+      await Promise.all(results.map((result, idx) => {
+        const answer = answers[idx];
+        if (!result.success || !answer.question_id) return null;
+        return saveFeedback({
+          user_id,
+          session_id,
+          question_id: answer.question_id,
+          text_ans: answer.text_ans,
+          emotion_data: answer.emotion_data,
+          feedbackData: result.data
+        });
+      }));
+    }
+
+    return res.json({
+      success: true,
+      data: { results, summary }
+    });
+
+  } catch (error) {
+    console.error("Error generating session feedback:", error.message);
+    res.status(500).json({
+      success: false,
+      error: "Failed to generate feedback",
+      message: error.message
+    });
+  }
+};
+
 export const getSessionFeedback = async (req, res) => {
   try {
     const { sessionId } = req.params;
@@ -14,7 +14,7 @@ export const generateQuestions = async (req, res) => {
     const Skills = user.skills
     if(!Skills || Skills.length === 0) return res.status(400).json({ message: "No skills found for user"})
     
-    const response = await aiService.generateQuestions(Skills);
+    const response = await aiService.generateQuestions(Skills, userId);
     
     // Handle different response formats
     const questions = response.data || response.questions || response || [];
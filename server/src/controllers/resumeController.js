@@ -1,12 +1,7 @@
-import path from "path";
-import fs from "fs";
-import os from "os";
 import { User } from "../models/User.models.js";
 import aiService from "../services/aiService.js";
 
 async function resumeKeyExtract(req, res) {
-  let tempFilePath = null;
-
   try {
     // Verify user is authenticated and matches the userId in params
     const authenticatedUserId = req.user?.id;
@@ -37,13 +32,8 @@ async function resumeKeyExtract(req, res) {
       });
     }
 
-    // Create temporary file for AI service analysis
-    // Use async file writing to avoid blocking the event loop
-    tempFilePath = path.join(os.tmpdir(), `resume-${userId}-${Date.now()}.pdf`);
-    await fs.promises.writeFile(tempFilePath, file.buffer);
-
     /*** call to python microservice ****/
-    const analysis = await aiService.analyzResume(tempFilePath);
+    const analysis = await aiService.analyzResume(file.buffer);
 
     // Handle different response formats
     const data = analysis.data || analysis || {};
@@ -88,13 +78,6 @@ async function resumeKeyExtract(req, res) {
       message: "Error analyzing resume",
       error: error.message
     });
-  } finally {
-    // Clean up temporary file asynchronously
-    if (tempFilePath) {
-      fs.promises.unlink(tempFilePath).catch(err => 
-        console.error("Error deleting temporary file:", err)
-      );
-    }
   }
 }
 
@@ -0,0 +1,17 @@
+import { AsyncLocalStorage } from "node:async_hooks";
+import { randomUUID } from "node:crypto";
+
+const storage = new AsyncLocalStorage();
+const VALID_ID = /^[A-Za-z0-9._:-]{1,64}$/;
+
+// Gives every request an ID (the client's X-Request-ID or a new one), echoes it
+// back and keeps it in async context so aiService can forward it to the AI services
+export const requestId = (req, res, next) => {
+  const incoming = req.get("X-Request-ID");
+  const id = incoming && VALID_ID.test(incoming) ? incoming : randomUUID().replace(/-/g, "");
+  req.id = id;
+  res.set("X-Request-ID", id);
+  storage.run(id, next);
+};
+
+export const currentRequestId = () => storage.getStore();
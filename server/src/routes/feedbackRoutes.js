@@ -1,6 +1,8 @@
 import express from 'express';
 import {
   feedbackGenerater,
+  feedbackStream,
+  sessionFeedbackGenerater,
   getSessionFeedback,
   getQuestionFeedback
 } from '../controllers/feedbackController.js'
@@ -8,6 +10,8 @@ import {
 const router = express.Router();
 
 router.post('/generate', feedbackGenerater);
+router.post('/generate/stream', feedbackStream);
+router.post('/generate/session', sessionFeedbackGenerater);
 router.get('/session/:sessionId', getSessionFeedback);
 router.get('/session/:sessionId/question/:questionId', getQuestionFeedback);
 
@@ -1,18 +1,30 @@
 import axios from "axios";
 import { config } from "../config/env.js";
+import { currentRequestId } from "../middleware/requestId.js";
 
 const ResumeAnalyzer = config.RESUME_ANALYZER_URL;
 const Question_gen = config.QUESTION_GEN_URL;
 const feedback_gen = config.FEEDBACK_GEN_URL;
+const emotion_analyzer = config.EMOTION_ANALYZER_URL;
+
+// Every AI call carries the incoming request's ID, so service logs and
+// /metrics line up with the Node request that caused them
+const aiClient = axios.create();
+aiClient.interceptors.request.use((request) => {
+  const id = currentRequestId();
+  if (id) request.headers["X-Request-ID"] = id;
+  return request;
+});
 
 
 const aiService = {
 
-  analyzResume: async (filePath) => {
+  analyzResume: async (fileBuffer) => {
     try {
-      const res = await axios.post(`${ResumeAnalyzer}/api/analyze_resume`, {
-        file_path: filePath,
-      }, {
+      // Send the PDF bytes directly so the analyzer does not need a shared filesystem
+      const res = await aiClient.post(`${ResumeAnalyzer}/api/analyze_resume`, fileBuffer, {
+        headers: { "Content-Type": "application/pdf" },
+        maxBodyLength: Infinity,
         timeout: 30000 // 30 second timeout
       });
       return res.data;
@@ -22,10 +34,11 @@ const aiService = {
     }
   },
   
-  generateQuestions: async (skills) => {
+  generateQuestions: async (skills, userId) => {
     try {
-      const res = await axios.post(`${Question_gen}/api/question_generator`, {
-        skills: skills
+      const res = await aiClient.post(`${Question_gen}/api/question_generator`, {
+        skills: skills,
+        user_id: userId ? String(userId) : null
       }, {
         timeout: 30000
       });
@@ -42,7 +55,7 @@ const aiService = {
         text: text_ans,
         emotion_data: emotion_data || null
       };
-      const res = await axios.post(`${feedback_gen}/api/feedbacke_generator`, payload, {
+      const res = await aiClient.post(`${feedback_gen}/api/feedbacke_generator`, payload, {
         timeout: 30000
       });
       return res.data;
@@ -50,6 +63,74 @@ const aiService = {
       console.error("Error generating feedback:", error.response?.status, error.response?.data, error.message);
       throw new Error(`Feedback generation failed: ${error.message}`);
     }
+  },
+
+  // Returns the raw SSE stream of /api/feedbacke_generator/stream
+  feedbackStream: async (text_ans, emotion_data) => {
+    try {
+      const res = await aiClient.post(`${feedback_gen}/api/feedbacke_generator/stream`, {
+        text: text_ans,
+        emotion_data: emotion_data || null
+      }, {
+        responseType: "stream",
+        timeout: 30000
+      });
+      return res.data;
+    } catch (error) {
+      console.error("Error streaming feedback:", error.response?.status, error.message);
+      throw new Error(`Feedback streaming failed: ${error.message}`);
+    }
+  },
+
+  // Aggregated emotion summary streamed by the browser to emotion_analyzer; null when unavailable
+  emotionSummary: async (sessionId, questionId) => {
+    try {
+      const res = await aiClient.get(`${emotion_analyzer}/api/emotion_summary/${encodeURIComponent(sessionId)}/${encodeURIComponent(questionId)}`, {
+        timeout: 3000
+      });
+      return res.data.success ? res.data.data : null;
+    } catch (error) {
+      console.error("Error fetching emotion summary:", error.message);
+      return null;
+    }
+  },
+
+  // Text-based emotion estimate for answers without camera data; null when unavailable
+  textEmotion: async (text_ans) => {
+    try {
+      const res = await aiClient.post(`${emotion_analyzer}/api/text_emotion`, { text: text_ans }, {
+        timeout: 3000
+      });
+      return res.data.success ? res.data.data : null;
+    } catch (error) {
+      console.error("Error estimating emotion from text:", error.message);
+      return null;
+    }
+  },
+
+  // One estimate per text, in order; nulls when unavailable
+  textEmotionBatch: async (texts) => {
+    try {
+      const res = await aiClient.post(`${emotion_analyzer}/api/text_emotion/batch`, { texts }, {
+        timeout: 3000
+      });
+      return res.data.success ? res.data.data : texts.map(() => null);
+    } catch (error) {
+      console.error("Error estimating emotion from text:", error.message);
+      return texts.map(() => null);
+    }
+  },
+
+  sessionFeedbackGenerater: async (answers) => {
+    try {
+      const res = await aiClient.post(`${feedback_gen}/api/feedbacke_generator/batch`, { answers }, {
+        timeout: 30000
+      });
+      return res.data;
+    } catch (error) {
+      console.error("Error generating session feedback:", error.response?.status, error.response?.data, error.message);
+      throw new Error(`Session feedback generation failed: ${error.message}`);
+    }
   }
 };
 